@@ -5,46 +5,36 @@ Pipeline:
   1. OCR cleanup (noise removal, keyword repair, line merging)
   2. Block splitting (section classification)
   3. Candidate extraction (ingredient parsing, claim parsing)
-  4. Exact matching against lexicon
+  4. Exact matching against lexicon (whole span, then automaton scan inside it)
   5. Fuzzy recovery for OCR-corrupted text
   6. Deduplication and result assembly
 """
 from __future__ import annotations
 
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from .. import config as app_config
 from .schemas import CandidateSpan, MatchedEntity, StructuredAnalysis, TextBlock
+from .preprocessing.normalize import normalization_cache_stats
 from .preprocessing.ocr_cleanup import cleanup_ocr_text
 from .segmentation.block_splitter import split_into_blocks
+from .segmentation.section_classifier import line_cue_counts
 from .extraction.ingredient_parser import extract_from_ingredient_block
 from .extraction.claim_parser import extract_claim_spans
 from .matching.lexicon import MasterLexicon
+from .matching.lexicon_delta import LexiconOverlay, apply_delta, compact_lexicon
 from .matching.exact_matcher import ExactRuleMatcher
 from .matching.fuzzy_recovery import FuzzyRecoveryMatcher
+from .matching.snapshot import load_snapshot
+from .matching.span_memo import FuzzySpanMemo
+from .stage_metrics import RequestTrace, activate_trace, deactivate_trace, get_stage_metrics
 
 logger = logging.getLogger("FoodLens")
 
-INLINE_FREE_FROM_CUES = [
-    "içermez", "icermez", "yoktur", "bulunmaz",
-    "does not contain", "contains no", "free from",
-]
-INLINE_MAY_CONTAIN_CUES = [
-    "eser miktarda", "iz miktarda", "may contain",
-    "iz içerebilir", "iz icerebilir", "traces of",
-]
-INLINE_ALLERGEN_TERMS = [
-    "alerjen", "allergen", "gluten", "süt", "sut", "soya",
-    "fındık", "findik", "yumurta", "yer fıstığı", "yer fistigi",
-    "susam", "ceviz", "badem", "milk", "soy", "hazelnut",
-    "egg", "sesame", "peanut", "wheat", "balık", "balik",
-]
-INLINE_PRESENCE_VERBS = [
-    "içerir", "icerir", "içermektedir", "icermektedir", "contains",
-]
-
 
 def _resolve_db_file() -> Path:
     csv_path = getattr(app_config, "MASTER_CSV_FILE", None)
@@ -53,23 +43,106 @@ def _resolve_db_file() -> Path:
     return Path(app_config.DB_FILE)
 
 
+def _fuzzy_prefilter_wanted(alias_count: int) -> bool:
+    mode = app_config.FUZZY_PREFILTER
+    if mode == "auto":
+        return alias_count >= app_config.FUZZY_PREFILTER_MIN_ALIASES
+    return mode in {"1", "true", "yes", "on"}
+
+
 class FoodLensAnalysisEngine:
-    def __init__(self):
-        self.db_file = _resolve_db_file()
-        logger.info("Rule-based analysis engine yükleniyor: %s", self.db_file)
-        self.lexicon = MasterLexicon(self.db_file)
+    def __init__(self, lexicon: Optional[MasterLexicon] = None):
+        """Load the master lexicon (snapshot or CSV), or index a prebuilt one (lexicon compaction)."""
+        self.db_file = lexicon.csv_path if lexicon is not None else _resolve_db_file()
+        self._delta_lock = threading.Lock()
+
+        snapshot = None
+        if lexicon is None:
+            logger.info("Rule-based analysis engine yükleniyor: %s", self.db_file)
+            if app_config.USE_LEXICON_SNAPSHOT:
+                snapshot = load_snapshot(app_config.LEXICON_SNAPSHOT_FILE, self.db_file)
+
+        memo = FuzzySpanMemo(app_config.FUZZY_MEMO_MAX_ENTRIES)
+        if lexicon is not None:
+            self.lexicon = lexicon
+            self.fuzzy_matcher = FuzzyRecoveryMatcher(self.lexicon, memo=memo)
+        elif snapshot is not None:
+            logger.info("Lexicon snapshot kullanılıyor: %s", app_config.LEXICON_SNAPSHOT_FILE)
+            self.lexicon = MasterLexicon(self.db_file, snapshot=snapshot)
+            self.fuzzy_matcher = FuzzyRecoveryMatcher(
+                self.lexicon,
+                buckets=snapshot["fuzzy_buckets"],
+                token_table=snapshot["alias_token_table"],
+                memo=memo,
+            )
+        else:
+            self.lexicon = MasterLexicon(self.db_file)
+            self.fuzzy_matcher = FuzzyRecoveryMatcher(self.lexicon, memo=memo)
         self.matcher = ExactRuleMatcher(self.lexicon)
-        self.fuzzy_matcher = FuzzyRecoveryMatcher(self.lexicon)
+
+        if _fuzzy_prefilter_wanted(self.fuzzy_matcher.alias_count):
+            self.fuzzy_matcher.enable_prefilter(app_config.FUZZY_PREFILTER_MAX_CANDIDATES)
+            logger.info("Fuzzy trigram prefilter aktif: %s alias", self.fuzzy_matcher.alias_count)
+        if app_config.FUZZY_SINGLE_TOKEN_INDEX == "deletion":
+            self.fuzzy_matcher.enable_deletion_index(app_config.FUZZY_DELETION_MAX_DELETES)
+            logger.info("Fuzzy tek-token deletion index aktif (max %s silme)", app_config.FUZZY_DELETION_MAX_DELETES)
+
+        if app_config.FUZZY_MEMO_FILE and memo.enabled:
+            restored = memo.load(app_config.FUZZY_MEMO_FILE, self.lexicon.version)
+            if restored:
+                logger.info("Fuzzy memo yüklendi: %s kayıt", restored)
+
+    def save_fuzzy_memo(self) -> int:
+        """Persist the fuzzy span memo if FOODLENS_FUZZY_MEMO_FILE is configured."""
+        memo = self.fuzzy_matcher.memo
+        if not app_config.FUZZY_MEMO_FILE or not memo.enabled:
+            return 0
+        return memo.save(app_config.FUZZY_MEMO_FILE, self.lexicon.version)
+
+    def apply_lexicon_delta(
+        self,
+        upserts: Iterable[Dict[str, str]] = (),
+        deletes: Iterable[str] = (),
+        append_only: bool = False,
+        csv_state: Optional[Tuple[str, int]] = None,
+    ) -> LexiconOverlay:
+        """
+        Apply record edits in place through a lexicon overlay (see lexicon_delta.py).
+
+        The overlay and the matchers' views of it are built first, then
+        published with one assignment; the fuzzy memo is replaced because its
+        decisions may no longer hold. Unlike a reload, this changes the
+        engine that running requests hold: lookups after the assignment
+        see the new overlay.
+        """
+        with self._delta_lock:
+            overlay = apply_delta(self.lexicon, upserts, deletes, append_only=append_only, csv_state=csv_state)
+            self.matcher.prepare_overlay(overlay)
+            self.fuzzy_matcher.prepare_overlay(overlay)
+            self.lexicon.overlay = overlay
+            self.fuzzy_matcher.memo = FuzzySpanMemo(self.fuzzy_matcher.memo.max_entries)
+        return overlay
+
+    def compacted(self) -> "FoodLensAnalysisEngine":
+        """A new engine whose base tables include this engine's lexicon overlay."""
+        with self._delta_lock:
+            lexicon = compact_lexicon(self.lexicon)
+        return FoodLensAnalysisEngine(lexicon=lexicon)
+
+    def compact(self) -> None:
+        """Switch lexicon and fuzzy tables to their compact, read-only layout."""
+        self.lexicon.compact()
+        self.fuzzy_matcher.compact()
 
     def _extract_inline_claims(self, block: TextBlock) -> List[CandidateSpan]:
         """Extract inline claims (free-from, may-contain, allergen) from non-claim blocks."""
         if block.section_type in {"free_from_section", "may_contain_section", "allergen_section"}:
             return []
 
-        lowered = block.raw_text.lower()
+        cues = line_cue_counts(block.raw_text.lower())
         spans: List[CandidateSpan] = []
 
-        if any(cue in lowered for cue in INLINE_FREE_FROM_CUES):
+        if cues.get("inline_free_from"):
             pseudo = TextBlock(
                 section_type="free_from_section",
                 raw_text=block.raw_text,
@@ -79,7 +152,7 @@ class FoodLensAnalysisEngine:
             )
             spans.extend(extract_claim_spans(pseudo))
 
-        if any(cue in lowered for cue in INLINE_MAY_CONTAIN_CUES):
+        if cues.get("inline_may_contain"):
             pseudo = TextBlock(
                 section_type="may_contain_section",
                 raw_text=block.raw_text,
@@ -89,9 +162,7 @@ class FoodLensAnalysisEngine:
             )
             spans.extend(extract_claim_spans(pseudo))
 
-        has_presence = any(verb in lowered for verb in INLINE_PRESENCE_VERBS)
-        has_allergen_term = any(term in lowered for term in INLINE_ALLERGEN_TERMS)
-        if has_presence and has_allergen_term:
+        if cues.get("inline_presence_verb") and cues.get("inline_allergen_term"):
             pseudo = TextBlock(
                 section_type="allergen_section",
                 raw_text=block.raw_text,
@@ -103,10 +174,20 @@ class FoodLensAnalysisEngine:
 
         return spans
 
-    def _extract_candidates(self, text: str) -> Tuple[List[CandidateSpan], StructuredAnalysis]:
+    def _extract_candidates(
+        self, text: str, trace: Optional[RequestTrace] = None,
+    ) -> Tuple[List[CandidateSpan], StructuredAnalysis]:
         """Run the full extraction pipeline on input text."""
+        if trace is not None:
+            t0 = time.perf_counter()
         _, lines = cleanup_ocr_text(text)
+        if trace is not None:
+            t1 = time.perf_counter()
+            trace.add_time("cleanup", t1 - t0)
         blocks = split_into_blocks(lines)
+        if trace is not None:
+            t2 = time.perf_counter()
+            trace.add_time("segmentation", t2 - t1)
 
         analysis = StructuredAnalysis(blocks=blocks)
         spans: List[CandidateSpan] = []
@@ -122,6 +203,8 @@ class FoodLensAnalysisEngine:
             else:
                 analysis.ignored_blocks.append(block)
 
+        if trace is not None:
+            trace.add_time("extraction", time.perf_counter() - t2)
         return spans, analysis
 
     def _dedupe(self, entities: List[MatchedEntity]) -> List[MatchedEntity]:
@@ -165,35 +248,79 @@ class FoodLensAnalysisEngine:
             return False
         return True
 
-    def analyze_structured(self, text: str) -> StructuredAnalysis:
-        """Full structured analysis with all sections."""
-        spans, analysis = self._extract_candidates(text)
+    def analyze_structured(self, text: str, trace: Optional[RequestTrace] = None) -> StructuredAnalysis:
+        """
+        Full structured analysis with all sections.
+
+        trace collects a per-stage breakdown of this call (see
+        stage_metrics.py); with FOODLENS_STAGE_METRICS on, every call is
+        traced and added to the process-wide histograms.
+        """
+        metrics_on = app_config.STAGE_METRICS
+        if trace is None and not metrics_on:
+            return self._analyze_structured(text, None)
+
+        trace = trace if trace is not None else RequestTrace()
+        token = activate_trace(trace)
+        t0 = time.perf_counter()
+        try:
+            analysis = self._analyze_structured(text, trace)
+        finally:
+            deactivate_trace(token)
+        trace.add_time("total", time.perf_counter() - t0)
+        if metrics_on:
+            get_stage_metrics().observe(trace)
+        return analysis
+
+    def _analyze_structured(self, text: str, trace: Optional[RequestTrace]) -> StructuredAnalysis:
+        spans, analysis = self._extract_candidates(text, trace)
 
         # Deduplicate spans before matching
         spans = self._dedupe_spans(spans)
+        if trace is not None:
+            trace.count("spans", len(spans))
 
         matched_present: List[MatchedEntity] = []
         matched_may: List[MatchedEntity] = []
         matched_absent: List[MatchedEntity] = []
 
         for span in spans:
+            if trace is not None:
+                t0 = time.perf_counter()
             # Try exact match first
             entity = self.matcher.match_span(span)
+            entities = [entity] if entity is not None else []
+
+            # Exact aliases inside spans whose separators were lost
+            if not entities:
+                entities = self.matcher.match_span_parts(span)
+            if trace is not None:
+                t1 = time.perf_counter()
+                trace.add_time("exact", t1 - t0)
+                if entities:
+                    trace.count("exact_hits")
 
             # Fall back to fuzzy recovery (only for worthy candidates)
-            if entity is None and self._is_fuzzy_worthy(span):
+            if not entities and self._is_fuzzy_worthy(span):
                 entity = self.fuzzy_matcher.match_span(span)
-
-            if entity is None:
+                entities = [entity] if entity is not None else []
+                if trace is not None:
+                    trace.add_time("fuzzy", time.perf_counter() - t1)
+                    trace.count("fuzzy_attempts")
+                    if entities:
+                        trace.count("fuzzy_hits")
+
+            if not entities:
                 analysis.unmatched_spans.append(span)
                 continue
 
-            if entity.polarity == "may_contain":
-                matched_may.append(entity)
-            elif entity.polarity == "absent":
-                matched_absent.append(entity)
-            else:
-                matched_present.append(entity)
+            for entity in entities:
+                if entity.polarity == "may_contain":
+                    matched_may.append(entity)
+                elif entity.polarity == "absent":
+                    matched_absent.append(entity)
+                else:
+                    matched_present.append(entity)
 
         analysis.present = self._dedupe(matched_present)
         analysis.may_contain = self._dedupe(matched_may)
@@ -222,9 +349,17 @@ class FoodLensAnalysisEngine:
         return {
             "status": "ok",
             "db_file": str(self.db_file),
-            "item_count": len(self.lexicon.records),
+            "lexicon_version": self.lexicon.version,
+            "lexicon_source": self.lexicon.source,
+            "lexicon_overlay": self.lexicon.overlay.stats() if self.lexicon.overlay is not None else None,
+            "item_count": len(self.lexicon.store),
             "exact_alias_count": len(self.lexicon.alias_map),
             "search_alias_count": len(self.lexicon.alias_map),
+            "exact_automaton_states": self.matcher.automaton.state_count,
+            "fuzzy_memo": self.fuzzy_matcher.memo.stats(),
+            "normalize_cache": normalization_cache_stats(),
+            "fuzzy_prefilter": self.fuzzy_matcher.prefilter_enabled,
+            "fuzzy_single_token_index": self.fuzzy_matcher.single_token_index,
             "semantic_enabled": False,
             "analysis_mode": "rule_based_sections_v3_pro",
         }
@@ -0,0 +1,116 @@
+"""
+Alias Automaton — Aho-Corasick scan for every exact alias inside a text.
+
+Exact matching used to happen only per extracted span (whole span ==
+alias). When OCR drops the separators ("seker tuz bitkisel yag"), the span
+never matches exactly and fuzzy n-gram windows have to recover each
+ingredient.
+
+The automaton is built over the folded alias_map keys with whole words as
+its alphabet, so word boundaries are enforced by construction. scan()
+walks the folded text once and reports every alias occurrence with its
+character offsets. Time is linear in the text length plus the number of
+hits.
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from ..preprocessing.normalize import ascii_fold
+
+WORD_RE = re.compile(r"\S+")
+
+
+class AliasHit(NamedTuple):
+    start: int  # character offsets into the folded text
+    end: int
+    first_word: int  # word offsets into the folded text
+    last_word: int
+    key: str
+
+
+class AliasAutomaton:
+    def __init__(self, keys: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._key: List[Optional[str]] = [None]
+        self._key_words: List[int] = [0]
+        self._output_link: List[int] = [-1]
+
+        for key in keys:
+            self._insert(key)
+        self._link()
+
+    @classmethod
+    def from_alias_map(cls, alias_map: Dict[str, object]) -> "AliasAutomaton":
+        """Automaton over the alias_map keys that are already in folded form."""
+        return cls(key for key in alias_map if key and ascii_fold(key) == key)
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def _insert(self, key: str) -> None:
+        words = key.split()
+        if not words:
+            return
+        state = 0
+        for word in words:
+            nxt = self._goto[state].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._key.append(None)
+                self._key_words.append(0)
+                self._output_link.append(-1)
+                self._goto[state][word] = nxt
+            state = nxt
+        self._key[state] = key
+        self._key_words[state] = len(words)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                suffix = self._fail[nxt]
+                self._output_link[nxt] = suffix if self._key[suffix] is not None else self._output_link[suffix]
+                queue.append(nxt)
+
+    def scan(self, folded_text: str) -> List[AliasHit]:
+        """All alias occurrences in folded_text (already ascii_fold'ed), in end order."""
+        spans = [(m.start(), m.end(), m.group()) for m in WORD_RE.finditer(folded_text)]
+        hits: List[AliasHit] = []
+        state = 0
+
+        for position, (_start, end, word) in enumerate(spans):
+            while state and word not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(word, 0)
+
+            out = state if self._key[state] is not None else self._output_link[state]
+            while out > 0:
+                first = position - self._key_words[out] + 1
+                hits.append(AliasHit(spans[first][0], end, first, position, self._key[out]))
+                out = self._output_link[out]
+
+        return hits
+
+
+def leftmost_longest(hits: List[AliasHit]) -> List[AliasHit]:
+    """Non-overlapping hits, preferring the earliest start and then the longest alias."""
+    chosen: List[AliasHit] = []
+    next_word = 0
+    for hit in sorted(hits, key=lambda h: (h.first_word, -h.last_word)):
+        if hit.first_word >= next_word:
+            chosen.append(hit)
+            next_word = hit.last_word + 1
+    return chosen
@@ -0,0 +1,99 @@
+"""
+Alias Token Table — prefolded alias tokens for the fuzzy hot loop.
+
+Fuzzy candidates used to be re-tokenized on every hit (normalize_for_matching
+plus ascii_fold per alias). Aliases never change after load, so their
+folded tokens are computed once at index build time and stored as:
+
+  - token_strings: distinct folded tokens (token id -> string)
+  - token_lengths: token length per token id
+  - forward_codes / reverse_codes: code points padded to a fixed width,
+    used for vectorized positional prefix/suffix match counts
+  - alias_token_ids: per alias index, the tuple of its token ids
+
+The table is picklable so it can be shipped inside the lexicon snapshot.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Padding values never equal a real code point, and never equal each other,
+# so padded positions contribute nothing to positional match counts.
+QUERY_PAD = 0
+ALIAS_PAD = 0xFFFF
+
+
+def encode_tokens(tokens: Sequence[str], width: int, pad: int, reverse: bool = False) -> np.ndarray:
+    codes = np.full((len(tokens), width), pad, dtype=np.uint16)
+    for row, token in enumerate(tokens):
+        chars = token[::-1] if reverse else token
+        for col, ch in enumerate(chars[:width]):
+            codes[row, col] = min(ord(ch), ALIAS_PAD - 1)
+    return codes
+
+
+class AliasTokenTable:
+    def __init__(self, width: int):
+        self.width = width
+        self.token_strings: List[str] = []
+        self.token_lengths = np.zeros(0, dtype=np.uint16)
+        self.forward_codes = np.zeros((0, width), dtype=np.uint16)
+        self.reverse_codes = np.zeros((0, width), dtype=np.uint16)
+        self.alias_token_ids: List[Tuple[int, ...]] = []
+
+    @classmethod
+    def build(cls, aliases: Iterable[str], tokenize: Callable[[str], List[str]], width: int) -> "AliasTokenTable":
+        table = cls(width)
+        token_ids: Dict[str, int] = {}
+
+        for alias in aliases:
+            ids = []
+            for token in tokenize(alias):
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    token_id = len(table.token_strings)
+                    token_ids[token] = token_id
+                    table.token_strings.append(token)
+                ids.append(token_id)
+            table.alias_token_ids.append(tuple(ids))
+
+        table.token_lengths = np.array([len(t) for t in table.token_strings], dtype=np.uint16)
+        table.forward_codes = encode_tokens(table.token_strings, width, ALIAS_PAD)
+        table.reverse_codes = encode_tokens(table.token_strings, width, ALIAS_PAD, reverse=True)
+        return table
+
+    def extended(self, aliases: Iterable[str], tokenize: Callable[[str], List[str]]) -> "AliasTokenTable":
+        """
+        A new table with aliases appended after this table's aliases.
+
+        Existing token and alias ids keep their meaning; only unseen tokens
+        get new ids. Used for lexicon overlays, which must not modify the
+        base table that requests are reading.
+        """
+        table = AliasTokenTable(self.width)
+        table.token_strings = list(self.token_strings)
+        table.alias_token_ids = list(self.alias_token_ids)
+        token_ids = {token: token_id for token_id, token in enumerate(self.token_strings)}
+        new_tokens: List[str] = []
+
+        for alias in aliases:
+            ids = []
+            for token in tokenize(alias):
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    token_id = len(table.token_strings)
+                    token_ids[token] = token_id
+                    table.token_strings.append(token)
+                    new_tokens.append(token)
+                ids.append(token_id)
+            table.alias_token_ids.append(tuple(ids))
+
+        table.token_lengths = np.concatenate([self.token_lengths, np.array([len(t) for t in new_tokens], dtype=np.uint16)])
+        table.forward_codes = np.concatenate([self.forward_codes, encode_tokens(new_tokens, self.width, ALIAS_PAD)])
+        table.reverse_codes = np.concatenate([self.reverse_codes, encode_tokens(new_tokens, self.width, ALIAS_PAD, reverse=True)])
+        return table
+
+    def tokens_for(self, alias_index: int) -> Tuple[int, ...]:
+        return self.alias_token_ids[alias_index]
@@ -0,0 +1,132 @@
+"""
+Deletion Index — SymSpell-style candidate search for single-token recovery.
+
+Single-token thresholds (_single_token_thresholds) demand WRatio scores of
+84-98, i.e. a few edits from exact. For one-word strings whose length ratio
+is below 1.5, WRatio is plain Indel ratio, and ratio >= cutoff bounds the
+longest common subsequence (LCS). Two strings whose LCS needs at most
+max_deletes deletions from each side share a deletion variant. So every
+alias that can pass is found by looking up the query's own deletion
+variants.
+
+Lengths the dictionary cannot cover exactly fall back to a per-length-bucket
+scan with a cheap upper bound (character bag overlap >= required LCS):
+  - lengths where the needed deletions exceed max_deletes
+  - lengths with ratio >= 1.5, where WRatio switches to partial_ratio * 0.9
+    (reachable only for cutoffs <= 90)
+
+Aliases containing whitespace (token ratios apply) are always candidates.
+
+candidates() therefore returns a superset of every alias with
+WRatio(query, alias) >= score_cutoff. Scoring that superset (ascending
+order) gives the same top-k as scanning the whole bucket.
+"""
+from __future__ import annotations
+
+import math
+from itertools import combinations
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+
+from .qgram_index import WRATIO_PARTIAL_SCALE, length_window
+
+BAG_BINS = 64
+SCORE_EPS = 1e-9
+
+
+def deletion_variants(text: str, max_deletes: int) -> Set[str]:
+    variants = {text}
+    for deletes in range(1, min(max_deletes, len(text)) + 1):
+        for positions in combinations(range(len(text)), deletes):
+            drop = set(positions)
+            variants.add("".join(ch for i, ch in enumerate(text) if i not in drop))
+    return variants
+
+
+def char_bag(text: str) -> np.ndarray:
+    bag = np.zeros(BAG_BINS, dtype=np.int32)
+    for ch in text:
+        bag[ord(ch) % BAG_BINS] += 1
+    return bag
+
+
+def required_lcs(query_len: int, alias_len: int, score_cutoff: float) -> float:
+    """Smallest LCS that still lets WRatio reach score_cutoff for these two lengths."""
+    total = query_len + alias_len
+    need = score_cutoff / 100.0 * total / 2.0
+    short, long_ = min(query_len, alias_len), max(query_len, alias_len)
+    if long_ >= 1.5 * short:
+        partial = score_cutoff / (WRATIO_PARTIAL_SCALE / 100.0)
+        if partial <= 100.0:
+            need = min(need, partial * short / (200.0 - partial))
+    return need - SCORE_EPS
+
+
+class DeletionIndex:
+    def __init__(self, strings: Iterable[str], max_deletes: int = 2):
+        self.max_deletes = max_deletes
+        deletes: Dict[str, List[int]] = {}
+        lengths: List[int] = []
+        bags: List[np.ndarray] = []
+        spaced: List[bool] = []
+
+        for index, text in enumerate(strings):
+            lengths.append(len(text))
+            bags.append(char_bag(text))
+            has_space = len(text.split()) != 1 or text != text.strip()
+            spaced.append(has_space)
+            if has_space:
+                continue
+            for variant in deletion_variants(text, max_deletes):
+                deletes.setdefault(variant, []).append(index)
+
+        self.size = len(lengths)
+        self.lengths = np.array(lengths, dtype=np.int32)
+        self.bags = np.array(bags, dtype=np.int32).reshape(self.size, BAG_BINS)
+        self.spaced = np.array(spaced, dtype=bool)
+        self.deletes: Dict[str, tuple] = {key: tuple(ids) for key, ids in deletes.items()}
+
+    def candidates(self, query: str, score_cutoff: float) -> List[int]:
+        """Ascending alias indexes that may reach score_cutoff (see module docstring)."""
+        n = len(query)
+        low, high = length_window(n, score_cutoff)
+        high = min(high, int(self.lengths.max(initial=0)))
+        if n == 0 or low > high:
+            return []
+        in_window = (self.lengths >= low) & (self.lengths <= high)
+        if len(query.split()) != 1:
+            # Token ratios apply to multi-word queries; only the length window is safe
+            return np.flatnonzero(in_window).tolist()
+
+        covered = np.zeros(high + 1, dtype=bool)
+        bag_need = np.full(high + 1, np.inf)
+        depth = 0
+        for m in range(low, high + 1):
+            need = required_lcs(n, m, score_cutoff)
+            lcs = max(0, math.ceil(need))
+            if lcs > min(n, m):
+                continue
+            deletes = max(n - lcs, m - lcs)
+            if max(n, m) < 1.5 * min(n, m) and deletes <= self.max_deletes:
+                covered[m] = True
+                depth = max(depth, deletes)
+            else:
+                bag_need[m] = need
+
+        lengths = np.minimum(self.lengths, high)
+        selected = in_window & self.spaced
+
+        scan = in_window & ~self.spaced & np.isfinite(bag_need[lengths])
+        if scan.any():
+            rows = np.flatnonzero(scan)
+            overlap = np.minimum(self.bags[rows], char_bag(query)).sum(axis=1)
+            selected[rows[overlap >= bag_need[lengths[rows]]]] = True
+
+        if covered.any():
+            for variant in deletion_variants(query, depth):
+                for index in self.deletes.get(variant, ()):
+                    if in_window[index] and covered[self.lengths[index]]:
+                        selected[index] = True
+
+        return np.flatnonzero(selected).tolist()
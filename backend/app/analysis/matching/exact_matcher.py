@@ -1,24 +1,65 @@
 from __future__ import annotations
 
+from typing import List, Optional, Tuple
+
+from ..preprocessing.normalize import fold_tokens, normalize_for_matching
 from ..schemas import CandidateSpan, MatchedEntity
+from .alias_automaton import AliasAutomaton, AliasHit, leftmost_longest
+from .fuzzy_recovery import STOP_TOKENS
 from .lexicon import MasterLexicon
 
+PART_SCAN_SECTIONS = {"ingredient_section"}
+
+
+def span_words(span: CandidateSpan) -> Tuple[str, ...]:
+    """
+    The span's words as written, aligned with span.tokens: the OCR words when
+    each folds to its token, else the normalized words (Turkish letters kept,
+    punctuation split off), which always align.
+    """
+    words = span.raw_text.split()
+    if len(words) == len(span.tokens) and all(fold_tokens(word) == (token,) for word, token in zip(words, span.tokens)):
+        return tuple(words)
+    return tuple(normalize_for_matching(span.normalized_text or span.raw_text).split())
+
 
 class ExactRuleMatcher:
     def __init__(self, lexicon: MasterLexicon):
         self.lexicon = lexicon
+        self.automaton = AliasAutomaton.from_alias_map(lexicon.alias_map)
+        # (overlay, automaton over its added aliases) for the lexicon's current overlay
+        self._overlay_automaton: Tuple[object, Optional[AliasAutomaton]] = (None, None)
+
+    def prepare_overlay(self, overlay) -> None:
+        """Build the automaton for an overlay's added aliases before it is published."""
+        self._overlay_automaton = (overlay, AliasAutomaton.from_alias_map(dict.fromkeys(overlay.added_aliases)))
+
+    def _scan(self, folded: str) -> List[AliasHit]:
+        hits = self.automaton.scan(folded)
+        overlay = self.lexicon.overlay
+        if overlay is None:
+            return hits
+
+        if self._overlay_automaton[0] is not overlay:
+            self.prepare_overlay(overlay)
+        automaton = self._overlay_automaton[1]
+        dead = overlay.dead_aliases
+        if dead:
+            hits = [hit for hit in hits if hit.key not in dead]
+        return hits + [hit for hit in automaton.scan(folded) if hit.key not in dead]
 
     def match_span(self, span: CandidateSpan) -> MatchedEntity | None:
-        record = self.lexicon.exact_lookup(span.normalized_text or span.raw_text, span.section_type)
-        if not record:
+        record_id = self.lexicon.exact_lookup_id(span.normalized_text or span.raw_text, span.section_type)
+        if record_id is None:
             return None
 
+        item_id, name, item_type, risk_level, description = self.lexicon.store.fields(record_id)
         return MatchedEntity(
-            item_id=record["id"],
-            name=record["name"],
-            item_type=record["item_type"],
-            risk_level=record["risk_level"],
-            description=record["description"],
+            item_id=item_id,
+            name=name,
+            item_type=item_type,
+            risk_level=risk_level,
+            description=description,
             matched_key=span.normalized_text or span.raw_text,
             raw_query=span.raw_text,
             match_type="exact",
@@ -27,3 +68,58 @@ class ExactRuleMatcher:
             source_section=span.section_type,
             source_text=span.evidence,
         )
+
+    def match_span_parts(self, span: CandidateSpan) -> List[MatchedEntity]:
+        """
+        Exact aliases inside a span whose separators were lost ("seker tuz su").
+
+        Hits come from one automaton scan of the folded span text. They are
+        returned only when they cover every word of the span apart from
+        connector/stop words; otherwise the span is left to fuzzy recovery.
+        Only ingredient-list spans are scanned: claim spans carry polarity,
+        and splitting them would spread one claim over unrelated items.
+        """
+        if span.section_type not in PART_SCAN_SECTIONS:
+            return []
+
+        folded = span.folded_text
+        hits = leftmost_longest(self._scan(folded))
+        if not hits:
+            return []
+
+        # Resolve first: a hit whose alias has no record for this section
+        # covers nothing, so its words send the span to fuzzy recovery
+        resolved = []
+        for hit in hits:
+            record_id = self.lexicon.exact_lookup_id(hit.key, span.section_type)
+            if record_id is not None:
+                resolved.append((hit, record_id))
+
+        covered = set()
+        for hit, _ in resolved:
+            covered.update(range(hit.first_word, hit.last_word + 1))
+        if not resolved or any(
+            i not in covered and len(word) >= 2 and word not in STOP_TOKENS for i, word in enumerate(span.tokens)
+        ):
+            return []
+
+        store = self.lexicon.store
+        words = span_words(span)
+        entities = []
+        for hit, record_id in resolved:
+            item_id, name, item_type, risk_level, description = store.fields(record_id)
+            entities.append(MatchedEntity(
+                item_id=item_id,
+                name=name,
+                item_type=item_type,
+                risk_level=risk_level,
+                description=description,
+                matched_key=hit.key,
+                raw_query=" ".join(words[hit.first_word:hit.last_word + 1]),
+                match_type="exact_scan",
+                match_score=100,
+                polarity=span.polarity,
+                source_section=span.section_type,
+                source_text=span.evidence,
+            ))
+        return entities
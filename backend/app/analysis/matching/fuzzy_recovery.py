@@ -3,9 +3,16 @@ Fuzzy Recovery Matcher — matches OCR-corrupted ingredient text to database ent
 
 Performance optimizations:
   - Aliases bucketed by token count (1-token queries only search 1-token aliases)
+  - Query×alias token scores computed as one rapidfuzz cdist matrix per candidate batch
+  - Alias tokens prefolded once at index build time (AliasTokenTable)
+  - Optional trigram prefilter (QGramIndex) shortlists aliases before WRatio
+  - Optional exact deletion index (DeletionIndex) for single-token queries
+  - WRatio score cutoffs at the lowest threshold any candidate could pass
   - Max alias length cap (40 chars — real ingredient names are short)
   - Reduced rapidfuzz candidate limits
   - N-gram sub-matching capped at 6 tokens
+  - Lexicon edits (lexicon_delta.py) search small overlay buckets next to the
+    unchanged base buckets instead of rebuilding them
 
 Anti-hallucination:
   - Ambiguous matches (close scores to different items) are rejected
@@ -15,13 +22,20 @@ Anti-hallucination:
 from __future__ import annotations
 
 import re
-from typing import Dict, List, Optional
+import sys
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from rapidfuzz import fuzz, process
 
-from ..preprocessing.normalize import ascii_fold, normalize_for_matching
+from ..preprocessing.normalize import ascii_fold, fold_tokens, normalize_for_matching
 from ..schemas import CandidateSpan, MatchedEntity
+from ..stage_metrics import current_trace
+from .alias_tokens import QUERY_PAD, AliasTokenTable, encode_tokens
+from .deletion_index import DeletionIndex
 from .lexicon import MasterLexicon, TYPE_PRIORITY_BY_SECTION, TYPE_PRIORITY_DEFAULT
+from .qgram_index import QGramIndex
+from .span_memo import FuzzySpanMemo, memo_value_from_entity
 
 STOP_TOKENS = {
     "ve", "veya", "ile", "icin", "için", "olan", "olarak", "from", "with",
@@ -33,33 +47,142 @@ STOP_TOKENS = {
 ECODE_RE = re.compile(r"^e[\s\-]?(\d{3,4})([a-z]?)$", re.IGNORECASE)
 MAX_FUZZY_ALIAS_LEN = 25
 
+# Lowest min_fs in _multi_token_thresholds; weaker WRatio scores are never accepted
+MULTI_TOKEN_MIN_FUZZY_SCORE = 79.0
+
+
+BUCKET_NAMES = ("single_aliases", "single_folded", "multi_aliases", "multi_folded")
+
+
+def build_alias_buckets(alias_map: Dict[str, list]) -> Dict[str, List[str]]:
+    """Split lexicon aliases into single/multi-token buckets with their folded forms."""
+    buckets: Dict[str, List[str]] = {name: [] for name in BUCKET_NAMES}
+
+    for alias in alias_map.keys():
+        if len(alias) > MAX_FUZZY_ALIAS_LEN or len(alias) < 2:
+            continue
+        folded = ascii_fold(alias)
+        token_count = len(folded.split())
+        if token_count <= 1:
+            buckets["single_aliases"].append(alias)
+            buckets["single_folded"].append(folded)
+        else:
+            buckets["multi_aliases"].append(alias)
+            buckets["multi_folded"].append(folded)
+
+    return buckets
+
+
+class OverlayBuckets:
+    """
+    Fuzzy view of a lexicon overlay (lexicon_delta.py): the overlay's added
+    aliases bucketed like the base ones, plus the base token table extended
+    with their tokens. Added aliases get table indexes from offset on.
+    """
+    __slots__ = ("overlay", "single_count", "all_aliases", "all_folded", "single_folded", "table", "offset")
+
+    def __init__(self, overlay, base_table: AliasTokenTable, offset: int, tokenize):
+        buckets = build_alias_buckets(dict.fromkeys(overlay.added_aliases))
+        self.overlay = overlay
+        self.single_count = len(buckets["single_aliases"])
+        self.all_aliases = buckets["single_aliases"] + buckets["multi_aliases"]
+        self.all_folded = buckets["single_folded"] + buckets["multi_folded"]
+        self.single_folded = buckets["single_folded"]
+        self.table = base_table.extended(self.all_aliases, tokenize)
+        self.offset = offset
+
 
 class FuzzyRecoveryMatcher:
-    def __init__(self, lexicon: MasterLexicon):
+    def __init__(
+        self,
+        lexicon: MasterLexicon,
+        buckets: Optional[Dict[str, List[str]]] = None,
+        memo: Optional[FuzzySpanMemo] = None,
+        token_table: Optional[AliasTokenTable] = None,
+    ):
         self.lexicon = lexicon
+        self.memo = memo if memo is not None else FuzzySpanMemo(0)
 
-        # Build bucketed alias lists for fast lookup
-        self._single_aliases: List[str] = []
-        self._single_folded: List[str] = []
-        self._multi_aliases: List[str] = []
-        self._multi_folded: List[str] = []
-
-        for alias in self.lexicon.alias_map.keys():
-            if len(alias) > MAX_FUZZY_ALIAS_LEN or len(alias) < 2:
-                continue
-            folded = ascii_fold(alias)
-            token_count = len(folded.split())
-            if token_count <= 1:
-                self._single_aliases.append(alias)
-                self._single_folded.append(folded)
-            else:
-                self._multi_aliases.append(alias)
-                self._multi_folded.append(folded)
+        # Build bucketed alias lists for fast lookup (or reuse prebuilt ones from a snapshot)
+        if buckets is None:
+            buckets = build_alias_buckets(self.lexicon.alias_map)
+        self._single_aliases: List[str] = buckets["single_aliases"]
+        self._single_folded: List[str] = buckets["single_folded"]
+        self._multi_aliases: List[str] = buckets["multi_aliases"]
+        self._multi_folded: List[str] = buckets["multi_folded"]
 
         # Combined list for multi-token queries (search both buckets)
         self._all_aliases = self._single_aliases + self._multi_aliases
         self._all_folded = self._single_folded + self._multi_folded
 
+        # Prefolded tokens per alias, indexed like _all_aliases (single bucket first,
+        # so single-bucket indexes are valid table indexes too)
+        if token_table is None:
+            token_table = AliasTokenTable.build(self._all_aliases, self._tokens, MAX_FUZZY_ALIAS_LEN)
+        self.token_table = token_table
+
+        # Trigram shortlists over the folded buckets (None means brute-force WRatio)
+        self.prefilter_max_candidates = 0
+        self._single_index: Optional[QGramIndex] = None
+        self._all_index: Optional[QGramIndex] = None
+        self._single_deletion_index: Optional[DeletionIndex] = None
+        self._overlay_buckets: Optional[OverlayBuckets] = None
+
+    @property
+    def alias_count(self) -> int:
+        return len(self._all_aliases)
+
+    @property
+    def prefilter_enabled(self) -> bool:
+        return self._all_index is not None
+
+    def enable_prefilter(self, max_candidates: int) -> None:
+        """Build trigram indexes so each query is scored against at most max_candidates aliases."""
+        self.prefilter_max_candidates = max_candidates
+        self._single_index = QGramIndex(self._single_folded)
+        self._all_index = QGramIndex(self._all_folded)
+
+    @property
+    def single_token_index(self) -> str:
+        if self._single_deletion_index is not None:
+            return "deletion"
+        return "prefilter" if self._single_index is not None else "wratio"
+
+    def enable_deletion_index(self, max_deletes: int) -> None:
+        """Answer single-token queries from a SymSpell-style deletion index (same decisions as a full scan)."""
+        self._single_deletion_index = DeletionIndex(self._single_folded, max_deletes)
+
+    def compact(self) -> None:
+        """Intern bucket strings so forked workers share them with the lexicon keys."""
+        for name in BUCKET_NAMES:
+            bucket = getattr(self, f"_{name}")
+            bucket[:] = [sys.intern(value) for value in bucket]
+        self._all_aliases = self._single_aliases + self._multi_aliases
+        self._all_folded = self._single_folded + self._multi_folded
+        self.token_table.token_strings[:] = [sys.intern(t) for t in self.token_table.token_strings]
+
+    def export_buckets(self) -> Dict[str, List[str]]:
+        return {
+            "single_aliases": self._single_aliases,
+            "single_folded": self._single_folded,
+            "multi_aliases": self._multi_aliases,
+            "multi_folded": self._multi_folded,
+        }
+
+    def prepare_overlay(self, overlay) -> None:
+        """Bucket an overlay's added aliases before the overlay is published."""
+        self._overlay_buckets = OverlayBuckets(overlay, self.token_table, len(self._all_aliases), self._tokens)
+
+    def _overlay_view(self) -> Optional[OverlayBuckets]:
+        overlay = self.lexicon.overlay
+        if overlay is None:
+            return None
+        view = self._overlay_buckets
+        if view is None or view.overlay is not overlay:
+            self.prepare_overlay(overlay)
+            view = self._overlay_buckets
+        return view
+
     def _normalize(self, text: str) -> str:
         return normalize_for_matching(text or "")
 
@@ -67,8 +190,73 @@ class FuzzyRecoveryMatcher:
         return ascii_fold(text or "")
 
     def _tokens(self, text: str) -> List[str]:
-        normalized = self._fold(self._normalize(text))
-        return [t for t in normalized.split() if len(t) >= 2 and t not in STOP_TOKENS]
+        # Same words as CandidateSpan.tokens: folding already normalizes
+        return [t for t in fold_tokens(text or "") if len(t) >= 2 and t not in STOP_TOKENS]
+
+    def _span_tokens(self, span: CandidateSpan) -> List[str]:
+        return [t for t in span.tokens if len(t) >= 2 and t not in STOP_TOKENS]
+
+    def _single_shortlist(self, folded_q: str, score_cutoff: float) -> Optional[List[int]]:
+        if self._single_deletion_index is not None:
+            return self._single_deletion_index.candidates(folded_q, score_cutoff)
+        if self._single_index is not None:
+            return self._single_index.shortlist(folded_q, self.prefilter_max_candidates, score_cutoff)
+        return None
+
+    def _multi_shortlist(self, folded_q: str, score_cutoff: float) -> Optional[List[int]]:
+        if self._all_index is not None:
+            return self._all_index.shortlist(folded_q, self.prefilter_max_candidates, score_cutoff)
+        return None
+
+    def _extract(self, folded_q: str, choices: List[str], shortlist: Optional[List[int]], limit: int, score_cutoff: float):
+        """process.extract over choices, restricted to shortlist (ascending choice indexes) when given."""
+        if shortlist is None:
+            return process.extract(
+                folded_q, choices,
+                scorer=fuzz.WRatio, processor=None, limit=limit, score_cutoff=score_cutoff,
+            )
+
+        matches = process.extract(
+            folded_q, [choices[i] for i in shortlist],
+            scorer=fuzz.WRatio, processor=None, limit=limit, score_cutoff=score_cutoff,
+        )
+        return [(choice, score, shortlist[position]) for choice, score, position in matches]
+
+    def _search(
+        self, view: Optional[OverlayBuckets], folded_q: str, single_only: bool,
+        shortlist: Optional[List[int]], limit: int, score_cutoff: float,
+    ) -> List[Tuple[str, float, int]]:
+        """
+        Top fuzzy aliases as (alias, WRatio score, token table index).
+
+        Without an overlay this is _extract over the base bucket. With one,
+        aliases the overlay removed are skipped (the base search fetches
+        that many extra results to make up for them). The overlay's added
+        aliases are scored too. Ties are ordered as a rebuilt bucket would
+        order them: base single, added single, base multi, added multi.
+        """
+        aliases = self._single_aliases if single_only else self._all_aliases
+        choices = self._single_folded if single_only else self._all_folded
+        if view is None:
+            return [(aliases[i], score, i) for _choice, score, i in self._extract(folded_q, choices, shortlist, limit, score_cutoff)]
+
+        dead = view.overlay.dead_aliases
+        single_count = len(self._single_aliases)
+        found = [
+            ((-score, 0 if i < single_count else 2, i), aliases[i], score, i)
+            for _choice, score, i in self._extract(folded_q, choices, shortlist, limit + len(dead), score_cutoff)
+            if aliases[i] not in dead
+        ]
+        added = process.extract(
+            folded_q, view.single_folded if single_only else view.all_folded,
+            scorer=fuzz.WRatio, processor=None, limit=limit + len(dead), score_cutoff=score_cutoff,
+        )
+        for _choice, score, j in added:
+            alias = view.all_aliases[j]
+            if alias not in dead:
+                found.append(((-score, 1 if j < view.single_count else 3, j), alias, score, view.offset + j))
+        found.sort(key=lambda item: item[0])
+        return [(alias, score, index) for _rank, alias, score, index in found[:limit]]
 
     # ── E-code matching ─────────────────────────────────────────────────────
 
@@ -82,12 +270,13 @@ class FuzzyRecoveryMatcher:
                 return None
 
         ecode = f"e{m.group(1)}{m.group(2)}".lower()
-        record = self.lexicon.exact_lookup(ecode, span.section_type)
-        if record:
+        record_id = self.lexicon.exact_lookup_id(ecode, span.section_type)
+        if record_id is not None:
+            item_id, name, item_type, risk_level, description = self.lexicon.store.fields(record_id)
             return MatchedEntity(
-                item_id=record["id"], name=record["name"],
-                item_type=record["item_type"], risk_level=record["risk_level"],
-                description=record["description"], matched_key=ecode,
+                item_id=item_id, name=name,
+                item_type=item_type, risk_level=risk_level,
+                description=description, matched_key=ecode,
                 raw_query=span.raw_text, match_type="ecode_recovery",
                 match_score=98, polarity=span.polarity,
                 source_section=span.section_type, source_text=span.evidence,
@@ -122,22 +311,75 @@ class FuzzyRecoveryMatcher:
 
         return max(0.0, min(score, 1.0))
 
-    def _best_token_alignment(self, query_tokens: List[str], alias_tokens: List[str]):
-        if not query_tokens or not alias_tokens:
+    def _token_score_matrix(self, query_tokens: List[str], token_ids: List[int], table: AliasTokenTable) -> np.ndarray:
+        """
+        Vectorized _token_match_score for every (query token, alias token id) pair.
+
+        Query tokens are already folded (see _tokens); alias tokens come
+        prefolded from the token table. WRatio and ratio come from one
+        rapidfuzz cdist call each; prefix/suffix counts, lengths and the
+        first-character guard are array operations on the table's code
+        rows. Terms are applied in the same order as the scalar version,
+        so every cell is bit-identical to _token_match_score(q, a).
+        """
+        alias_strings = [table.token_strings[i] for i in token_ids]
+        ids = np.asarray(token_ids, dtype=np.intp)
+
+        wr = process.cdist(query_tokens, alias_strings, scorer=fuzz.WRatio, processor=None, dtype=np.float64) / 100.0
+        ratio = process.cdist(query_tokens, alias_strings, scorer=fuzz.ratio, processor=None, dtype=np.float64) / 100.0
+
+        q_forward = encode_tokens(query_tokens, table.width, QUERY_PAD)[:, None, :]
+        q_reverse = encode_tokens(query_tokens, table.width, QUERY_PAD, reverse=True)[:, None, :]
+        a_forward = table.forward_codes[ids][None, :, :]
+        a_reverse = table.reverse_codes[ids][None, :, :]
+        prefix_len = (q_forward == a_forward).sum(axis=2).astype(np.float64)
+        suffix_len = (q_reverse == a_reverse).sum(axis=2).astype(np.float64)
+        first_char_same = q_forward[:, :, 0] == a_forward[:, :, 0]
+
+        q_len = np.array([len(q) for q in query_tokens], dtype=np.float64)[:, None]
+        a_len = table.token_lengths[ids].astype(np.float64)[None, :]
+        min_len = np.minimum(q_len, a_len)
+        max_len = np.maximum(np.maximum(q_len, a_len), 1.0)
+
+        score = 0.55 * wr + 0.25 * ratio + 0.12 * (np.minimum(prefix_len, 4.0) / 4.0) + 0.08 * (np.minimum(suffix_len, 3.0) / 3.0)
+        score -= 0.12 * np.abs(q_len - a_len) / max_len
+        score -= np.where(first_char_same, 0.0, np.where(min_len <= 6, 0.25, 0.10))
+        score = np.maximum(0.0, np.minimum(score, 1.0))
+
+        exact = (prefix_len == q_len) & (q_len == a_len)
+        score[exact] = 1.0
+        score[np.broadcast_to((q_len == 0) | (a_len == 0), score.shape)] = 0.0
+        return score
+
+    @staticmethod
+    def _alignment_from_matrix(scores: np.ndarray):
+        """Coverage/precision/anchor stats from a query×alias token score matrix."""
+        if scores.size == 0:
             return 0.0, 0.0, 0.0, 0.0
 
-        q_scores = [max((self._token_match_score(q, a) for a in alias_tokens), default=0.0) for q in query_tokens]
-        a_scores = [max((self._token_match_score(q, a) for q in query_tokens), default=0.0) for a in alias_tokens]
+        q_scores = scores.max(axis=1).tolist()
+        a_scores = scores.max(axis=0).tolist()
 
         return (
             sum(q_scores) / len(q_scores),
             sum(a_scores) / len(a_scores),
             sum(1 for s in q_scores if s >= 0.97) / len(q_scores),
-            min(q_scores) if q_scores else 0.0,
+            min(q_scores),
         )
 
-    def _candidate_priority(self, record: Dict[str, str], section_type: str) -> int:
-        return TYPE_PRIORITY_BY_SECTION.get(section_type, TYPE_PRIORITY_DEFAULT).get(record.get("item_type", ""), 0)
+    def _candidate_priority(self, record_id: int, section_type: str) -> int:
+        return TYPE_PRIORITY_BY_SECTION.get(section_type, TYPE_PRIORITY_DEFAULT).get(self.lexicon.store.item_type(record_id), 0)
+
+    def _entity_from_candidate(self, span: CandidateSpan, candidate: Dict[str, Any]) -> MatchedEntity:
+        item_id, name, item_type, risk_level, description = self.lexicon.store.fields(candidate["record_id"])
+        return MatchedEntity(
+            item_id=item_id, name=name, item_type=item_type,
+            risk_level=risk_level, description=description,
+            matched_key=candidate["alias"], raw_query=span.raw_text,
+            match_type="fuzzy_recovery", match_score=int(round(candidate["fuzzy_score"])),
+            polarity=span.polarity, source_section=span.section_type,
+            source_text=span.evidence,
+        )
 
     # ── Thresholds ──────────────────────────────────────────────────────────
 
@@ -170,7 +412,8 @@ class FuzzyRecoveryMatcher:
         if len(accepted) < 2:
             return True
         best, second = accepted[0], accepted[1]
-        if best["record"].get("id", "") == second["record"].get("id", ""):
+        item_ids = self.lexicon.store.item_ids
+        if item_ids[best["record_id"]] == item_ids[second["record_id"]]:
             return True
         fuzzy_gap = best["fuzzy_score"] - second["fuzzy_score"]
         if fuzzy_gap >= best.get("ambiguity_gap", 2.0):
@@ -190,29 +433,41 @@ class FuzzyRecoveryMatcher:
         folded_q = self._fold(query_token)
 
         # Search only single-token aliases
-        raw_matches = process.extract(
-            folded_q, self._single_folded,
-            scorer=fuzz.WRatio, processor=None, limit=15,
+        cutoff = th["min_fuzzy_score"]
+        view = self._overlay_view()
+        raw_matches = self._search(
+            view, folded_q, True, self._single_shortlist(folded_q, cutoff),
+            limit=15, score_cutoff=cutoff,
         )
 
-        accepted = []
-        for _choice, fuzzy_score, index in raw_matches:
-            alias = self._single_aliases[index]
-            alias_tokens = self._tokens(alias)
-            if len(alias_tokens) != 1:
+        table = view.table if view is not None else self.token_table
+        candidates = []
+        for alias, fuzzy_score, index in raw_matches:
+            alias_token_ids = table.tokens_for(index)
+            if len(alias_token_ids) != 1:
                 continue
+            candidates.append((alias, fuzzy_score, alias_token_ids[0]))
 
-            token_score = self._token_match_score(query_token, alias_tokens[0])
+        if not candidates:
+            return None
+
+        trace = current_trace()
+        if trace is not None:
+            trace.count("fuzzy_candidates_scored", len(candidates))
+        token_scores = self._token_score_matrix([folded_q], [c[2] for c in candidates], table)[0].tolist()
+
+        accepted = []
+        for (alias, fuzzy_score, token_id), token_score in zip(candidates, token_scores):
             if token_score < th["min_token_score"] or fuzzy_score < th["min_fuzzy_score"]:
                 continue
-            if len(query_token) <= 6 and folded_q[0] != self._fold(alias_tokens[0])[0]:
+            if len(query_token) <= 6 and folded_q[0] != table.token_strings[token_id][0]:
                 continue
 
-            for record in self.lexicon.alias_map.get(alias, []):
+            for record_id in self.lexicon.alias_records(alias):
                 accepted.append({
-                    "record": record, "alias": alias,
+                    "record_id": record_id, "alias": alias,
                     "token_score": float(token_score), "fuzzy_score": float(fuzzy_score),
-                    "priority": self._candidate_priority(record, span.section_type),
+                    "priority": self._candidate_priority(record_id, span.section_type),
                     "ambiguity_gap": float(th["ambiguity_gap"]),
                 })
 
@@ -224,38 +479,47 @@ class FuzzyRecoveryMatcher:
         if not self._passes_ambiguity_check(accepted, ["token_score"]):
             return None
 
-        rec = accepted[0]["record"]
-        return MatchedEntity(
-            item_id=rec["id"], name=rec["name"], item_type=rec["item_type"],
-            risk_level=rec["risk_level"], description=rec["description"],
-            matched_key=accepted[0]["alias"], raw_query=span.raw_text,
-            match_type="fuzzy_recovery", match_score=int(round(accepted[0]["fuzzy_score"])),
-            polarity=span.polarity, source_section=span.section_type,
-            source_text=span.evidence,
-        )
+        return self._entity_from_candidate(span, accepted[0])
 
     # ── Multi-token matching ────────────────────────────────────────────────
 
     def _match_multi_token(self, span: CandidateSpan, query: str, query_tokens: List[str]) -> Optional[MatchedEntity]:
         folded_q = self._fold(query)
 
-        raw_matches = process.extract(
-            folded_q, self._all_folded,
-            scorer=fuzz.WRatio, processor=None, limit=20,
+        view = self._overlay_view()
+        raw_matches = self._search(
+            view, folded_q, False, self._multi_shortlist(folded_q, MULTI_TOKEN_MIN_FUZZY_SCORE),
+            limit=20, score_cutoff=MULTI_TOKEN_MIN_FUZZY_SCORE,
         )
 
-        accepted = []
-        for _choice, fuzzy_score, index in raw_matches:
-            alias = self._all_aliases[index]
-            alias_tokens = self._tokens(alias)
-            if not alias_tokens:
+        table = view.table if view is not None else self.token_table
+        candidates = []
+        token_columns: Dict[int, int] = {}
+        for alias, fuzzy_score, index in raw_matches:
+            alias_token_ids = table.tokens_for(index)
+            if not alias_token_ids:
                 continue
+            for token_id in alias_token_ids:
+                token_columns.setdefault(token_id, len(token_columns))
+            candidates.append((alias, fuzzy_score, alias_token_ids))
 
-            for record in self.lexicon.alias_map.get(alias, []):
-                item_type = record.get("item_type", "")
-                th = self._multi_token_thresholds(item_type, len(query_tokens))
+        if not candidates:
+            return None
 
-                qc, ap, sar, mqts = self._best_token_alignment(query_tokens, alias_tokens)
+        trace = current_trace()
+        if trace is not None:
+            trace.count("fuzzy_candidates_scored", len(candidates))
+        # One score matrix for the whole candidate batch; each alias reads its own columns
+        batch_scores = self._token_score_matrix(query_tokens, list(token_columns), table)
+
+        accepted = []
+        for alias, fuzzy_score, alias_token_ids in candidates:
+            columns = [token_columns[token_id] for token_id in alias_token_ids]
+            qc, ap, sar, mqts = self._alignment_from_matrix(batch_scores[:, columns])
+
+            for record_id in self.lexicon.alias_records(alias):
+                item_type = self.lexicon.store.item_type(record_id)
+                th = self._multi_token_thresholds(item_type, len(query_tokens))
 
                 special_ok = (
                     len(query_tokens) == 2 and qc >= 0.86 and ap >= 0.86
@@ -270,12 +534,12 @@ class FuzzyRecoveryMatcher:
                     continue
 
                 accepted.append({
-                    "record": record, "alias": alias,
+                    "record_id": record_id, "alias": alias,
                     "fuzzy_score": float(fuzzy_score),
                     "query_coverage": float(qc), "alias_precision": float(ap),
                     "strong_anchor_ratio": float(sar),
                     "min_query_token_score": float(mqts),
-                    "priority": self._candidate_priority(record, span.section_type),
+                    "priority": self._candidate_priority(record_id, span.section_type),
                     "ambiguity_gap": float(th["ag"]),
                 })
 
@@ -291,15 +555,7 @@ class FuzzyRecoveryMatcher:
         if not self._passes_ambiguity_check(accepted, ["query_coverage", "alias_precision", "min_query_token_score"]):
             return None
 
-        rec = accepted[0]["record"]
-        return MatchedEntity(
-            item_id=rec["id"], name=rec["name"], item_type=rec["item_type"],
-            risk_level=rec["risk_level"], description=rec["description"],
-            matched_key=accepted[0]["alias"], raw_query=span.raw_text,
-            match_type="fuzzy_recovery", match_score=int(round(accepted[0]["fuzzy_score"])),
-            polarity=span.polarity, source_section=span.section_type,
-            source_text=span.evidence,
-        )
+        return self._entity_from_candidate(span, accepted[0])
 
     # ── N-gram sub-matching ─────────────────────────────────────────────────
 
@@ -309,11 +565,14 @@ class FuzzyRecoveryMatcher:
 
         best_entity: Optional[MatchedEntity] = None
         best_score = 0.0
+        trace = current_trace()
 
         for window_size in [2, 1]:
             for start in range(len(query_tokens) - window_size + 1):
                 sub_tokens = query_tokens[start:start + window_size]
                 sub_query = " ".join(sub_tokens)
+                if trace is not None:
+                    trace.count("ngram_windows")
                 sub_span = CandidateSpan(
                     raw_text=sub_query, normalized_text=sub_query,
                     section_type=span.section_type, polarity=span.polarity,
@@ -331,9 +590,24 @@ class FuzzyRecoveryMatcher:
 
     # ── Main entry ──────────────────────────────────────────────────────────
 
+    def _entity_from_memo(self, value, span: CandidateSpan) -> Optional[MatchedEntity]:
+        if value is None:
+            return None
+        (item_id, name, item_type, risk_level, description,
+         matched_key, match_type, match_score, raw_query_override) = value
+        return MatchedEntity(
+            item_id=item_id, name=name, item_type=item_type,
+            risk_level=risk_level, description=description,
+            matched_key=matched_key,
+            raw_query=raw_query_override if raw_query_override is not None else span.raw_text,
+            match_type=match_type, match_score=match_score,
+            polarity=span.polarity, source_section=span.section_type,
+            source_text=span.evidence,
+        )
+
     def match_span(self, span: CandidateSpan) -> Optional[MatchedEntity]:
         query = self._normalize(span.normalized_text or span.raw_text)
-        query_tokens = self._tokens(query)
+        query_tokens = self._span_tokens(span)
         if not query or not query_tokens:
             return None
 
@@ -341,6 +615,22 @@ class FuzzyRecoveryMatcher:
         if ecode:
             return ecode
 
+        # Fuzzy decisions depend only on the folded query and section priorities
+        # (a lexicon edit swaps in a fresh memo; decisions made meanwhile land in the old one)
+        memo = self.memo
+        memo_key = (span.folded_text, span.section_type)
+        found, value = memo.get(memo_key)
+        if found:
+            trace = current_trace()
+            if trace is not None:
+                trace.count("fuzzy_memo_hits")
+            return self._entity_from_memo(value, span)
+
+        entity = self._match_tokens(span, query, query_tokens)
+        memo.put(memo_key, memo_value_from_entity(entity, span.raw_text))
+        return entity
+
+    def _match_tokens(self, span: CandidateSpan, query: str, query_tokens: List[str]) -> Optional[MatchedEntity]:
         if len(query_tokens) == 1:
             return self._match_single_token(span, query_tokens[0])
 
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import json
 import re
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from ..preprocessing.normalize import ascii_fold, normalize_for_matching
+from ..preprocessing.normalize import NORMALIZE_CACHE_SIZE, ascii_fold, normalize_for_matching
+from .record_store import RecordFields, RecordStore
 
 
 TYPE_PRIORITY_DEFAULT = {
@@ -105,48 +109,253 @@ def _alias_variants(alias: str) -> List[str]:
     return variants
 
 
+# Final consonants after folding (ç is already c), mapped to one representative
+_CANONICAL_FINAL_CONSONANT = {"d": "t", "b": "p", "g": "k"}
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def canonical_key(text: str) -> str:
+    """
+    Coarse key shared by a string and every entry of its _alias_variants.
+
+    Folding covers the normalized/folded pair, stripping copulas from the
+    last word until nothing more comes off covers the copula variants, and
+    mapping every word's final consonant to one of each voicing pair covers
+    the consonant alternations. Distinct strings may share a key; that only
+    costs a variant expansion, never a different lookup result.
+    """
+    words = ascii_fold(text).split()
+    if not words:
+        return ""
+    last = words[-1]
+    while True:
+        stripped = COPULA_SUFFIX_RE.sub("", last)
+        if not stripped or stripped == last:
+            break
+        last = stripped
+    words[-1] = last
+    return " ".join(word[:-1] + _CANONICAL_FINAL_CONSONANT.get(word[-1], word[-1]) for word in words)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _lookup_variants(alias: str) -> Tuple[str, ...]:
+    """_alias_variants for query strings; spans repeat across requests, so memoized."""
+    return tuple(_alias_variants(alias))
+
+
+def _rank_key(store: RecordStore, section_priority: Dict[str, int]):
+    def key(record_id: int):
+        item_type = store.item_type(record_id)
+        return (
+            section_priority.get(item_type, 0),
+            TYPE_PRIORITY_DEFAULT.get(item_type, 0),
+            len(store.names[record_id]),
+        )
+    return key
+
+
+def build_best_records(
+    store: RecordStore, alias_map: Dict[str, Tuple[int, ...]]
+) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]]]:
+    """
+    Winning record id per alias, as _pick_best would choose it.
+
+    Returns the winners under TYPE_PRIORITY_DEFAULT plus, per section in
+    TYPE_PRIORITY_BY_SECTION, only the aliases whose section winner differs
+    from the default one. Most aliases have one record, so the section
+    tables stay small.
+    """
+    default_key = _rank_key(store, TYPE_PRIORITY_DEFAULT)
+    default_best = {alias: max(matches, key=default_key) for alias, matches in alias_map.items()}
+
+    section_best: Dict[str, Dict[str, int]] = {}
+    for section_type, section_priority in TYPE_PRIORITY_BY_SECTION.items():
+        section_key = _rank_key(store, section_priority)
+        overrides = {}
+        for alias, matches in alias_map.items():
+            if len(matches) > 1:
+                best = max(matches, key=section_key)
+                if best != default_best[alias]:
+                    overrides[alias] = best
+        section_best[section_type] = overrides
+    return default_best, section_best
+
+
+def record_fields(row: Dict[str, str]) -> RecordFields | None:
+    """RecordStore fields for a master CSV row, or None if the row is skipped (no name or type)."""
+    display_name = _display_name(row)
+    item_type = (row.get("type") or "").strip().lower()
+    if not display_name or not item_type:
+        return None
+    return (
+        row.get("id", "").strip(),
+        display_name.strip(),
+        item_type,
+        (row.get("risk_level") or "Unknown").strip() or "Unknown",
+        (row.get("description_tr") or row.get("note") or "").strip(),
+    )
+
+
+def record_aliases(row: Dict[str, str]) -> List[str]:
+    """Every alias_map key a row contributes, in insertion order (repeats included)."""
+    return [variant for alias in _candidate_aliases(row) for variant in _alias_variants(alias)]
+
+
+def build_canonical_keys(alias_map: Dict[str, Any]) -> frozenset:
+    return frozenset(canonical_key.__wrapped__(alias) for alias in alias_map)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class MasterLexicon:
-    def __init__(self, csv_path: Path):
+    def __init__(self, csv_path: Path, snapshot: Dict[str, Any] | None = None):
         self.csv_path = Path(csv_path)
-        self.records: List[Dict[str, str]] = []
-        self.alias_map: Dict[str, List[Dict[str, str]]] = {}
-        self.load()
+        self.store = RecordStore()
+        self.alias_map: Dict[str, Tuple[int, ...]] = {}
+        self.canonical_keys: frozenset = frozenset()
+        self.default_best: Dict[str, int] = {}
+        self.section_best: Dict[str, Dict[str, int]] = {}
+        self.csv_sha256 = ""
+        self.csv_size = 0
+        self.source = "csv"
+        # Incremental edits on top of these tables (lexicon_delta.LexiconOverlay);
+        # replaced as a whole on every edit, None until the first one
+        self.overlay = None
+        self.delta_seq = 0
+        # record id -> its aliases in the base tables (alias_map inverted),
+        # built by the first delta and reused by later ones
+        self.base_record_aliases: Optional[Dict[int, Tuple[str, ...]]] = None
+        if snapshot is not None:
+            self._load_snapshot(snapshot)
+        else:
+            self.load()
+
+    @property
+    def csv_state(self) -> Tuple[str, int]:
+        """(sha256, size) of the master CSV content the lexicon reflects, appended rows included."""
+        overlay = self.overlay
+        if overlay is not None:
+            return overlay.csv_sha256, overlay.csv_size
+        return self.csv_sha256, self.csv_size
+
+    @property
+    def version(self) -> str:
+        overlay = self.overlay
+        if overlay is None:
+            csv_sha256, seq = self.csv_sha256, self.delta_seq
+        else:
+            csv_sha256, seq = overlay.csv_sha256, overlay.seq
+        return f"{csv_sha256[:12]}+{seq}" if seq else csv_sha256[:12]
+
+    @property
+    def records(self) -> List[Dict[str, str]]:
+        """Every record in dict form (built on each access; not for hot paths)."""
+        return [self.store.record(record_id) for record_id in range(len(self.store))]
+
+    def _load_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        self.store = snapshot["record_store"]
+        self.alias_map = snapshot["alias_map"]
+        self.canonical_keys = snapshot["canonical_keys"]
+        self.default_best = snapshot["default_best"]
+        self.section_best = snapshot["section_best"]
+        self.csv_sha256 = snapshot["csv_sha256"]
+        self.csv_size = snapshot.get("csv_size", 0)
+        self.source = "snapshot"
 
     def load(self) -> None:
+        self.csv_sha256 = file_sha256(self.csv_path)
+        self.csv_size = self.csv_path.stat().st_size
+        alias_map: Dict[str, List[int]] = {}
         with self.csv_path.open("r", encoding="utf-8-sig", newline="") as f:
             reader = csv.DictReader(f)
             for row in reader:
-                display_name = _display_name(row)
-                item_type = (row.get("type") or "").strip().lower()
-                if not display_name or not item_type:
+                fields = record_fields(row)
+                if fields is None:
                     continue
 
-                record = {
-                    "id": row.get("id", "").strip(),
-                    "name": display_name.strip(),
-                    "item_type": item_type,
-                    "risk_level": (row.get("risk_level") or "Unknown").strip() or "Unknown",
-                    "description": (row.get("description_tr") or row.get("note") or "").strip(),
-                }
-                self.records.append(record)
+                record_id = self.store.add(*fields)
+                for variant in record_aliases(row):
+                    alias_map.setdefault(variant, []).append(record_id)
+
+        self.alias_map = {alias: tuple(record_ids) for alias, record_ids in alias_map.items()}
+        self.canonical_keys = build_canonical_keys(self.alias_map)
+        self.default_best, self.section_best = build_best_records(self.store, self.alias_map)
+
+    def compact(self) -> None:
+        """
+        Freeze lookup tables into a compact, read-only layout.
+
+        Alias and record strings are interned so repeated values share one
+        object. Used before forking workers so the tables stay in
+        copy-on-write shared pages.
+        """
+        self.store.intern_strings()
 
-                for alias in _candidate_aliases(row):
-                    for variant in _alias_variants(alias):
-                        self.alias_map.setdefault(variant, []).append(record)
+        self.alias_map = {
+            sys.intern(alias): record_ids
+            for alias, record_ids in self.alias_map.items()
+        }
+        self.default_best = {sys.intern(alias): rec for alias, rec in self.default_best.items()}
+        self.section_best = {
+            section_type: {sys.intern(alias): rec for alias, rec in overrides.items()}
+            for section_type, overrides in self.section_best.items()
+        }
 
-    def _pick_best(self, matches: List[Dict[str, str]], section_type: str) -> Dict[str, str]:
+    def _pick_best(self, matches: Tuple[int, ...], section_type: str) -> int:
         section_priority = TYPE_PRIORITY_BY_SECTION.get(section_type, TYPE_PRIORITY_DEFAULT)
-        return max(
-            matches,
-            key=lambda rec: (
-                section_priority.get(rec["item_type"], 0),
-                TYPE_PRIORITY_DEFAULT.get(rec["item_type"], 0),
-                len(rec["name"]),
-            ),
-        )
+        return max(matches, key=_rank_key(self.store, section_priority))
 
-    def exact_lookup(self, alias: str, section_type: str) -> Dict[str, str] | None:
-        for variant in _alias_variants(alias):
-            if variant in self.alias_map:
-                return self._pick_best(self.alias_map[variant], section_type)
+    def alias_records(self, alias: str) -> Tuple[int, ...]:
+        """Live record ids for alias (alias_map with the overlay's edits applied)."""
+        overlay = self.overlay
+        if overlay is not None:
+            record_ids = overlay.alias_records.get(alias)
+            if record_ids is not None:
+                return record_ids
+        return self.alias_map.get(alias, ())
+
+    def best_record(self, alias: str, section_type: str) -> int | None:
+        """_pick_best(alias_records(alias), section_type) from the precomputed tables."""
+        overlay = self.overlay
+        if overlay is not None and alias in overlay.best:
+            choices = overlay.best[alias]
+            if choices is None:
+                return None
+            return choices.get(section_type, choices[None])
+
+        overrides = self.section_best.get(section_type)
+        if overrides:
+            record_id = overrides.get(alias)
+            if record_id is not None:
+                return record_id
+        return self.default_best.get(alias)
+
+    def exact_lookup_id(self, alias: str, section_type: str) -> int | None:
+        # The normalized form is always the first variant tried
+        record_id = self.best_record(normalize_for_matching(alias), section_type)
+        if record_id is not None:
+            return record_id
+
+        # No alias shares the canonical key, so no variant can be an alias
+        key = canonical_key(alias)
+        if key not in self.canonical_keys:
+            overlay = self.overlay
+            if overlay is None or key not in overlay.canonical_keys:
+                return None
+
+        for variant in _lookup_variants(alias):
+            record_id = self.best_record(variant, section_type)
+            if record_id is not None:
+                return record_id
         return None
+
+    def exact_lookup(self, alias: str, section_type: str) -> Dict[str, str] | None:
+        """exact_lookup_id resolved to the record's dict form."""
+        record_id = self.exact_lookup_id(alias, section_type)
+        return None if record_id is None else self.store.record(record_id)
@@ -0,0 +1,310 @@
+"""
+Lexicon Delta — incremental record edits on top of a built lexicon.
+
+Adding a handful of entries used to mean a full rebuild: alias_map, the
+canonical key set, the best-record tables, the fuzzy buckets with their
+token table, and the exact automaton. apply_delta() instead leaves all of
+those base tables untouched (they may sit in copy-on-write pages shared by
+forked workers). It records the edit in a LexiconOverlay:
+  - alias_records: the live record ids of every alias an edit touched
+    (an empty tuple means the alias is gone)
+  - best: the default / per-section winner of each touched alias
+  - added_aliases: aliases that are not in the base alias_map, in insertion
+    order, with their canonical keys
+  - dead_aliases: touched aliases without live records, which the matchers
+    filter out of base automaton / bucket hits
+
+New records are appended to the RecordStore. An update is a delete plus an
+append, so an edited record ranks as if it were the last CSV row.
+Exact-lookup and automaton results equal a rebuild from the edited rows.
+Fuzzy buckets keep surviving base aliases at their original positions.
+
+An overlay is immutable once published. Every edit builds a new one from
+the previous one, so its cost grows with the overlay and not with the
+lexicon. compact_lexicon() folds the overlay into fresh base tables. The
+engine does that in the background once the overlay passes
+LEXICON_DELTA_COMPACT_THRESHOLD touched aliases (see lexicon_manager.py).
+
+read_appended_rows() recognizes the common CSV change: rows appended to
+the end of the file, as a catalogue import does. Those rows are applied
+as an append-only delta instead of a full reload.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .lexicon import (
+    TYPE_PRIORITY_BY_SECTION,
+    TYPE_PRIORITY_DEFAULT,
+    MasterLexicon,
+    _rank_key,
+    build_best_records,
+    build_canonical_keys,
+    canonical_key,
+    record_aliases,
+    record_fields,
+)
+from .record_store import RecordStore
+
+Row = Dict[str, str]
+BestChoices = Optional[Dict[Optional[str], int]]  # None key: default winner; section keys only where it differs
+
+
+class LexiconOverlay:
+    __slots__ = (
+        "seq", "csv_sha256", "csv_size", "deleted", "rids_by_item_id", "record_aliases",
+        "alias_records", "best", "added_aliases", "canonical_keys", "dead_aliases",
+    )
+
+    def __init__(
+        self,
+        seq: int,
+        csv_sha256: str,
+        csv_size: int,
+        deleted: FrozenSet[int] = frozenset(),
+        rids_by_item_id: Optional[Dict[str, Tuple[int, ...]]] = None,
+        record_aliases: Optional[Dict[int, Tuple[str, ...]]] = None,
+        alias_records: Optional[Dict[str, Tuple[int, ...]]] = None,
+        best: Optional[Dict[str, BestChoices]] = None,
+        added_aliases: Tuple[str, ...] = (),
+        canonical_keys: FrozenSet[str] = frozenset(),
+    ):
+        self.seq = seq
+        self.csv_sha256 = csv_sha256
+        self.csv_size = csv_size
+        self.deleted = deleted
+        self.rids_by_item_id = rids_by_item_id if rids_by_item_id is not None else {}
+        self.record_aliases = record_aliases if record_aliases is not None else {}  # appended records only
+        self.alias_records = alias_records if alias_records is not None else {}
+        self.best = best if best is not None else {}
+        self.added_aliases = added_aliases
+        self.canonical_keys = canonical_keys
+        self.dead_aliases = frozenset(alias for alias, rids in self.alias_records.items() if not rids)
+
+    @property
+    def size(self) -> int:
+        """Touched aliases; the compaction threshold is measured in these."""
+        return len(self.alias_records)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "seq": self.seq,
+            "touched_aliases": len(self.alias_records),
+            "added_aliases": len(self.added_aliases),
+            "dead_aliases": len(self.dead_aliases),
+            "deleted_records": len(self.deleted),
+            "appended_records": len(self.record_aliases),
+        }
+
+
+def _base_overlay(lexicon: MasterLexicon) -> LexiconOverlay:
+    store = lexicon.store
+    rids_by_item_id: Dict[str, Tuple[int, ...]] = {}
+    for record_id, item_id in enumerate(store.item_ids):
+        rids_by_item_id[item_id] = rids_by_item_id.get(item_id, ()) + (record_id,)
+    return LexiconOverlay(lexicon.delta_seq, lexicon.csv_sha256, lexicon.csv_size, rids_by_item_id=rids_by_item_id)
+
+
+def _base_record_aliases(lexicon: MasterLexicon) -> Dict[int, Tuple[str, ...]]:
+    """record id -> aliases for the base tables (inverted alias_map, built once per lexicon)."""
+    inverted = lexicon.base_record_aliases
+    if inverted is None:
+        grouped: Dict[int, List[str]] = {}
+        for alias, record_ids in lexicon.alias_map.items():
+            for record_id in record_ids:
+                grouped.setdefault(record_id, []).append(alias)
+        inverted = {record_id: tuple(aliases) for record_id, aliases in grouped.items()}
+        lexicon.base_record_aliases = inverted
+    return inverted
+
+
+def _best_choices(store: RecordStore, record_ids: Tuple[int, ...]) -> BestChoices:
+    if not record_ids:
+        return None
+    default = max(record_ids, key=_rank_key(store, TYPE_PRIORITY_DEFAULT))
+    choices: Dict[Optional[str], int] = {None: default}
+    for section_type, section_priority in TYPE_PRIORITY_BY_SECTION.items():
+        best = max(record_ids, key=_rank_key(store, section_priority))
+        if best != default:
+            choices[section_type] = best
+    return choices
+
+
+def apply_delta(
+    lexicon: MasterLexicon,
+    upserts: Iterable[Row] = (),
+    deletes: Iterable[str] = (),
+    append_only: bool = False,
+    csv_state: Optional[Tuple[str, int]] = None,
+) -> LexiconOverlay:
+    """
+    Build the overlay for one edit on top of lexicon's current overlay.
+
+    deletes are item ids; upserts are master CSV rows (id, name_tr, type,
+    keywords, ...) and replace every live record with the same id. With
+    append_only, rows are added without replacing existing ids (the CSV
+    tail case). The version sequence then stays the same, and csv_state
+    carries the new file's (sha256, size). The overlay is returned
+    unpublished; the caller assigns it to lexicon.overlay once dependent
+    indexes are ready.
+    """
+    previous = lexicon.overlay or _base_overlay(lexicon)
+    store = lexicon.store
+    base_aliases = _base_record_aliases(lexicon)
+    rids_by_item_id = dict(previous.rids_by_item_id)
+    appended_aliases = dict(previous.record_aliases)
+
+    removed = set()
+    touched: Dict[str, None] = {}  # ordered set
+    added: List[int] = []
+
+    def remove(item_id: str) -> None:
+        for record_id in rids_by_item_id.pop(item_id, ()):
+            removed.add(record_id)
+            aliases = appended_aliases.get(record_id)
+            touched.update(dict.fromkeys(aliases if aliases is not None else base_aliases.get(record_id, ())))
+
+    for item_id in deletes:
+        remove(str(item_id).strip())
+
+    for row in upserts:
+        fields = record_fields(row)
+        if fields is None:
+            continue
+        item_id = fields[0]
+        if not append_only:
+            remove(item_id)
+        record_id = store.add(*fields)
+        aliases = tuple(record_aliases(row))
+        appended_aliases[record_id] = aliases
+        rids_by_item_id[item_id] = rids_by_item_id.get(item_id, ()) + (record_id,)
+        added.append(record_id)
+        touched.update(dict.fromkeys(aliases))
+
+    added_by_alias: Dict[str, List[int]] = {}
+    new_aliases: Dict[str, None] = {}
+    known_added = set(previous.added_aliases)
+    for record_id in added:
+        if record_id in removed:
+            continue
+        for alias in appended_aliases[record_id]:
+            added_by_alias.setdefault(alias, []).append(record_id)
+            if alias not in lexicon.alias_map and alias not in known_added:
+                new_aliases[alias] = None
+
+    alias_records = dict(previous.alias_records)
+    best = dict(previous.best)
+    for alias in touched:
+        current = alias_records.get(alias)
+        if current is None:
+            current = lexicon.alias_map.get(alias, ())
+        live = tuple(rid for rid in current if rid not in removed)
+        live += tuple(rid for rid in added_by_alias.get(alias, ()) if rid not in removed)
+        alias_records[alias] = live
+        best[alias] = _best_choices(store, live)
+
+    for record_id in removed:
+        appended_aliases.pop(record_id, None)
+
+    csv_sha256, csv_size = csv_state if csv_state is not None else (previous.csv_sha256, previous.csv_size)
+    return LexiconOverlay(
+        seq=previous.seq + (0 if append_only else 1),
+        csv_sha256=csv_sha256,
+        csv_size=csv_size,
+        deleted=previous.deleted | removed,
+        rids_by_item_id=rids_by_item_id,
+        record_aliases=appended_aliases,
+        alias_records=alias_records,
+        best=best,
+        added_aliases=previous.added_aliases + tuple(new_aliases),
+        canonical_keys=previous.canonical_keys | {canonical_key(alias) for alias in new_aliases},
+    )
+
+
+def merged_alias_map(lexicon: MasterLexicon) -> Dict[str, Tuple[int, ...]]:
+    """alias_map with the overlay applied: live base aliases in base order, then added aliases."""
+    overlay = lexicon.overlay
+    if overlay is None:
+        return dict(lexicon.alias_map)
+    merged: Dict[str, Tuple[int, ...]] = {}
+    for alias in lexicon.alias_map:
+        record_ids = lexicon.alias_records(alias)
+        if record_ids:
+            merged[alias] = record_ids
+    for alias in overlay.added_aliases:
+        record_ids = lexicon.alias_records(alias)
+        if record_ids:
+            merged[alias] = record_ids
+    return merged
+
+
+def compact_lexicon(lexicon: MasterLexicon) -> MasterLexicon:
+    """
+    A new MasterLexicon whose base tables already contain lexicon's overlay.
+
+    Deleted records are dropped and the rest renumbered in record id order.
+    Lookups and the version are unchanged.
+    """
+    overlay = lexicon.overlay
+    if overlay is None:
+        return lexicon
+
+    merged = merged_alias_map(lexicon)
+    old_store = lexicon.store
+    store = RecordStore()
+    renumbered: Dict[int, int] = {}
+    for record_id in range(len(old_store)):
+        if record_id not in overlay.deleted:
+            renumbered[record_id] = store.add(*old_store.fields(record_id))
+
+    alias_map = {alias: tuple(renumbered[rid] for rid in record_ids) for alias, record_ids in merged.items()}
+    default_best, section_best = build_best_records(store, alias_map)
+    compacted = MasterLexicon(lexicon.csv_path, snapshot={
+        "record_store": store,
+        "alias_map": alias_map,
+        "canonical_keys": build_canonical_keys(alias_map),
+        "default_best": default_best,
+        "section_best": section_best,
+        "csv_sha256": overlay.csv_sha256,
+        "csv_size": overlay.csv_size,
+    })
+    compacted.source = "compacted"
+    compacted.delta_seq = overlay.seq
+    return compacted
+
+
+def read_appended_rows(csv_path: Path, csv_sha256: str, csv_size: int) -> Optional[Tuple[List[Row], str, int]]:
+    """
+    (rows, new sha256, new size) if the file is the known content plus whole
+    appended lines, else None (the caller falls back to a full reload).
+    """
+    data = Path(csv_path).read_bytes()
+    if csv_size <= 0 or len(data) <= csv_size or data[csv_size - 1:csv_size] != b"\n":
+        return None
+    if hashlib.sha256(data[:csv_size]).hexdigest() != csv_sha256:
+        return None
+
+    text = data.decode("utf-8-sig")
+    header = next(csv.reader(io.StringIO(text)), None)
+    if not header:
+        return None
+    tail = data[csv_size:].decode("utf-8")
+    rows = list(csv.DictReader(io.StringIO(tail, newline=""), fieldnames=header))
+    return rows, hashlib.sha256(data).hexdigest(), len(data)
+
+
+def upsert_rows(records: Sequence[Dict[str, object]]) -> List[Row]:
+    """API payload records -> CSV-shaped rows (keywords may be given as a list)."""
+    rows = []
+    for record in records:
+        row = {key: "" if value is None else value for key, value in record.items()}
+        keywords = row.get("keywords")
+        if isinstance(keywords, (list, tuple)):
+            row["keywords"] = json.dumps([str(k) for k in keywords], ensure_ascii=False)
+        rows.append({key: str(value) for key, value in row.items()})
+    return rows
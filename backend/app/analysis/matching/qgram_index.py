@@ -0,0 +1,99 @@
+"""
+Q-gram Index — candidate shortlist for the fuzzy matcher.
+
+Fuzzy recovery used to score every query against every folded alias with
+WRatio. That is linear in the lexicon size and grows with every new
+additive or ingredient. The q-gram index keeps, per padded trigram, the
+sorted list of alias indexes containing it. A query is scored only against
+aliases that:
+
+  - share at least one trigram with it (counted with one np.bincount over
+    the query's posting lists), keeping the max_candidates best by the
+    share of the shorter side's trigrams that match, or are shorter than
+    a trigram themselves (they can only match as a substring), and
+  - fall inside the length window where WRatio can still reach the caller's
+    score cutoff (length bucketing; see length_window).
+
+The shortlist is returned in ascending alias order so rapidfuzz breaks score
+ties exactly as it does on the full bucket. Recall against brute force is
+checked with backend/scripts/check_fuzzy_prefilter.py.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+QGRAM_SIZE = 3
+QGRAM_PAD = " "
+
+# rapidfuzz WRatio caps partial matches at 90 once the length ratio reaches
+# 1.5 and at 60 once it exceeds 8.
+WRATIO_PARTIAL_SCALE = 90.0
+WRATIO_LONG_PARTIAL_SCALE = 60.0
+
+
+def qgrams(text: str, q: int = QGRAM_SIZE) -> List[str]:
+    padded = QGRAM_PAD * (q - 1) + text + QGRAM_PAD * (q - 1)
+    return [padded[i:i + q] for i in range(len(padded) - q + 1)]
+
+
+def length_window(query_len: int, score_cutoff: float) -> Tuple[int, int]:
+    """
+    Inclusive alias-length range where WRatio(query, alias) >= score_cutoff is
+    still possible. Outside it WRatio is capped below the cutoff by its
+    length-ratio scaling, so excluding those aliases never changes results.
+    """
+    if query_len <= 0:
+        return 0, 0
+    if score_cutoff > WRATIO_PARTIAL_SCALE:
+        # max(l, n) / min(l, n) < 1.5
+        return (2 * query_len) // 3 + 1, (3 * query_len - 1) // 2
+    if score_cutoff > WRATIO_LONG_PARTIAL_SCALE:
+        # max(l, n) / min(l, n) <= 8
+        return (query_len + 7) // 8, 8 * query_len
+    return 1, np.iinfo(np.int32).max
+
+
+class QGramIndex:
+    def __init__(self, strings: Iterable[str], q: int = QGRAM_SIZE):
+        self.q = q
+        postings: Dict[str, List[int]] = {}
+        lengths: List[int] = []
+        gram_counts: List[int] = []
+
+        for index, text in enumerate(strings):
+            grams = set(qgrams(text, q))
+            lengths.append(len(text))
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(index)
+
+        self.size = len(lengths)
+        self.lengths = np.array(lengths, dtype=np.int32)
+        self.gram_counts = np.array(gram_counts, dtype=np.int32)
+        self.short_mask = self.lengths < q
+        self.postings: Dict[str, np.ndarray] = {
+            gram: np.array(indexes, dtype=np.int32) for gram, indexes in postings.items()
+        }
+
+    def shortlist(self, query: str, max_candidates: int, score_cutoff: float = 0.0) -> List[int]:
+        """Ascending alias indexes worth scoring for query (see module docstring)."""
+        low, high = length_window(len(query), score_cutoff)
+        in_window = (self.lengths >= low) & (self.lengths <= high)
+        if len(query) < self.q:
+            # Too short for trigram evidence; only the length window applies
+            return np.flatnonzero(in_window).tolist()
+
+        query_grams = set(qgrams(query, self.q))
+        lists = [self.postings[g] for g in query_grams if g in self.postings]
+        counts = np.bincount(np.concatenate(lists), minlength=self.size) if lists else np.zeros(self.size, dtype=np.intp)
+
+        candidates = np.flatnonzero(((counts > 0) | self.short_mask) & in_window)
+        if len(candidates) > max_candidates:
+            overlap = counts[candidates] / np.minimum(self.gram_counts[candidates], len(query_grams))
+            overlap[self.short_mask[candidates]] = np.inf
+            # Keep the best-overlapping aliases; among equal overlap prefer lower indexes
+            order = np.lexsort((candidates, -overlap))
+            candidates = np.sort(candidates[order[:max_candidates]])
+        return candidates.tolist()
@@ -0,0 +1,94 @@
+"""
+Record Store — columnar lexicon records addressed by integer id.
+
+Lexicon records used to be one dict per item ({"id", "name", "item_type",
+"risk_level", "description"}), referenced from every alias_map entry. A
+dict per record costs far more than its five strings, and the same handful
+of type / risk values were repeated in every one of them.
+
+RecordStore keeps one column per field instead:
+  - item_ids / names: one string per record
+  - type_codes / risk_codes: one 16-bit code per record, indexing small enum
+    tables (item_types / risk_levels)
+  - description_codes: index into a deduplicated description table (many
+    records share an empty or identical description)
+
+alias_map and the best-record tables hold record ids (ints); fields are
+read through the store only when an entity is built. record() rebuilds
+the old dict form for callers outside the matching hot path.
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Dict, List, Tuple
+
+RecordFields = Tuple[str, str, str, str, str]  # item_id, name, item_type, risk_level, description
+
+
+class RecordStore:
+    def __init__(self):
+        self.item_ids: List[str] = []
+        self.names: List[str] = []
+        self.type_codes = array("H")
+        self.risk_codes = array("H")
+        self.description_codes = array("I")
+        self.item_types: List[str] = []
+        self.risk_levels: List[str] = []
+        self.descriptions: List[str] = []
+        self._codes: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_codes"] = {}  # rebuilt on demand
+        return state
+
+    def _code(self, table_name: str, value: str) -> int:
+        codes = self._codes.get(table_name)
+        table = getattr(self, table_name)
+        if codes is None:
+            codes = self._codes[table_name] = {text: code for code, text in enumerate(table)}
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(table)
+            table.append(value)
+        return code
+
+    def add(self, item_id: str, name: str, item_type: str, risk_level: str, description: str) -> int:
+        record_id = len(self.item_ids)
+        self.item_ids.append(sys.intern(item_id))
+        self.names.append(name)
+        self.type_codes.append(self._code("item_types", sys.intern(item_type)))
+        self.risk_codes.append(self._code("risk_levels", sys.intern(risk_level)))
+        self.description_codes.append(self._code("descriptions", description))
+        return record_id
+
+    def item_type(self, record_id: int) -> str:
+        return self.item_types[self.type_codes[record_id]]
+
+    def fields(self, record_id: int) -> RecordFields:
+        return (
+            self.item_ids[record_id],
+            self.names[record_id],
+            self.item_types[self.type_codes[record_id]],
+            self.risk_levels[self.risk_codes[record_id]],
+            self.descriptions[self.description_codes[record_id]],
+        )
+
+    def record(self, record_id: int) -> Dict[str, str]:
+        item_id, name, item_type, risk_level, description = self.fields(record_id)
+        return {
+            "id": item_id,
+            "name": name,
+            "item_type": item_type,
+            "risk_level": risk_level,
+            "description": description,
+        }
+
+    def intern_strings(self) -> None:
+        for table in (self.item_ids, self.names, self.descriptions):
+            table[:] = [sys.intern(text) for text in table]
+        self._codes = {}
@@ -0,0 +1,119 @@
+"""
+Lexicon Snapshot — precompiled binary form of the master lexicon.
+
+Parsing foodlens_master_final.csv and expanding every alias into its
+normalized / folded / copula / consonant variants dominates cold start.
+The snapshot stores the finished record store, alias_map, its canonical key set
+and best-record tables, fuzzy buckets and the prefolded alias token table
+in a single pickle so the engine can load them in milliseconds.
+
+A snapshot is only used when:
+  - its format version matches SNAPSHOT_FORMAT_VERSION
+  - its recorded CSV hash matches the current CSV file
+Otherwise the engine falls back to parsing the CSV.
+
+Bump SNAPSHOT_FORMAT_VERSION whenever alias or index derivation changes,
+so snapshots built by older code are rejected.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .alias_tokens import AliasTokenTable
+from .fuzzy_recovery import BUCKET_NAMES, FuzzyRecoveryMatcher
+from .lexicon import MasterLexicon, file_sha256
+from .record_store import RecordStore
+
+logger = logging.getLogger("FoodLens")
+
+SNAPSHOT_FORMAT_VERSION = 5
+
+
+def build_snapshot(csv_path: Path, snapshot_path: Path) -> Dict[str, Any]:
+    """Parse the CSV, build all indexes and write them to snapshot_path atomically."""
+    csv_path = Path(csv_path)
+    snapshot_path = Path(snapshot_path)
+
+    lexicon = MasterLexicon(csv_path)
+    fuzzy = FuzzyRecoveryMatcher(lexicon)
+
+    payload = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "csv_sha256": lexicon.csv_sha256,
+        "csv_size": lexicon.csv_size,
+        "csv_name": csv_path.name,
+        "built_at": time.time(),
+        "record_store": lexicon.store,
+        "alias_map": lexicon.alias_map,
+        "canonical_keys": lexicon.canonical_keys,
+        "default_best": lexicon.default_best,
+        "section_best": lexicon.section_best,
+        "fuzzy_buckets": fuzzy.export_buckets(),
+        "alias_token_table": fuzzy.token_table,
+    }
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+    return payload
+
+
+def load_snapshot(snapshot_path: Path, csv_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Return the snapshot payload if it is present and fresh for csv_path, else None.
+    Stale or unreadable snapshots are logged and ignored.
+    """
+    snapshot_path = Path(snapshot_path)
+    if not snapshot_path.is_file():
+        return None
+
+    try:
+        with snapshot_path.open("rb") as f:
+            payload = pickle.load(f)
+    except Exception as exc:
+        logger.warning("Lexicon snapshot okunamadı (%s): %s", snapshot_path, exc)
+        return None
+
+    if not isinstance(payload, dict) or payload.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        logger.info("Lexicon snapshot format sürümü uyumsuz, CSV kullanılacak: %s", snapshot_path)
+        return None
+
+    buckets = payload.get("fuzzy_buckets") or {}
+    if not all(name in buckets for name in BUCKET_NAMES):
+        logger.info("Lexicon snapshot eksik fuzzy bucket içeriyor, CSV kullanılacak: %s", snapshot_path)
+        return None
+
+    if not isinstance(payload.get("record_store"), RecordStore):
+        logger.info("Lexicon snapshot kayıt deposu içermiyor, CSV kullanılacak: %s", snapshot_path)
+        return None
+
+    if not isinstance(payload.get("canonical_keys"), frozenset):
+        logger.info("Lexicon snapshot kanonik anahtar kümesi içermiyor, CSV kullanılacak: %s", snapshot_path)
+        return None
+
+    if not isinstance(payload.get("default_best"), dict) or not isinstance(payload.get("section_best"), dict):
+        logger.info("Lexicon snapshot en iyi kayıt tablolarını içermiyor, CSV kullanılacak: %s", snapshot_path)
+        return None
+
+    if not isinstance(payload.get("alias_token_table"), AliasTokenTable):
+        logger.info("Lexicon snapshot alias token tablosu içermiyor, CSV kullanılacak: %s", snapshot_path)
+        return None
+
+    try:
+        current_hash = file_sha256(csv_path)
+    except OSError as exc:
+        logger.warning("Master CSV hash hesaplanamadı (%s): %s", csv_path, exc)
+        return None
+
+    if payload.get("csv_sha256") != current_hash:
+        logger.info("Lexicon snapshot eski (CSV değişmiş), CSV kullanılacak: %s", snapshot_path)
+        return None
+
+    return payload
@@ -0,0 +1,143 @@
+"""
+Fuzzy Span Memo — cross-request memoization of fuzzy recovery decisions.
+
+FuzzyRecoveryMatcher.match_span is the most expensive pipeline step, and the
+same OCR misspellings ("potesyum sorbat", "sodyum benzoet") recur across
+thousands of labels. The fuzzy decision depends only on the folded query and
+the section type (section priorities), not on polarity or evidence, so it is
+memoized under (folded_query, section_type).
+
+Stored values:
+  - None for a negative result (no acceptable candidate)
+  - (item_id, name, item_type, risk_level, description,
+     matched_key, match_type, match_score, raw_query_override)
+    where raw_query_override is set only when the match came from an n-gram
+    sub-window (its raw_query is the window text, not the span text)
+
+The memo can be persisted to disk between deploys; a saved memo is only
+loaded back when it was produced for the same lexicon version.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("FoodLens")
+
+MEMO_FORMAT_VERSION = 1
+
+MemoKey = Tuple[str, str]
+
+
+class FuzzySpanMemo:
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, int(max_entries))
+        self._entries: "OrderedDict[MemoKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: MemoKey) -> Tuple[bool, Any]:
+        if not self.enabled:
+            return False, None
+
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key]
+
+    def put(self, key: MemoKey, value: Any) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    # ── Persistence ─────────────────────────────────────────────────────────
+
+    def save(self, path: Path, lexicon_version: str) -> int:
+        """Write the memo to path atomically. Returns the number of entries written."""
+        with self._lock:
+            entries = list(self._entries.items())
+
+        payload = {
+            "format_version": MEMO_FORMAT_VERSION,
+            "lexicon_version": lexicon_version,
+            "entries": entries,
+        }
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return len(entries)
+
+    def load(self, path: Path, lexicon_version: str) -> int:
+        """Load a memo saved for the same lexicon version. Returns the number of entries restored."""
+        path = Path(path)
+        if not path.is_file():
+            return 0
+
+        try:
+            with path.open("rb") as f:
+                payload = pickle.load(f)
+        except Exception as exc:
+            logger.warning("Fuzzy memo okunamadı (%s): %s", path, exc)
+            return 0
+
+        if not isinstance(payload, dict) or payload.get("format_version") != MEMO_FORMAT_VERSION:
+            return 0
+        if payload.get("lexicon_version") != lexicon_version:
+            logger.info("Fuzzy memo farklı lexicon sürümüne ait, yüklenmedi: %s", path)
+            return 0
+
+        entries = payload.get("entries", [])
+        for key, value in entries:
+            self.put(key, value)
+        return len(entries)
+
+
+def memo_value_from_entity(entity: Optional[Any], span_raw_text: str) -> Any:
+    if entity is None:
+        return None
+    raw_query_override = entity.raw_query if entity.raw_query != span_raw_text else None
+    return (
+        entity.item_id, entity.name, entity.item_type, entity.risk_level, entity.description,
+        entity.matched_key, entity.match_type, entity.match_score, raw_query_override,
+    )
@@ -1,7 +1,23 @@
+"""
+Text normalization shared by every pipeline stage.
+
+The same short strings (lines, spans, span tokens, alias variants) are
+normalized and folded several times per request by the block splitter,
+the parsers, the exact matcher and fuzzy recovery. normalize_for_matching,
+ascii_fold and fold_tokens are therefore pure functions behind one bounded
+LRU cache each, and their results are interned so equal outputs share one
+string object (cheap dict lookups against the interned alias_map keys).
+"""
 from __future__ import annotations
 
 import re
+import sys
 import unicodedata
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Entries per memoized function; spans and lines are short, so this stays small
+NORMALIZE_CACHE_SIZE = 16384
 
 
 TRANSLATION_TABLE = str.maketrans({
@@ -17,6 +33,16 @@ TRANSLATION_TABLE = str.maketrans({
     "‘": "'",
 })
 
+# TRANSLATION_TABLE plus carriage returns, so normalize_text needs one table.
+# str.translate falls back to a per-character dict lookup on non-Latin-1 text
+# (every Turkish label), which is far slower than one str.replace scan per
+# key. No replacement is itself a key, so the replacements can run in any order.
+NORMALIZE_TABLE = {**TRANSLATION_TABLE, ord("\r"): "\n"}
+NORMALIZE_REPLACEMENTS = tuple((chr(key), value) for key, value in NORMALIZE_TABLE.items())
+
+MULTI_SPACE_RE = re.compile(r"[ ]{2,}")
+MULTI_NEWLINE_RE = re.compile(r"\n{3,}")
+
 
 ASCII_TABLE = str.maketrans({
     "ı": "i",
@@ -33,16 +59,23 @@ def strip_accents(text: str) -> str:
     return "".join(ch for ch in normalized if not unicodedata.combining(ch))
 
 
+def replace_chars(text: str, replacements) -> str:
+    """str.translate for a small table of (char, replacement) pairs whose replacements are not keys."""
+    for old, new in replacements:
+        text = text.replace(old, new)
+    return text
+
+
 def normalize_text(text: str) -> str:
     if text is None:
         return ""
-    text = str(text).translate(TRANSLATION_TABLE)
-    text = text.replace("\r", "\n")
-    text = re.sub(r"[ ]{2,}", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = replace_chars(str(text), NORMALIZE_REPLACEMENTS)
+    text = MULTI_SPACE_RE.sub(" ", text)
+    text = MULTI_NEWLINE_RE.sub("\n\n", text)
     return text.strip()
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_for_matching(text: str) -> str:
     text = normalize_text(text).lower()
     text = text.replace("/", " ")
@@ -56,20 +89,39 @@ def normalize_for_matching(text: str) -> str:
     text = re.sub(r"[%_]", " ", text)
     text = re.sub(r"[^0-9a-zçğıöşü\-\s]", " ", text)
     text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return sys.intern(text)
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def ascii_fold(text: str) -> str:
-    return strip_accents(normalize_for_matching(text)).translate(ASCII_TABLE)
+    return sys.intern(strip_accents(normalize_for_matching(text)).translate(ASCII_TABLE))
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def fold_tokens(text: str) -> Tuple[str, ...]:
+    """Words of ascii_fold(text)."""
+    return tuple(sys.intern(token) for token in ascii_fold(text).split())
+
+
+def normalization_cache_stats() -> Dict[str, Dict[str, int]]:
+    stats = {}
+    for fn in (normalize_for_matching, ascii_fold, fold_tokens):
+        info = fn.cache_info()
+        stats[fn.__name__] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+    return stats
 
 
 def build_line_candidates(text: str) -> list[str]:
-    raw_lines = [line.strip(" -:;,.") for line in normalize_text(text).split("\n")]
+    return split_line_candidates(normalize_text(text))
+
+
+def split_line_candidates(normalized: str) -> list[str]:
+    """build_line_candidates for text that normalize_text already returns unchanged."""
     lines = []
-    for line in raw_lines:
-        if not line:
-            continue
-        if len(line) == 1:
+    for line in normalized.split("\n"):
+        line = line.strip(" -:;,.")
+        if len(line) < 2:
             continue
-        lines.append(re.sub(r"\s+", " ", line).strip())
+        # str.split() breaks on exactly the characters \s matches
+        lines.append(" ".join(line.split()))
     return lines
@@ -7,13 +7,24 @@ Handles messy mobile-phone OCR on food packaging:
   - Broken line splits mid-word
   - Mixed nutritional table data with ingredient text
   - Garbled character sequences
+
+Every pass is compiled once at import and the passes are arranged so that
+long noisy dumps are not rescanned needlessly:
+  - character tables (normalization, noise symbols) are applied as one
+    str.replace per key instead of str.translate / a character-class regex
+  - the seven keyword-repair patterns only run on the separator-delimited
+    segments that KEYWORD_HINT_RE flags, instead of seven full-text scans
+  - line splitting reuses the cleaned text instead of normalizing it again
+Output is byte-identical to the original sequential passes;
+backend/scripts/check_ocr_cleanup.py keeps that reference implementation and
+diffs the two over a corpus.
 """
 from __future__ import annotations
 
 import re
 from typing import List, Tuple
 
-from .normalize import build_line_candidates, normalize_text
+from .normalize import MULTI_SPACE_RE, normalize_text, replace_chars, split_line_candidates
 
 # ── Noise patterns ──────────────────────────────────────────────────────────
 
@@ -31,8 +42,19 @@ SHORT_CONTINUATION_RE = re.compile(
     re.IGNORECASE,
 )
 
-NOISE_CHARS_RE = re.compile(r"[§¶†‡°¤¥£€¢©®™¬¦×÷±∞≈≠≤≥∆∑∏√∫µ∂ƒ∅∩∪⊂⊃⊆⊇⊕⊗⊥∴∵∇]")
+NOISE_CHARS = "§¶†‡°¤¥£€¢©®™¬¦×÷±∞≈≠≤≥∆∑∏√∫µ∂ƒ∅∩∪⊂⊃⊆⊇⊕⊗⊥∴∵∇"
+NOISE_CHARS_RE = re.compile(f"[{NOISE_CHARS}]")
+NOISE_CHAR_REPLACEMENTS = tuple((char, " ") for char in NOISE_CHARS)
 MULTI_SPECIAL_RE = re.compile(r"[^\w\s,;:.()%/\-]{2,}")
+# A lone symbol between whitespace; the preceding whitespace is captured
+# instead of looked behind, which lets the regex skip ahead to \s candidates
+LONE_SYMBOL_RE = re.compile(r"(\s)[^\w\s](?=\s)")
+
+FRAGMENTED_WORD_RE = re.compile(r"(?<!\w)(\S\s){2,}\S(?!\w)")
+
+PUNCT_NO_SPACE_RE = re.compile(r"([,:;])(?=\S)")
+OPEN_PAREN_SPACE_RE = re.compile(r"\(\s+")
+CLOSE_PAREN_SPACE_RE = re.compile(r"\s+\)")
 
 # ── Broken keyword repair ───────────────────────────────────────────────────
 
@@ -50,20 +72,50 @@ BROKEN_INGREDIENTS_PATTERNS = [
 ]
 
 
+KEYWORD_REPAIRS = BROKEN_ICINDEKILER_PATTERNS + BROKEN_INGREDIENTS_PATTERNS
+
+# Every keyword-repair match contains one of these, so a segment without a
+# hint is left unchanged by all of the patterns.
+KEYWORD_HINT_RE = re.compile(r"n\s*d\s*e\s*k|n\s*g\s*r\s*e\s*d", re.IGNORECASE)
+
+# Repair matches hold only letters and whitespace, and their \b treats a
+# separator like the text edge, so the patterns can run per segment.
+SEPARATOR_RE = re.compile(r"[^\w\s]")
+
+
+def _repair_segment(segment: str) -> str:
+    for pattern, replacement in KEYWORD_REPAIRS:
+        segment = pattern.sub(replacement, segment)
+    return segment
+
+
 def _repair_broken_keywords(text: str) -> str:
-    result = text
-    for pattern, replacement in BROKEN_ICINDEKILER_PATTERNS:
-        result = pattern.sub(replacement, result)
-    for pattern, replacement in BROKEN_INGREDIENTS_PATTERNS:
-        result = pattern.sub(replacement, result)
-    return result
+    hint = KEYWORD_HINT_RE.search(text)
+    if hint is None:
+        return text
+
+    pieces: List[str] = []
+    done = 0
+    while hint is not None:
+        # Last separator before the hint, found by searching the reversed prefix
+        behind = SEPARATOR_RE.search(text[done:hint.start()][::-1])
+        start = hint.start() - behind.start() if behind else done
+        ahead = SEPARATOR_RE.search(text, hint.end())
+        end = ahead.start() if ahead else len(text)
+
+        pieces.append(text[done:start])
+        pieces.append(_repair_segment(text[start:end]))
+        done = end
+        hint = KEYWORD_HINT_RE.search(text, end)
+
+    pieces.append(text[done:])
+    return "".join(pieces)
 
 
 def _remove_noise_chars(text: str) -> str:
-    text = NOISE_CHARS_RE.sub(" ", text)
+    text = replace_chars(text, NOISE_CHAR_REPLACEMENTS)
     text = MULTI_SPECIAL_RE.sub(" ", text)
-    text = re.sub(r"(?<=\s)[^\w\s](?=\s)", " ", text)
-    return text
+    return LONE_SYMBOL_RE.sub(r"\1 ", text)
 
 
 def _is_garbage_line(line: str) -> bool:
@@ -74,8 +126,7 @@ def _is_garbage_line(line: str) -> bool:
         return True
     if GARBAGE_LINE_RE.match(stripped):
         return True
-    letters = sum(1 for c in stripped if c.isalpha())
-    if len(stripped) > 5 and letters / len(stripped) < 0.3:
+    if len(stripped) > 5 and sum(map(str.isalpha, stripped)) / len(stripped) < 0.3:
         return True
     return False
 
@@ -85,12 +136,7 @@ def _merge_fragmented_words(text: str) -> str:
     def _merge_singles(match: re.Match) -> str:
         return match.group(0).replace(" ", "")
 
-    text = re.sub(
-        r"(?<!\w)(\S\s){2,}\S(?!\w)",
-        _merge_singles,
-        text,
-    )
-    return text
+    return FRAGMENTED_WORD_RE.sub(_merge_singles, text)
 
 
 def merge_lines(lines: list[str]) -> list[str]:
@@ -130,12 +176,15 @@ def cleanup_ocr_text(text: str) -> Tuple[str, List[str]]:
     normalized = _repair_broken_keywords(normalized)
     normalized = _remove_noise_chars(normalized)
     normalized = _merge_fragmented_words(normalized)
-    normalized = re.sub(r"[ ]{2,}", " ", normalized)
-    normalized = re.sub(r"([,:;])(?=\S)", r"\1 ", normalized)
-    normalized = re.sub(r"\(\s+", "(", normalized)
-    normalized = re.sub(r"\s+\)", ")", normalized)
-
-    raw_lines = build_line_candidates(normalized)
+    normalized = MULTI_SPACE_RE.sub(" ", normalized)
+    normalized = PUNCT_NO_SPACE_RE.sub(r"\1 ", normalized)
+    normalized = OPEN_PAREN_SPACE_RE.sub("(", normalized)
+    normalized = CLOSE_PAREN_SPACE_RE.sub(")", normalized)
+
+    # Normalizing again would only lowercase the repaired keywords and trim
+    # the ends: the passes above leave no tabs, carriage returns, space runs
+    # or blank-line runs behind
+    raw_lines = split_line_candidates(normalized.replace("İ", "i").replace("I", "ı").strip())
     clean_lines = [line for line in raw_lines if not _is_garbage_line(line)]
     merged = merge_lines(clean_lines)
 
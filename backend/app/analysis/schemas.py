@@ -1,42 +1,133 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
+from .preprocessing.normalize import ascii_fold, fold_tokens
 
-@dataclass
-class TextBlock:
-    section_type: str
-    raw_text: str
-    normalized_text: str
-    source_lines: List[str] = field(default_factory=list)
-    anchor: str = ""
 
+class _Slotted:
+    """
+    Base for the per-request value types below.
 
-@dataclass
-class CandidateSpan:
-    raw_text: str
-    normalized_text: str
-    section_type: str
-    polarity: str
-    category_hint: str
-    evidence: str = ""
+    They are created for every line, span and match of every request, so
+    they use __slots__ instead of a per-instance __dict__ (dataclass(slots=)
+    needs Python 3.10). __repr__ and __eq__ follow the field order in
+    __slots__, as a dataclass would.
+    """
+    __slots__ = ()
 
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
 
-@dataclass
-class MatchedEntity:
-    item_id: str
-    name: str
-    item_type: str
-    risk_level: str
-    description: str
-    matched_key: str
-    raw_query: str
-    match_type: str = "exact"
-    match_score: int = 100
-    polarity: str = "present"
-    source_section: str = "ingredient_section"
-    source_text: str = ""
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None  # mutable, like a non-frozen dataclass
+
+
+class TextBlock(_Slotted):
+    __slots__ = ("section_type", "raw_text", "normalized_text", "source_lines", "anchor")
+
+    def __init__(
+        self,
+        section_type: str,
+        raw_text: str,
+        normalized_text: str,
+        source_lines: List[str] | None = None,
+        anchor: str = "",
+    ) -> None:
+        self.section_type = section_type
+        self.raw_text = raw_text
+        self.normalized_text = normalized_text
+        self.source_lines = [] if source_lines is None else source_lines
+        self.anchor = anchor
+
+
+class CandidateSpan(_Slotted):
+    __slots__ = (
+        "raw_text", "normalized_text", "section_type", "polarity", "category_hint", "evidence",
+        # ascii_fold of the matching text and its words, computed once per span
+        "folded_text", "tokens",
+    )
+
+    def __init__(
+        self,
+        raw_text: str,
+        normalized_text: str,
+        section_type: str,
+        polarity: str,
+        category_hint: str,
+        evidence: str = "",
+        folded_text: str = "",
+        tokens: Tuple[str, ...] = (),
+    ) -> None:
+        self.raw_text = raw_text
+        self.normalized_text = normalized_text
+        self.section_type = section_type
+        self.polarity = polarity
+        self.category_hint = category_hint
+        self.evidence = evidence
+        if not folded_text:
+            text = normalized_text or raw_text
+            folded_text = ascii_fold(text)
+            tokens = fold_tokens(text)
+        self.folded_text = folded_text
+        self.tokens = tokens
+
+
+class MatchedEntity(_Slotted):
+    """
+    One matched lexicon record; to_api_dict() is what /analyze returns.
+
+    match_type tells how the record was found:
+      - "exact": the whole span is an alias of the record
+      - "exact_scan": the span had lost its separators ("seker tuz su") and
+        the record's alias is one of the exact aliases that together cover
+        all of its words (ExactRuleMatcher.match_span_parts)
+      - "ecode_recovery": an E-code written with spaces or dashes ("e-102")
+        read as the known code; match_score 98
+      - "fuzzy_recovery": fuzzy match of an OCR-damaged span; match_score is
+        the fuzzy score instead of 100
+    """
+    __slots__ = (
+        "item_id", "name", "item_type", "risk_level", "description", "matched_key", "raw_query",
+        "match_type", "match_score", "polarity", "source_section", "source_text",
+    )
+
+    def __init__(
+        self,
+        item_id: str,
+        name: str,
+        item_type: str,
+        risk_level: str,
+        description: str,
+        matched_key: str,
+        raw_query: str,
+        match_type: str = "exact",
+        match_score: int = 100,
+        polarity: str = "present",
+        source_section: str = "ingredient_section",
+        source_text: str = "",
+    ) -> None:
+        self.item_id = item_id
+        self.name = name
+        self.item_type = item_type
+        self.risk_level = risk_level
+        self.description = description
+        self.matched_key = matched_key
+        self.raw_query = raw_query
+        self.match_type = match_type
+        self.match_score = match_score
+        self.polarity = polarity
+        self.source_section = source_section
+        self.source_text = source_text
 
     def to_api_dict(self) -> Dict[str, Any]:
         return {
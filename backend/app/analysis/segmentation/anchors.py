@@ -70,6 +70,21 @@ MANUFACTURER_ANCHORS = [
 ]
 
 
-def contains_any(text: str, anchors: list[str]) -> bool:
-    lowered = text.lower()
-    return any(anchor in lowered for anchor in anchors)
+# Inline claim cues, checked on blocks of any section (see engine._extract_inline_claims)
+INLINE_FREE_FROM_CUES = [
+    "içermez", "icermez", "yoktur", "bulunmaz",
+    "does not contain", "contains no", "free from",
+]
+INLINE_MAY_CONTAIN_CUES = [
+    "eser miktarda", "iz miktarda", "may contain",
+    "iz içerebilir", "iz icerebilir", "traces of",
+]
+INLINE_ALLERGEN_TERMS = [
+    "alerjen", "allergen", "gluten", "süt", "sut", "soya",
+    "fındık", "findik", "yumurta", "yer fıstığı", "yer fistigi",
+    "susam", "ceviz", "badem", "milk", "soy", "hazelnut",
+    "egg", "sesame", "peanut", "wheat", "balık", "balik",
+]
+INLINE_PRESENCE_VERBS = [
+    "içerir", "icerir", "içermektedir", "icermektedir", "contains",
+]
@@ -0,0 +1,80 @@
+"""
+Cue Matcher — one compiled multi-pattern automaton for anchor and cue lists.
+
+Line classification used to run `cue in lowered` for every anchor and cue
+list (ingredient, allergen, may-contain, free-from, nutrition, storage,
+manufacturer anchors; ingredient / nutrition-only cues; inline claim cues).
+That is hundreds of substring scans per line, repeated for the same line by
+classify_line, the content scorer and the block splitter.
+
+MultiPatternMatcher compiles every pattern into one prefix-factored
+(trie-shaped) regex. Because sibling branches start with different
+characters, it is deterministic. The regex runs as a lookahead at each
+position, which yields the longest pattern starting there. Any shorter
+pattern occurring in the text is a substring of some longest-at-position
+hit, so expanding hits through a precomputed containment closure recovers
+exactly the set of patterns present. counts() returns, per category, how
+many of that category's patterns occur. It is the same number as
+`sum(1 for p in patterns if p in text)`.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping
+
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    trie: Dict[str, dict] = {}
+    for pattern in patterns:
+        node = trie
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Greedy optional: prefer extending to a longer pattern, else stop here
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+class MultiPatternMatcher:
+    def __init__(self, categories: Mapping[str, Iterable[str]]):
+        self.categories: Dict[str, List[str]] = {name: list(patterns) for name, patterns in categories.items()}
+
+        # pattern -> {category: multiplicity within that category's list}
+        self._owners: Dict[str, Dict[str, int]] = {}
+        for name, patterns in self.categories.items():
+            for pattern in patterns:
+                if pattern:
+                    owners = self._owners.setdefault(pattern, {})
+                    owners[name] = owners.get(name, 0) + 1
+
+        patterns = sorted(self._owners)
+        self._closure: Dict[str, FrozenSet[str]] = {
+            outer: frozenset(inner for inner in patterns if inner in outer) for outer in patterns
+        }
+        self._regex = re.compile("(?=(" + _trie_regex(patterns) + "))", re.DOTALL) if patterns else None
+
+    def present(self, text: str) -> FrozenSet[str]:
+        """Every pattern occurring in text."""
+        if self._regex is None:
+            return frozenset()
+        found = set()
+        for hit in {m.group(1) for m in self._regex.finditer(text)}:
+            found.update(self._closure[hit])
+        return frozenset(found)
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Per-category number of patterns occurring in text (categories without hits are omitted)."""
+        counts: Dict[str, int] = {}
+        for pattern in self.present(text):
+            for name, multiplicity in self._owners[pattern].items():
+                counts[name] = counts.get(name, 0) + multiplicity
+        return counts
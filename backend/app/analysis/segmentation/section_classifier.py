@@ -13,17 +13,23 @@ Key improvement: detects ingredient content even when OCR destroyed the
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+from typing import Dict
 
 from .anchors import (
     ALLERGEN_ANCHORS,
     FREE_FROM_ANCHORS,
     INGREDIENT_ANCHORS,
+    INLINE_ALLERGEN_TERMS,
+    INLINE_FREE_FROM_CUES,
+    INLINE_MAY_CONTAIN_CUES,
+    INLINE_PRESENCE_VERBS,
     MANUFACTURER_ANCHORS,
     MAY_CONTAIN_ANCHORS,
     NUTRITION_ANCHORS,
     STORAGE_ANCHORS,
-    contains_any,
 )
+from .cue_matcher import MultiPatternMatcher
 
 ECODE_RE = re.compile(r"\be[\s\-]?\d{3,4}[a-z]?\b", re.IGNORECASE)
 
@@ -89,16 +95,42 @@ INGREDIENT_PERCENT_RE = re.compile(r"[(%]\s*\d+[.,]?\d*\s*%?\s*[)]?")
 SUB_INGREDIENT_PAREN_RE = re.compile(r"\([^)]{5,}(?:,|;)[^)]{3,}\)")
 
 
+# Every anchor and cue vocabulary, compiled once; one scan per (lowered) line
+LINE_VOCABULARY = MultiPatternMatcher({
+    "ingredient_anchor": INGREDIENT_ANCHORS,
+    "free_from_anchor": FREE_FROM_ANCHORS,
+    "may_contain_anchor": MAY_CONTAIN_ANCHORS,
+    "allergen_anchor": ALLERGEN_ANCHORS,
+    "nutrition_anchor": NUTRITION_ANCHORS,
+    "storage_anchor": STORAGE_ANCHORS,
+    "manufacturer_anchor": MANUFACTURER_ANCHORS,
+    "ingredient_cue": INGREDIENT_CUES,
+    "nutrition_only_cue": NUTRITION_ONLY_CUES,
+    "inline_free_from": INLINE_FREE_FROM_CUES,
+    "inline_may_contain": INLINE_MAY_CONTAIN_CUES,
+    "inline_allergen_term": INLINE_ALLERGEN_TERMS,
+    "inline_presence_verb": INLINE_PRESENCE_VERBS,
+})
+
+
+@lru_cache(maxsize=4096)
+def line_cue_counts(lowered: str) -> Dict[str, int]:
+    """
+    Per-category anchor/cue hit counts for already-lowercased text.
+    The same line is classified, scored and checked for continuation, so
+    results are cached; treat the returned dict as read-only.
+    """
+    return LINE_VOCABULARY.counts(lowered)
+
+
 def ingredient_cue_count(line: str) -> int:
-    lowered = line.lower()
-    return sum(1 for cue in INGREDIENT_CUES if cue in lowered)
+    return line_cue_counts(line.lower()).get("ingredient_cue", 0)
 
 
 def _nutrition_only_score(line: str) -> int:
     """Score how much a line looks like pure nutritional table data."""
-    lowered = line.lower()
     score = 0
-    score += sum(2 for cue in NUTRITION_ONLY_CUES if cue in lowered)
+    score += 2 * line_cue_counts(line.lower()).get("nutrition_only_cue", 0)
     if NUTRITION_VALUE_RE.search(line):
         score += 3
     # Lines with "X / Y" bilingual nutritional headers
@@ -158,25 +190,26 @@ def classify_line(line: str) -> tuple[str, str]:
     Returns (section_type, anchor_reason).
     """
     lowered = line.lower()
+    cues = line_cue_counts(lowered)
     cue_count = ingredient_cue_count(lowered)
     comma_count = line.count(",") + line.count(";")
     has_ecode = bool(ECODE_RE.search(line))
 
     # ── Priority 1: Explicit anchor keywords ──
-    if contains_any(lowered, INGREDIENT_ANCHORS):
+    if cues.get("ingredient_anchor"):
         return "ingredient_section", "ingredient"
 
-    if contains_any(lowered, FREE_FROM_ANCHORS):
+    if cues.get("free_from_anchor"):
         return "free_from_section", "free_from"
 
-    if contains_any(lowered, MAY_CONTAIN_ANCHORS):
+    if cues.get("may_contain_anchor"):
         return "may_contain_section", "may_contain"
 
-    if contains_any(lowered, ALLERGEN_ANCHORS):
+    if cues.get("allergen_anchor"):
         return "allergen_section", "allergen"
 
     # ── Priority 2: Nutritional table detection ──
-    if contains_any(lowered, NUTRITION_ANCHORS):
+    if cues.get("nutrition_anchor"):
         # But check if ingredients are mixed in
         if cue_count >= 3 and comma_count >= 2:
             return "ingredient_section", "nutrition_mixed_with_ingredients"
@@ -188,10 +221,10 @@ def classify_line(line: str) -> tuple[str, str]:
             return "ingredient_section", "nutrition_mixed_with_ingredients"
         return "nutrition_section", "nutrition"
 
-    if contains_any(lowered, STORAGE_ANCHORS):
+    if cues.get("storage_anchor"):
         return "storage_section", "storage"
 
-    if contains_any(lowered, MANUFACTURER_ANCHORS):
+    if cues.get("manufacturer_anchor"):
         return "manufacturer_section", "manufacturer"
 
     # ── Priority 3: Content-based detection (no anchor keyword needed) ──
@@ -0,0 +1,190 @@
+"""
+Stage Metrics — per-stage timers and counters for the analysis pipeline.
+
+A slow /analyze call could have spent its time in OCR cleanup, block
+splitting, span extraction, exact matching or fuzzy recovery; nothing
+recorded which. FoodLensAnalysisEngine.analyze_structured() now fills a
+RequestTrace when one is active:
+  - timings (seconds): cleanup, segmentation, extraction, exact, fuzzy, total
+  - counts: spans, exact_hits, fuzzy_attempts, fuzzy_hits, fuzzy_memo_hits,
+    fuzzy_candidates_scored (aliases token-scored after the WRatio search),
+    ngram_windows
+
+The fuzzy matcher reads the active trace from a context variable, so no
+signature between the engine and the matcher changes. A trace is active
+when FOODLENS_STAGE_METRICS is on (every engine run is added to the
+process-wide StageMetrics histograms served on /metrics) or when a caller
+asks for a per-request breakdown (/analyze-structured with "debug": true).
+With neither, the pipeline takes no timestamps and the matcher's only cost
+is one context variable read per fuzzy search.
+
+Worker processes (worker_pool.py) forward their observations to the API
+process with each result instead of keeping histograms nobody scrapes.
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STAGES = ("cleanup", "segmentation", "extraction", "exact", "fuzzy", "total")
+COUNTS = (
+    "spans", "exact_hits", "fuzzy_attempts", "fuzzy_hits", "fuzzy_memo_hits",
+    "fuzzy_candidates_scored", "ngram_windows",
+)
+
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+Observation = Tuple[Dict[str, float], Dict[str, int]]
+
+
+class RequestTrace:
+    __slots__ = ("timings", "counts")
+
+    def __init__(self):
+        self.timings: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self.counts: Dict[str, int] = dict.fromkeys(COUNTS, 0)
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.timings[stage] += seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] += n
+
+    def observation(self) -> Observation:
+        return dict(self.timings), dict(self.counts)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in self.timings.items()},
+            "counts": dict(self.counts),
+        }
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("foodlens_request_trace", default=None)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def activate_trace(trace: RequestTrace):
+    """Make trace the active one; pass the returned token to deactivate_trace()."""
+    return _current_trace.set(trace)
+
+
+def deactivate_trace(token) -> None:
+    _current_trace.reset(token)
+
+
+class Histogram:
+    __slots__ = ("buckets", "bucket_counts", "total", "observations")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # last slot: above the largest bound
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.observations += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        rows = []
+        running = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            running += count
+            rows.append((_format_bound(bound), running))
+        rows.append(("+Inf", running + self.bucket_counts[-1]))
+        return rows
+
+
+def _format_bound(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else repr(bound)
+
+
+class StageMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {stage: Histogram(DURATION_BUCKETS) for stage in STAGES}
+        self.counts = {name: Histogram(COUNT_BUCKETS) for name in COUNTS}
+        self.requests = 0
+        self.forwarding = False
+        self._forwarded: List[Observation] = []
+
+    def observe(self, trace: RequestTrace) -> None:
+        self.observe_many([trace.observation()])
+
+    def observe_many(self, observations: Iterable[Observation]) -> None:
+        with self._lock:
+            if self.forwarding:
+                self._forwarded.extend(observations)
+                return
+            for timings, counts in observations:
+                self.requests += 1
+                for stage, seconds in timings.items():
+                    self.durations[stage].observe(seconds)
+                for name, value in counts.items():
+                    self.counts[name].observe(value)
+
+    def start_forwarding(self) -> None:
+        """
+        Keep raw observations for drain() instead of histograms (worker processes).
+
+        Called first in a forked worker. The parent may fork while another
+        of its threads holds the lock, so the worker starts from a fresh
+        lock and empty state instead of the copied ones.
+        """
+        self._lock = threading.Lock()
+        self.durations = {stage: Histogram(DURATION_BUCKETS) for stage in STAGES}
+        self.counts = {name: Histogram(COUNT_BUCKETS) for name in COUNTS}
+        self.requests = 0
+        self._forwarded = []
+        self.forwarding = True
+
+    def drain(self) -> List[Observation]:
+        with self._lock:
+            forwarded, self._forwarded = self._forwarded, []
+        return forwarded
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP foodlens_analysis_requests_total Engine analysis runs (result cache hits excluded).",
+            "# TYPE foodlens_analysis_requests_total counter",
+        ]
+        with self._lock:
+            lines.append(f"foodlens_analysis_requests_total {self.requests}")
+            lines += _render_histograms(
+                "foodlens_stage_duration_seconds", "Time spent per analysis stage.", "stage", self.durations,
+            )
+            lines += _render_histograms(
+                "foodlens_analysis_events_per_request", "Pipeline events per analysis run.", "event", self.counts,
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _render_histograms(metric: str, help_text: str, label: str, histograms: Dict[str, Histogram]) -> List[str]:
+    lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for key, histogram in histograms.items():
+        for bound, count in histogram.cumulative():
+            lines.append(f'{metric}_bucket{{{label}="{key}",le="{bound}"}} {count}')
+        lines.append(f'{metric}_sum{{{label}="{key}"}} {histogram.total:.6f}')
+        lines.append(f'{metric}_count{{{label}="{key}"}} {histogram.observations}')
+    return lines
+
+
+_metrics: Optional[StageMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_stage_metrics() -> StageMetrics:
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = StageMetrics()
+    return _metrics
@@ -1,40 +1,161 @@
-from fastapi import FastAPI
+import hmac
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
 
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from . import config as app_config
+from .analysis.matching.lexicon_delta import upsert_rows
+from .analysis.stage_metrics import get_stage_metrics
+from .lexicon_manager import WARMUP_TEXT, get_lexicon_manager
 from .matcher_engine import FoodLensMatcher
-from .schemas import ImageRequest
+from .schemas import BatchAnalyzeRequest, ImageRequest, LexiconDeltaRequest
+from .worker_pool import PoolSaturated, PoolTimeout, get_worker_pool
 
-app = FastAPI(title="FoodLens API")
+logger = logging.getLogger("FoodLens")
 
 _matcher = None
+_matcher_lock = threading.Lock()
 
 
 def get_matcher():
     global _matcher
     if _matcher is None:
-        _matcher = FoodLensMatcher()
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = FoodLensMatcher()
     return _matcher
 
 
+def warmup():
+    """Load the engine and run one label through every stage (regex compile, fuzzy index)."""
+    matcher = get_matcher()
+    matcher.analyze_structured(WARMUP_TEXT)
+    logger.info("Engine warmup tamamlandı")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if app_config.WARMUP_ON_STARTUP:
+        warmup()
+    # Edits journaled before this worker started (or by its siblings)
+    get_lexicon_manager().sync_journal()
+    get_lexicon_manager().wait()
+    # The first workers fork before the watcher thread exists; later
+    # recycles run on the lexicon thread that changed the version
+    pool = get_worker_pool()
+    pool.start()
+    get_lexicon_manager().add_version_listener(pool.recycle)
+    get_lexicon_manager().start_watcher(app_config.LEXICON_WATCH_INTERVAL_SECONDS)
+    yield
+    get_lexicon_manager().stop_watcher()
+    get_worker_pool().shutdown()
+    if _matcher is not None:
+        try:
+            saved = _matcher.engine.save_fuzzy_memo()
+            if saved:
+                logger.info("Fuzzy memo kaydedildi: %s kayıt", saved)
+        except OSError as exc:
+            logger.warning("Fuzzy memo kaydedilemedi: %s", exc)
+
+
+app = FastAPI(title="FoodLens API", lifespan=lifespan)
+
+
 @app.get("/health")
 def health():
-    return get_matcher().health()
+    data = get_matcher().health()
+    data["worker_pool"] = get_worker_pool().stats()
+    return data
 
 
-@app.post("/analyze")
-def analyze_image(request: ImageRequest):
-    matcher = get_matcher()
-    return {
-        "results": matcher.analyze_text(
-            request.ocr_text,
-            request.selected_allergens,
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    if not app_config.STAGE_METRICS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(get_stage_metrics().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+async def _run_analysis(method: str, *args, timeout: Optional[float] = None):
+    """Run a FoodLensMatcher method on the bounded worker pool (see worker_pool.py)."""
+    matcher = _matcher if _matcher is not None else await run_in_threadpool(get_matcher)
+    try:
+        return await get_worker_pool().submit(matcher, method, *args, timeout=timeout)
+    except PoolSaturated as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis queue is full",
+            headers={"Retry-After": str(exc.retry_after)},
         )
-    }
+    except PoolTimeout as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
+
+
+@app.post("/analyze")
+async def analyze_image(request: ImageRequest):
+    return await _run_analysis(
+        "analyze_text_response",
+        request.ocr_text,
+        request.selected_allergens,
+    )
 
 
 @app.post("/analyze-structured")
-def analyze_image_structured(request: ImageRequest):
-    matcher = get_matcher()
-    return matcher.analyze_structured(
+async def analyze_image_structured(request: ImageRequest):
+    return await _run_analysis(
+        "analyze_structured",
         request.ocr_text,
         request.selected_allergens,
+        request.debug,
+    )
+
+
+@app.post("/analyze-batch")
+async def analyze_batch(request: BatchAnalyzeRequest):
+    if len(request.items) > app_config.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.items)} items (max {app_config.BATCH_MAX_ITEMS})",
+        )
+    return await _run_analysis(
+        "analyze_batch_response",
+        [item.model_dump() for item in request.items],
+        request.structured,
+        timeout=app_config.ANALYSIS_BATCH_TIMEOUT_SECONDS,
     )
+
+
+def _require_admin(token: str) -> None:
+    if not app_config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(token.encode(), app_config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/reload-lexicon", status_code=202)
+def reload_lexicon(x_admin_token: str = Header(default="")):
+    _require_admin(x_admin_token)
+    manager = get_lexicon_manager()
+    try:
+        started = manager.broadcast_reload("admin")
+    except OSError as exc:
+        raise HTTPException(status_code=503, detail=f"Lexicon delta journal is not writable: {exc}")
+    return {"started": started, **manager.status()}
+
+
+@app.post("/admin/lexicon/records")
+def update_lexicon_records(request: LexiconDeltaRequest, x_admin_token: str = Header(default="")):
+    _require_admin(x_admin_token)
+    get_matcher()
+    try:
+        overlay = get_lexicon_manager().record_delta(upsert_rows(request.upserts), request.deletes)
+    except OSError as exc:
+        raise HTTPException(status_code=503, detail=f"Lexicon delta journal is not writable: {exc}")
+    return {
+        "lexicon_version": get_matcher().engine.lexicon.version,
+        "overlay": overlay.stats() if overlay is not None else None,
+    }
@@ -0,0 +1,269 @@
+"""
+Bulk Analysis CLI — re-analyze a whole label catalogue offline.
+
+    python -m backend.app.bulk labels.ndjson -o results.ndjson [--workers N] [--structured]
+    python -m backend.app.bulk labels.csv -o results.ndjson --resume
+
+Catalogue re-runs after a lexicon change used to go through the HTTP API
+one label at a time. This streams the input instead:
+  - input: NDJSON (one object per line) or CSV with an "ocr_text" column
+    (--text-field), an optional "id" (--id-field) and optional
+    "selected_allergens" (a JSON list, or comma separated in CSV); "-" reads
+    NDJSON from stdin
+  - a multiprocessing pool of --workers processes, each with one engine.
+    The engine is built in this process before the pool forks, so workers
+    share its tables through copy-on-write pages (engine_registry.
+    preload_engine)
+  - output: one NDJSON line per input record, in input order, written as
+    results arrive: {"index", "id", "ok", "result"} or {"index", "id",
+    "ok": false, "error"}. At most --max-in-flight records are read ahead
+    of the writer, so memory stays bounded whatever the input size
+  - every --checkpoint-every records the output is flushed and
+    <output>.checkpoint records how many input records are done and the
+    output size at that point. --resume truncates the output to that
+    size and continues after those records; it refuses to mix lexicon
+    versions in one output
+  - progress (records, rate, elapsed) goes to stderr every
+    --progress-seconds, and a JSON summary at the end
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .engine_registry import preload_engine
+from .lexicon_manager import WARMUP_TEXT
+
+logger = logging.getLogger("FoodLens")
+
+# (input index, record id, text, selected allergens, parse error)
+Task = Tuple[int, Any, Optional[str], List[str], Optional[str]]
+
+_worker_matcher = None
+_worker_structured = False
+
+
+def _init_worker(structured: bool) -> None:
+    global _worker_matcher, _worker_structured
+    from .matcher_engine import FoodLensMatcher
+
+    _worker_matcher = FoodLensMatcher()
+    _worker_structured = structured
+    _worker_matcher.engine.analyze_structured(WARMUP_TEXT)
+
+
+def _analyze_task(task: Task) -> Tuple[bool, str]:
+    """(ok, finished output line without the newline) for a task."""
+    index, record_id, text, selected, error = task
+    if error is None:
+        try:
+            if _worker_structured:
+                result = _worker_matcher.analyze_structured(text, selected)
+                result.pop("lexicon_version", None)
+            else:
+                result = _worker_matcher.analyze_text(text, selected)
+            return True, json.dumps({"index": index, "id": record_id, "ok": True, "result": result}, ensure_ascii=False)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+    return False, json.dumps({"index": index, "id": record_id, "ok": False, "error": error}, ensure_ascii=False)
+
+
+def _parse_allergens(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    text = str(value).strip()
+    if text.startswith("["):
+        return [str(item) for item in json.loads(text)]
+    return [part.strip() for part in text.split(",") if part.strip()]
+
+
+def _records(source: io.TextIOBase, fmt: str) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """(record, parse error) per input record, in order."""
+    if fmt == "csv":
+        for row in csv.DictReader(source):
+            yield row, None
+        return
+    for line in source:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield None, "Record is not a JSON object"
+            continue
+        yield record, None
+
+
+def _tasks(records, skip: int, text_field: str, id_field: str, slots: threading.Semaphore) -> Iterator[Task]:
+    for index, (record, error) in enumerate(records):
+        if index < skip:
+            continue
+        slots.acquire()  # released by the writer; bounds records read ahead of it
+        if record is None:
+            yield index, None, None, [], error
+            continue
+        record_id = record.get(id_field)
+        text = record.get(text_field)
+        if not isinstance(text, str) or not text.strip():
+            yield index, record_id, None, [], f"Missing text field: {text_field}"
+            continue
+        try:
+            selected = _parse_allergens(record.get("selected_allergens"))
+        except (ValueError, TypeError) as exc:
+            yield index, record_id, None, [], f"Invalid selected_allergens: {exc}"
+            continue
+        yield index, record_id, text, selected, None
+
+
+def _checkpoint_path(output: Path) -> Path:
+    return output.with_name(output.name + ".checkpoint")
+
+
+def _write_checkpoint(path: Path, state: Dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    output = Path(args.output)
+    checkpoint_file = _checkpoint_path(output)
+    fmt = _detect_format(args.input, args.format)
+
+    engine = preload_engine(freeze=args.workers > 1)
+    version = engine.lexicon.version
+
+    skip = 0
+    if args.resume and checkpoint_file.exists():
+        state = json.loads(checkpoint_file.read_text(encoding="utf-8"))
+        if state.get("lexicon_version") != version:
+            raise SystemExit(
+                f"Checkpoint lexicon sürümü ({state.get('lexicon_version')}) mevcut sürümden ({version}) farklı; "
+                "--resume olmadan baştan çalıştırın"
+            )
+        skip = int(state["completed"])
+        if not output.exists():
+            raise SystemExit(f"Checkpoint var ama çıktı dosyası bulunamadı: {output}")
+        with output.open("r+b") as f:
+            f.truncate(int(state["output_bytes"]))
+        logger.info("Checkpoint'ten devam ediliyor: %s kayıt tamamlanmış", skip)
+    elif args.resume:
+        logger.info("Checkpoint bulunamadı, baştan başlanıyor: %s", checkpoint_file)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8-sig", newline="")
+    out = output.open("a" if skip else "w", encoding="utf-8")
+    slots = threading.Semaphore(args.max_in_flight)
+    tasks = _tasks(_records(source, fmt), skip, args.text_field, args.id_field, slots)
+
+    pool = None
+    if args.workers > 1:
+        pool = multiprocessing.get_context("fork").Pool(
+            args.workers, initializer=_init_worker, initargs=(args.structured,),
+        )
+        lines = pool.imap(_analyze_task, tasks, chunksize=args.chunksize)
+    else:
+        _init_worker(args.structured)
+        lines = map(_analyze_task, tasks)
+
+    completed = skip
+    written = failed = 0
+    t0 = last_progress = time.perf_counter()
+    try:
+        for ok, line in lines:
+            out.write(line + "\n")
+            slots.release()
+            completed += 1
+            written += 1
+            if not ok:
+                failed += 1
+            if written % args.checkpoint_every == 0:
+                out.flush()
+                os.fsync(out.fileno())
+                _write_checkpoint(checkpoint_file, {
+                    "input": args.input, "completed": completed,
+                    "output_bytes": out.tell(), "lexicon_version": version,
+                })
+            now = time.perf_counter()
+            if now - last_progress >= args.progress_seconds:
+                last_progress = now
+                print(
+                    f"⏳ {completed} kayıt ({written / (now - t0):.1f} kayıt/sn, {now - t0:.0f} sn)",
+                    file=sys.stderr, flush=True,
+                )
+    finally:
+        out.flush()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if source is not sys.stdin:
+            source.close()
+
+    _write_checkpoint(checkpoint_file, {
+        "input": args.input, "completed": completed,
+        "output_bytes": out.tell(), "lexicon_version": version, "finished": True,
+    })
+    out.close()
+    elapsed = time.perf_counter() - t0
+    return {
+        "input": args.input,
+        "output": str(output),
+        "lexicon_version": version,
+        "resumed_from": skip,
+        "records": completed,
+        "written": written,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "records_per_s": round(written / elapsed, 1) if elapsed else None,
+        "workers": args.workers,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.app.bulk", description="FoodLens bulk label analysis")
+    parser.add_argument("input", help="NDJSON / CSV file, or - for NDJSON on stdin")
+    parser.add_argument("-o", "--output", required=True, help="NDJSON output file")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default=None)
+    parser.add_argument("--text-field", default="ocr_text")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--structured", action="store_true", help="analyze_structured output instead of the /analyze list")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--max-in-flight", type=int, default=2000)
+    parser.add_argument("--checkpoint-every", type=int, default=1000)
+    parser.add_argument("--progress-seconds", type=float, default=10.0)
+    parser.add_argument("--resume", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.max_in_flight = max(args.max_in_flight, args.workers * args.chunksize * 2)
+    summary = run(args)
+    print(json.dumps(summary, ensure_ascii=False, indent=2), file=sys.stderr)
+    print(f"✅ {summary['written']} kayıt analiz edildi ({summary['failed']} hatalı): {summary['output']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,12 @@ else:
 
 MASTER_CSV_FILE = Path(_selected_master) if Path(_selected_master).is_absolute() else (PROCESSED_DIR / _selected_master)
 
+# Precompiled lexicon snapshot (see analysis/matching/snapshot.py).
+# Built next to the master CSV by scripts/build_lexicon_snapshot.py; ignored when stale.
+_snapshot_env = os.getenv("FOODLENS_LEXICON_SNAPSHOT", "").strip()
+LEXICON_SNAPSHOT_FILE = Path(_snapshot_env) if _snapshot_env else MASTER_CSV_FILE.with_suffix(".snapshot.pkl")
+USE_LEXICON_SNAPSHOT = os.getenv("FOODLENS_USE_LEXICON_SNAPSHOT", "1").strip().lower() not in {"0", "false", "no", "off"}
+
 REFERENCE_ADDITIVES_CSV = PROCESSED_DIR / os.getenv("FOODLENS_REFERENCE_ADDITIVES_FILE", "reference_additives.csv")
 REFERENCE_ALLERGENS_CSV = PROCESSED_DIR / os.getenv("FOODLENS_REFERENCE_ALLERGENS_FILE", "reference_allergens.csv")
 REFERENCE_INGREDIENTS_CSV = PROCESSED_DIR / os.getenv("FOODLENS_REFERENCE_INGREDIENTS_FILE", "reference_ingredients.csv")
@@ -84,6 +90,66 @@ START_KEYWORDS = ["içindekiler", "ingredients", "icindekiler", "bileşenler"]
 
 FUZZY_MIN_FOR_SEMANTIC = float(os.getenv("FOODLENS_FUZZY_MIN_FOR_SEMANTIC", "72"))
 
+# Build and exercise the engine in the app startup hook so the first request never pays the load.
+WARMUP_ON_STARTUP = os.getenv("FOODLENS_WARMUP_ON_STARTUP", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+# Engine-output cache for repeated labels (0 entries disables it; 0 TTL means no expiry).
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("FOODLENS_RESULT_CACHE_MAX_ENTRIES", "2048"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("FOODLENS_RESULT_CACHE_TTL_SECONDS", "3600"))
+
+# Cross-request memo of fuzzy span decisions; optional file keeps it across deploys.
+FUZZY_MEMO_MAX_ENTRIES = int(os.getenv("FOODLENS_FUZZY_MEMO_MAX_ENTRIES", "50000"))
+_fuzzy_memo_env = os.getenv("FOODLENS_FUZZY_MEMO_FILE", "").strip()
+FUZZY_MEMO_FILE = Path(_fuzzy_memo_env) if _fuzzy_memo_env else None
+
+# Trigram prefilter before fuzzy WRatio: "on", "off" or "auto" (on once the
+# lexicon has at least FUZZY_PREFILTER_MIN_ALIASES fuzzy-searchable aliases).
+FUZZY_PREFILTER = os.getenv("FOODLENS_FUZZY_PREFILTER", "auto").strip().lower()
+FUZZY_PREFILTER_MIN_ALIASES = int(os.getenv("FOODLENS_FUZZY_PREFILTER_MIN_ALIASES", "20000"))
+FUZZY_PREFILTER_MAX_CANDIDATES = int(os.getenv("FOODLENS_FUZZY_PREFILTER_MAX_CANDIDATES", "800"))
+
+# Single-token fuzzy candidate search: "wratio" (scan / prefilter) or "deletion"
+# (SymSpell-style deletion index, same decisions as the scan).
+FUZZY_SINGLE_TOKEN_INDEX = os.getenv("FOODLENS_FUZZY_SINGLE_TOKEN_INDEX", "wratio").strip().lower()
+FUZZY_DELETION_MAX_DELETES = int(os.getenv("FOODLENS_FUZZY_DELETION_MAX_DELETES", "2"))
+
+# Lexicon hot reload (lexicon_manager.py): poll the master CSV every N seconds
+# (0 disables watching). POST /admin/reload-lexicon needs FOODLENS_ADMIN_TOKEN
+# in the X-Admin-Token header; without a configured token the endpoint is off.
+LEXICON_WATCH_INTERVAL_SECONDS = float(os.getenv("FOODLENS_LEXICON_WATCH_INTERVAL_SECONDS", "30"))
+ADMIN_TOKEN = os.getenv("FOODLENS_ADMIN_TOKEN", "").strip()
+
+# Incremental lexicon edits (analysis/matching/lexicon_delta.py) are folded into
+# freshly built base tables once the overlay touches this many aliases.
+LEXICON_DELTA_COMPACT_THRESHOLD = int(os.getenv("FOODLENS_LEXICON_DELTA_COMPACT_THRESHOLD", "2000"))
+
+# POST /admin/lexicon/records and /admin/reload-lexicon append to this journal
+# (one JSON line per edit) and every worker process applies it on its watcher
+# poll, so with FOODLENS_WORKERS > 1 keep watching on. Remove or rotate it once
+# its edits are in the master CSV; the workers then reload.
+_journal_env = os.getenv("FOODLENS_LEXICON_DELTA_JOURNAL", "").strip()
+LEXICON_DELTA_JOURNAL_FILE = Path(_journal_env) if _journal_env else MASTER_CSV_FILE.with_suffix(".delta.jsonl")
+
+# Upper bound for /analyze-batch; larger catalogue jobs should be split client-side.
+BATCH_MAX_ITEMS = int(os.getenv("FOODLENS_BATCH_MAX_ITEMS", "1000"))
+
+# Per-stage timers and counters (analysis/stage_metrics.py) for every engine run,
+# served as Prometheus histograms on /metrics. Off: /metrics answers 404 and the
+# pipeline takes no timestamps (/analyze-structured "debug" breakdowns still work).
+STAGE_METRICS = os.getenv("FOODLENS_STAGE_METRICS", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+# Async analysis path (worker_pool.py). FOODLENS_ANALYSIS_WORKERS > 0 runs analysis in
+# that many worker processes forked from the loaded engine; 0 keeps it on threads of the
+# API process. Past MAX_PENDING queued/running requests the API answers 503 (Retry-After).
+# "fork" is the only start method that hands workers the serving lexicon including
+# runtime deltas; "forkserver"/"spawn" workers load the snapshot/CSV themselves.
+ANALYSIS_WORKERS = int(os.getenv("FOODLENS_ANALYSIS_WORKERS", "0"))
+ANALYSIS_MAX_PENDING = int(os.getenv("FOODLENS_ANALYSIS_MAX_PENDING", "64"))
+ANALYSIS_TIMEOUT_SECONDS = float(os.getenv("FOODLENS_ANALYSIS_TIMEOUT_SECONDS", "10"))
+ANALYSIS_BATCH_TIMEOUT_SECONDS = float(os.getenv("FOODLENS_ANALYSIS_BATCH_TIMEOUT_SECONDS", "120"))
+ANALYSIS_RETRY_AFTER_SECONDS = int(os.getenv("FOODLENS_ANALYSIS_RETRY_AFTER_SECONDS", "1"))
+ANALYSIS_START_METHOD = os.getenv("FOODLENS_ANALYSIS_START_METHOD", "fork").strip().lower()
+
 def thresholds_for_type(item_type: str):
     if item_type == "ingredient":
         return {"fuzzy_strong": 96, "fuzzy_fallback": 92, "semantic": 0.90}
@@ -65,8 +65,14 @@ def _is_valid_master_row(row: Record) -> bool:
     return bool(has_name and has_type)
 
 
-@lru_cache(maxsize=1)
 def load_master_records() -> List[Record]:
+    """
+    Raw master rows (name_tr/name_en/keywords/search_text) for offline scripts.
+
+    Not cached: the serving path uses the shared engine from engine_registry,
+    so a worker should not keep a second, differently shaped copy of the
+    master CSV alive for the lifetime of the process.
+    """
     rows = _read_csv(MASTER_CSV_FILE)
     cleaned_rows: List[Record] = []
 
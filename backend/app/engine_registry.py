@@ -0,0 +1,81 @@
+"""
+Engine Registry — one shared FoodLensAnalysisEngine per process.
+
+Every entry point (API matcher, CLI search in matcher.py, scripts) must get
+the engine from here instead of constructing FoodLensAnalysisEngine itself,
+so a worker process holds exactly one lexicon, alias_map and fuzzy index.
+
+The engine is built lazily on first use; concurrent first calls are
+serialized by a lock so only one build ever runs. Pre-fork servers call
+preload_engine() in the master process instead, so workers inherit the
+tables through copy-on-write pages rather than each building a copy.
+
+Callers fetch the engine per request rather than caching it: a lexicon hot
+reload (lexicon_manager.py) replaces it with swap_engine().
+"""
+from __future__ import annotations
+
+import gc
+import logging
+import threading
+from typing import Optional
+
+from .analysis.engine import FoodLensAnalysisEngine
+
+logger = logging.getLogger("FoodLens")
+
+_engine: Optional[FoodLensAnalysisEngine] = None
+_lock = threading.Lock()
+
+
+def get_engine() -> FoodLensAnalysisEngine:
+    global _engine
+    engine = _engine
+    if engine is not None:
+        return engine
+
+    with _lock:
+        if _engine is None:
+            _engine = FoodLensAnalysisEngine()
+        return _engine
+
+
+def is_engine_loaded() -> bool:
+    return _engine is not None
+
+
+def swap_engine(engine: FoodLensAnalysisEngine) -> Optional[FoodLensAnalysisEngine]:
+    """
+    Replace the shared engine with a fully built one and return the old one.
+
+    Callers that already hold the old engine keep using it until they drop
+    it; see lexicon_manager.py for the hot-reload path.
+    """
+    global _engine
+    with _lock:
+        previous, _engine = _engine, engine
+    return previous
+
+
+def reset_engine() -> None:
+    """Drop the shared engine; the next get_engine() call rebuilds it."""
+    global _engine
+    with _lock:
+        _engine = None
+
+
+def preload_engine(freeze: bool = True) -> FoodLensAnalysisEngine:
+    """
+    Build the engine ahead of fork and make its tables fork-friendly.
+
+    The lookup tables are compacted, then every object alive so far is moved
+    to the permanent generation with gc.freeze(), so the collector in forked
+    workers never writes to (and un-shares) those pages.
+    """
+    engine = get_engine()
+    engine.compact()
+    if freeze and hasattr(gc, "freeze"):
+        gc.collect()
+        gc.freeze()
+        logger.info("Engine pre-fork yüklendi, %s nesne donduruldu", gc.get_freeze_count())
+    return engine
@@ -0,0 +1,414 @@
+"""
+Lexicon Manager — hot reload of the master lexicon without a restart.
+
+The master CSV changes while the service runs (scripts/madde_ekleyici.py
+appends entries). Reloading goes through here:
+  - a watcher thread polls the CSV's (mtime, size) every
+    LEXICON_WATCH_INTERVAL_SECONDS. A new signature must be seen on two
+    polls in a row before it counts, so a file that is still being written
+    is not loaded half-finished. The CSV is then hashed and compared with
+    the serving lexicon's csv_sha256.
+  - POST /admin/reload-lexicon (api.py) requests a reload explicitly.
+    The request is written to the delta journal (below), so every worker
+    process of a multi-worker deployment reloads, not only the one that
+    received it. A process's first sync skips the reload lines already in
+    the journal: its engine was just built from the current CSV.
+
+When the only change is rows appended to the end of the CSV (checked
+against the served content's hash), those rows are applied as an
+incremental delta instead (analysis/matching/lexicon_delta.py).
+POST /admin/lexicon/records applies record upserts / deletes the same way,
+through a journal (LEXICON_DELTA_JOURNAL_FILE, one JSON object per line)
+instead of in-process state: the receiving worker appends the edit with a
+single O_APPEND write, and every worker applies the journal lines past its
+own offset on each watcher poll (sync_journal). Workers therefore converge
+within one LEXICON_WATCH_INTERVAL_SECONDS, and apply edits in journal order
+so they agree on the version. The serving lexicon is always the CSV plus
+the journal: a full reload replays the journal onto the new engine, and
+compaction keeps it. A journal that shrinks (rotated or removed after its
+edits were merged into the CSV) triggers a full reload. Once an overlay touches
+LEXICON_DELTA_COMPACT_THRESHOLD aliases, a compacted engine is built in
+the background and swapped in like a reload. Deltas wait while a rebuild
+runs, so none of them is lost in the swap.
+
+A reload builds a complete FoodLensAnalysisEngine (lexicon, exact automaton,
+fuzzy indexes) in a background thread and warms it up. Only then is it
+swapped into engine_registry with a single reference assignment. Requests
+take the engine once at their start (get_engine()), so requests already in
+flight finish on the old version. Requests that start after the swap see
+the new one. A failed build is logged and leaves the serving engine
+untouched. Deltas give a weaker guarantee: they change the serving engine
+in place, so a request that is running when one is published may see it
+from that point on. Each request still reports the single version it read
+at its start, and such a mixed result is not cached (matcher_engine.py).
+
+Under gunicorn every worker builds its own replacement engine. The new
+tables are private to the worker, so the copy-on-write sharing that
+preload_engine set up in the master is lost for them until the workers are
+restarted from a master that loads the new CSV (a full restart, not HUP:
+preload_app keeps the master's engine across HUP).
+
+Code that holds state derived from the serving engine registers a version
+listener (add_version_listener). Listeners run on the thread that changed the
+version, after the swap or delta: the analysis worker pool re-forks its
+workers there instead of on a request.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import config as app_config
+from .analysis.engine import FoodLensAnalysisEngine, _resolve_db_file
+from .analysis.matching.lexicon import file_sha256
+from .analysis.matching.lexicon_delta import LexiconOverlay, read_appended_rows
+from .engine_registry import get_engine, is_engine_loaded, swap_engine
+
+logger = logging.getLogger("FoodLens")
+
+WARMUP_TEXT = "İçindekiler: buğday unu, şeker, bitkisel yağ, tuz, E330, potesyum sorbat."
+
+FileSignature = Tuple[int, int]  # (mtime_ns, size)
+
+
+def _append_journal(path: Path, entry: Dict[str, Any]) -> None:
+    """Append one journal line; O_APPEND keeps lines from concurrent workers whole."""
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def _read_journal(path: Path, offset: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    (entries, new offset) for the complete journal lines between offset and
+    limit (end of file if None). A line still being written is left for the
+    next read.
+    """
+    try:
+        with path.open("rb") as f:
+            f.seek(offset)
+            data = f.read() if limit is None else f.read(max(0, limit - offset))
+    except FileNotFoundError:
+        return [], offset
+    end = data.rfind(b"\n") + 1
+    entries = []
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            logger.warning("Bozuk lexicon delta günlüğü satırı atlandı (%s)", path)
+    return entries, offset + end
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _file_signature(path: Path) -> Optional[FileSignature]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class LexiconManager:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Held while an edit is applied or a replacement engine is built and swapped
+        self._delta_lock = threading.Lock()
+        self._build_thread: Optional[threading.Thread] = None
+        self._watch_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._seen_signature: Optional[FileSignature] = None
+        self._pending_signature: Optional[FileSignature] = None
+        self.reload_count = 0
+        self.failed_reloads = 0
+        self.last_reload_at: Optional[float] = None
+        self.last_reload_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.previous_version: Optional[str] = None
+        self.delta_count = 0
+        self.compaction_count = 0
+        self.last_delta_ms: Optional[float] = None
+        self._version_listeners: List[Callable[[], None]] = []
+        # Bytes of the delta journal already applied to the serving engine
+        self._journal_offset = 0
+        # False until the first sync: reload lines written before this process
+        # built its engine from the current CSV are already satisfied
+        self._journal_synced = False
+        self._reload_requested: Optional[str] = None
+
+    def add_version_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener() whenever the serving lexicon version changes."""
+        self._version_listeners.append(listener)
+
+    def _version_changed(self) -> None:
+        for listener in list(self._version_listeners):
+            try:
+                listener()
+            except Exception:
+                logger.exception("Lexicon sürüm dinleyicisi başarısız")
+
+    @property
+    def building(self) -> bool:
+        thread = self._build_thread
+        return thread is not None and thread.is_alive()
+
+    def _start_build(self, reason: str, compact: bool) -> bool:
+        with self._lock:
+            if self.building:
+                return False
+            self._build_thread = threading.Thread(
+                target=self._rebuild, args=(reason, compact), name="lexicon-reload", daemon=True,
+            )
+            self._build_thread.start()
+            return True
+
+    def request_reload(self, reason: str = "manual") -> bool:
+        """Start a background rebuild from the CSV; False if a rebuild is already running."""
+        return self._start_build(reason, compact=False)
+
+    def request_compaction(self) -> bool:
+        """Start folding the lexicon overlay into new base tables in the background."""
+        return self._start_build("compaction", compact=True)
+
+    def apply_delta(
+        self,
+        upserts: Iterable[Dict[str, str]] = (),
+        deletes: Iterable[str] = (),
+        append_only: bool = False,
+        csv_state: Optional[Tuple[str, int]] = None,
+    ) -> LexiconOverlay:
+        """
+        Apply record edits to this process's serving engine; schedules
+        compaction past the threshold. Other worker processes do not see
+        them: edits for the whole service go through record_delta().
+        """
+        with self._delta_lock:
+            overlay = self._apply_locked(upserts, deletes, append_only, csv_state)
+        self._delta_applied(overlay)
+        return overlay
+
+    def _apply_locked(self, upserts, deletes, append_only=False, csv_state=None) -> LexiconOverlay:
+        t0 = time.perf_counter()
+        engine = get_engine()
+        overlay = engine.apply_lexicon_delta(upserts, deletes, append_only=append_only, csv_state=csv_state)
+        self.delta_count += 1
+        self.last_delta_ms = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info("Lexicon delta uygulandı: sürüm %s (%.1f ms)", engine.lexicon.version, self.last_delta_ms)
+        return overlay
+
+    def _delta_applied(self, overlay: LexiconOverlay) -> None:
+        self._version_changed()
+        if overlay.size >= app_config.LEXICON_DELTA_COMPACT_THRESHOLD:
+            self.request_compaction()
+
+    # ── Delta journal ───────────────────────────────────────────────────────
+
+    def record_delta(self, upserts: Iterable[Dict[str, str]] = (), deletes: Iterable[str] = ()) -> Optional[LexiconOverlay]:
+        """Journal record edits for every worker and apply them here; OSError if the journal is not writable."""
+        _append_journal(app_config.LEXICON_DELTA_JOURNAL_FILE, {"upserts": list(upserts), "deletes": list(deletes)})
+        self.sync_journal()
+        return get_engine().lexicon.overlay
+
+    def broadcast_reload(self, reason: str = "manual") -> bool:
+        """Journal a reload request for every worker and start it here; False if a rebuild is already running."""
+        _append_journal(app_config.LEXICON_DELTA_JOURNAL_FILE, {"reload": reason})
+        self.sync_journal()
+        return self._reload_requested is None
+
+    def sync_journal(self) -> bool:
+        """Apply journal lines written since the last sync (by any worker); True if anything changed."""
+        path = app_config.LEXICON_DELTA_JOURNAL_FILE
+        if not is_engine_loaded():
+            return False
+        overlay = None
+        with self._delta_lock:
+            if _file_size(path) < self._journal_offset:
+                logger.info("Lexicon delta günlüğü küçüldü, yeniden yükleniyor")
+                self._reload_requested = "journal_rotated"
+                entries = []
+            else:
+                entries, self._journal_offset = _read_journal(path, self._journal_offset)
+            startup, self._journal_synced = not self._journal_synced, True
+            for entry in entries:
+                if "reload" in entry:
+                    if not startup:
+                        self._reload_requested = str(entry["reload"])
+                else:
+                    overlay = self._apply_locked(entry.get("upserts", ()), entry.get("deletes", ()))
+        if overlay is not None:
+            self._delta_applied(overlay)
+        reason = self._reload_requested
+        # A rebuild already running may have read the CSV before the request;
+        # the request stays pending until a later sync can start one
+        if reason is not None and self.request_reload(reason):
+            self._reload_requested = None
+        return overlay is not None or bool(entries) or reason is not None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a running rebuild; True once no rebuild is running."""
+        thread = self._build_thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.building
+
+    def _rebuild(self, reason: str, compact: bool = False) -> None:
+        logger.info("Lexicon yeniden yükleniyor (%s)", reason)
+        t0 = time.perf_counter()
+        journal = app_config.LEXICON_DELTA_JOURNAL_FILE
+        signature: Optional[FileSignature] = None
+        with self._delta_lock:
+            journal_offset = self._journal_offset
+            try:
+                if compact:
+                    current = get_engine()
+                    if current.lexicon.overlay is None:
+                        return
+                    engine = current.compacted()
+                else:
+                    # Lines written from here on are applied by the next sync,
+                    # reload requests among them included
+                    journal_limit = _file_size(journal)
+                    # Taken before the build reads the CSV: a write during the
+                    # build then shows up as a new signature on the next poll
+                    signature = _file_signature(_resolve_db_file())
+                    engine = FoodLensAnalysisEngine()
+                    entries, journal_offset = _read_journal(journal, 0, journal_limit)
+                    for entry in entries:
+                        if "reload" not in entry:
+                            engine.apply_lexicon_delta(entry.get("upserts", ()), entry.get("deletes", ()))
+                engine.analyze_structured(WARMUP_TEXT)
+            except Exception as exc:
+                self.failed_reloads += 1
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                logger.exception("Lexicon yeniden yüklenemedi, mevcut sürüm kullanılmaya devam ediyor")
+                return
+            old = swap_engine(engine)
+            self._journal_offset = journal_offset
+            self._journal_synced = True
+
+        self.previous_version = old.lexicon.version if old is not None else None
+        if compact:
+            self.compaction_count += 1
+        else:
+            self.reload_count += 1
+            self._seen_signature = signature
+        self.last_reload_at = time.time()
+        self.last_reload_seconds = round(time.perf_counter() - t0, 3)
+        self.last_error = None
+        logger.info(
+            "Lexicon sürümü değişti: %s -> %s (%.2f sn)",
+            self.previous_version, engine.lexicon.version, self.last_reload_seconds,
+        )
+        self._version_changed()
+
+    # ── File watching ───────────────────────────────────────────────────────
+
+    def check_for_update(self) -> bool:
+        """One watcher poll; True if a reload was started."""
+        if not is_engine_loaded() or self.building:
+            return False
+
+        engine = get_engine()
+        signature = _file_signature(engine.db_file)
+        if signature is None:
+            return False
+        if signature == self._seen_signature:
+            self._pending_signature = None
+            return False
+        if self._seen_signature is not None and signature != self._pending_signature:
+            # Changed since the last poll; wait one more poll for the write to finish
+            self._pending_signature = signature
+            return False
+
+        self._pending_signature = None
+        self._seen_signature = signature
+        csv_sha256, csv_size = engine.lexicon.csv_state
+        try:
+            current_hash = file_sha256(engine.db_file)
+            appended = read_appended_rows(engine.db_file, csv_sha256, csv_size) if current_hash != csv_sha256 else None
+        except OSError as exc:
+            logger.warning("Master CSV okunamadı (%s): %s", engine.db_file, exc)
+            return False
+        if current_hash == csv_sha256:
+            return False
+
+        if appended is not None:
+            rows, new_sha256, new_size = appended
+            if new_sha256 == current_hash:
+                self.apply_delta(rows, append_only=True, csv_state=(new_sha256, new_size))
+                return True
+        return self.request_reload("csv_changed")
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.sync_journal()
+                self.check_for_update()
+            except Exception:
+                logger.exception("Lexicon dosya izleme hatası")
+
+    def start_watcher(self, interval: float) -> bool:
+        """Poll the master CSV every interval seconds; 0 disables watching."""
+        if interval <= 0 or (self._watch_thread is not None and self._watch_thread.is_alive()):
+            return False
+        self._stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch, args=(interval,), name="lexicon-watch", daemon=True,
+        )
+        self._watch_thread.start()
+        logger.info("Lexicon dosya izleme aktif (%s sn)", interval)
+        return True
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        thread = self._watch_thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self._watch_thread = None
+
+    def status(self) -> Dict[str, Any]:
+        watching = self._watch_thread is not None and self._watch_thread.is_alive()
+        return {
+            "version": get_engine().lexicon.version if is_engine_loaded() else None,
+            "previous_version": self.previous_version,
+            "building": self.building,
+            "watching": watching,
+            "reload_count": self.reload_count,
+            "failed_reloads": self.failed_reloads,
+            "last_reload_at": self.last_reload_at,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_error": self.last_error,
+            "delta_count": self.delta_count,
+            "compaction_count": self.compaction_count,
+            "last_delta_ms": self.last_delta_ms,
+            "journal_offset": self._journal_offset,
+        }
+
+
+_manager: Optional[LexiconManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_lexicon_manager() -> LexiconManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = LexiconManager()
+    return _manager
@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-from .analysis.engine import FoodLensAnalysisEngine
-
-_engine = FoodLensAnalysisEngine()
+from .engine_registry import get_engine
 
 
 def search(query: str, limit: int = 5):
-    record = _engine.lexicon.exact_lookup(query, "ingredient_section")
+    record = get_engine().lexicon.exact_lookup(query, "ingredient_section")
     if not record:
         return []
     return [{
@@ -20,7 +18,7 @@ def search(query: str, limit: int = 5):
 
 
 if __name__ == "__main__":
-    print(f"Matcher veritabanı yüklendi: {_engine.db_file}")
+    print(f"Matcher veritabanı yüklendi: {get_engine().db_file}")
     while True:
         q = input("Arama sorgusu (çıkış için q): ").strip()
         if q.lower() == "q":
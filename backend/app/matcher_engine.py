@@ -1,41 +1,165 @@
 from __future__ import annotations
 
 import logging
+from typing import Any, Dict, List
 
-from .analysis.engine import FoodLensAnalysisEngine
+from . import config as app_config
+from .analysis.stage_metrics import RequestTrace
+from .engine_registry import get_engine
 from .input_normalization import canonicalize_analysis_text
+from .lexicon_manager import get_lexicon_manager
+from .result_cache import AnalysisResultCache
 from .sensitivity import enrich_results_with_sensitivities
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("FoodLens")
 
+STRUCTURED_SECTIONS = ("present", "may_contain", "free_from")
+
 
 class FoodLensMatcher:
     def __init__(self):
         logger.info("Rule-based FoodLens matcher başlatılıyor")
-        self.engine = FoodLensAnalysisEngine()
-        self.database = self.engine.lexicon.records
-        self.exact_map = self.engine.lexicon.alias_map
-        self.search_aliases = list(self.engine.lexicon.alias_map.keys())
+        get_engine()
+        self.result_cache = AnalysisResultCache(
+            app_config.RESULT_CACHE_MAX_ENTRIES,
+            app_config.RESULT_CACHE_TTL_SECONDS,
+        )
 
-    def health(self):
-        return self.engine.health()
+    @property
+    def engine(self):
+        """The serving engine; fetch it once per request, a lexicon reload may swap it."""
+        return get_engine()
 
-    def analyze_structured(self, text: str, selected_allergens: list[str] | None = None):
-        normalized_text = canonicalize_analysis_text(text)
-        data = self.engine.analyze_structured(normalized_text).to_debug_dict()
+    @property
+    def database(self):
+        return self.engine.lexicon.records
+
+    @property
+    def exact_map(self):
+        return self.engine.lexicon.alias_map
+
+    @property
+    def search_aliases(self):
+        return self.engine.lexicon.alias_map.keys()
+
+    def health(self):
+        data = self.engine.health()
+        data["result_cache"] = self.result_cache.stats()
+        data["lexicon_manager"] = get_lexicon_manager().status()
+        return data
 
-        for section_name in ("present", "may_contain", "free_from"):
-            section_items = data.get(section_name, [])
+    def _enrich_structured(self, data: Dict[str, Any], selected_allergens: list[str] | None) -> Dict[str, Any]:
+        enriched = dict(data)
+        for section_name in STRUCTURED_SECTIONS:
+            section_items = enriched.get(section_name, [])
             if isinstance(section_items, list):
-                data[section_name] = enrich_results_with_sensitivities(
+                enriched[section_name] = enrich_results_with_sensitivities(
                     section_items,
                     selected_allergens or [],
                 )
+        return enriched
 
-        return data
+    def _run_engine(self, engine, version: str, normalized_text: str, structured: bool):
+        """
+        Engine output for canonicalized text, served from the result cache when possible.
 
-    def analyze_text(self, text: str, selected_allergens: list[str] | None = None):
+        version is the lexicon version the request read once at its start and
+        reports. A lexicon delta changes the engine in place, so one published
+        during the run may be partly visible in its output: that output is
+        returned but not cached under either version.
+        """
+        key = (version, structured, normalized_text)
+        found, output = self.result_cache.get(key)
+        if found:
+            return output
+
+        if structured:
+            output = engine.analyze_structured(normalized_text).to_debug_dict()
+        else:
+            output = engine.analyze_for_api(normalized_text)
+        if engine.lexicon.version == version:
+            self.result_cache.put(key, output)
+        return output
+
+    def analyze_structured(self, text: str, selected_allergens: list[str] | None = None, debug: bool = False):
+        """
+        Structured analysis; debug adds "stages", this call's per-stage
+        timings and counts (the result cache is bypassed so the engine runs).
+        """
+        engine = get_engine()
+        version = engine.lexicon.version
         normalized_text = canonicalize_analysis_text(text)
-        results = self.engine.analyze_for_api(normalized_text)
-        return enrich_results_with_sensitivities(results, selected_allergens or [])
+        if debug:
+            trace = RequestTrace()
+            data = engine.analyze_structured(normalized_text, trace=trace).to_debug_dict()
+        else:
+            data = self._run_engine(engine, version, normalized_text, structured=True)
+        enriched = self._enrich_structured(data, selected_allergens)
+        enriched["lexicon_version"] = version
+        if debug:
+            enriched["stages"] = trace.to_dict()
+        return enriched
+
+    def analyze_text_response(self, text: str, selected_allergens: list[str] | None = None) -> Dict[str, Any]:
+        """/analyze body: flat results plus the lexicon version that produced them."""
+        engine = get_engine()
+        version = engine.lexicon.version
+        normalized_text = canonicalize_analysis_text(text)
+        results = self._run_engine(engine, version, normalized_text, structured=False)
+        return {
+            "results": enrich_results_with_sensitivities(results, selected_allergens or []),
+            "lexicon_version": version,
+        }
+
+    def analyze_text(self, text: str, selected_allergens: list[str] | None = None):
+        return self.analyze_text_response(text, selected_allergens)["results"]
+
+    def analyze_batch(self, items: List[Dict[str, Any]], structured: bool = False) -> List[Dict[str, Any]]:
+        return self.analyze_batch_response(items, structured)["results"]
+
+    def analyze_batch_response(self, items: List[Dict[str, Any]], structured: bool = False) -> Dict[str, Any]:
+        """
+        Analyze many labels in one call.
+
+        Identical texts (after canonicalization) are analyzed once per batch;
+        sensitivity enrichment still runs per item because selected allergens
+        differ between items. Failures are reported per item so one bad label
+        does not fail the whole batch. The whole batch runs on one engine,
+        even if a reload lands while it is being processed, and reports the
+        version it started on (see _run_engine for deltas).
+        """
+        engine = get_engine()
+        version = engine.lexicon.version
+        engine_outputs: Dict[str, Any] = {}
+        engine_errors: Dict[str, str] = {}
+        results: List[Dict[str, Any]] = []
+
+        for index, item in enumerate(items):
+            selected = item.get("selected_allergens") or []
+            try:
+                normalized_text = canonicalize_analysis_text(item.get("ocr_text", ""))
+            except Exception as exc:
+                logger.exception("Batch item %s canonicalization failed", index)
+                results.append({"index": index, "ok": False, "error": str(exc)})
+                continue
+
+            if normalized_text not in engine_outputs and normalized_text not in engine_errors:
+                try:
+                    engine_outputs[normalized_text] = self._run_engine(engine, version, normalized_text, structured)
+                except Exception as exc:
+                    logger.exception("Batch item %s analysis failed", index)
+                    engine_errors[normalized_text] = str(exc)
+
+            if normalized_text in engine_errors:
+                results.append({"index": index, "ok": False, "error": engine_errors[normalized_text]})
+                continue
+
+            output = engine_outputs[normalized_text]
+            if structured:
+                result = self._enrich_structured(output, selected)
+            else:
+                result = enrich_results_with_sensitivities(output, selected)
+            results.append({"index": index, "ok": True, "result": result})
+
+        return {"results": results, "lexicon_version": version}
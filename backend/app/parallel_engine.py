@@ -0,0 +1,212 @@
+"""
+Parallel Analysis Engine — bulk analysis across all cores.
+
+FoodLensAnalysisEngine.analyze_structured is single-threaded Python, so a
+bulk job in one process uses one core however many the machine has.
+ParallelAnalysisEngine spreads an iterable of texts over a process pool:
+  - each worker holds one engine, loaded once. With the default "fork" start
+    method it is built (or taken from the engine registry) in this process
+    before the workers fork, so they share its tables through copy-on-write
+    pages (engine_registry.preload_engine). With "spawn" / "forkserver"
+    each worker builds its own; set FOODLENS_LEXICON_SNAPSHOT so that is a
+    snapshot load rather than a CSV parse
+  - texts go out in chunks, sized from the measured per-text time so a chunk
+    takes about target_chunk_seconds: large enough that pickling and queue
+    round trips are a small share of the work, small enough that the last
+    chunks still spread over every worker. At most 2 chunks per worker are
+    in flight, so the input is consumed lazily
+  - each text comes back as a CompactAnalysis of (item_id, match_type,
+    match_score) tuples per section instead of to_debug_dict(): a few
+    dozen bytes to pickle per label rather than kilobytes
+Results are yielded in input order. A text that raises yields a
+CompactAnalysis with only error set; the rest of the job continues.
+With workers <= 1 everything runs in this process, without a pool.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .analysis.engine import FoodLensAnalysisEngine
+from .engine_registry import get_engine, preload_engine
+from .input_normalization import canonicalize_analysis_text
+from .lexicon_manager import WARMUP_TEXT
+
+logger = logging.getLogger("FoodLens")
+
+# (item_id, match_type, match_score)
+CompactMatch = Tuple[str, str, int]
+
+
+class CompactAnalysis(NamedTuple):
+    present: Tuple[CompactMatch, ...] = ()
+    may_contain: Tuple[CompactMatch, ...] = ()
+    free_from: Tuple[CompactMatch, ...] = ()
+    error: Optional[str] = None
+
+
+def compact_analysis(engine: FoodLensAnalysisEngine, text: str, canonicalize: bool = True) -> CompactAnalysis:
+    try:
+        analysis = engine.analyze_structured(canonicalize_analysis_text(text) if canonicalize else text)
+    except Exception as exc:
+        return CompactAnalysis(error=f"{type(exc).__name__}: {exc}")
+    return CompactAnalysis(
+        tuple((item.item_id, item.match_type, item.match_score) for item in analysis.present),
+        tuple((item.item_id, item.match_type, item.match_score) for item in analysis.may_contain),
+        tuple((item.item_id, item.match_type, item.match_score) for item in analysis.free_from),
+    )
+
+
+def _init_worker() -> None:
+    """Worker process setup: load (or keep the inherited) engine, leave Ctrl-C to the parent."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    get_engine().analyze_structured(WARMUP_TEXT)
+
+
+def _worker_ready() -> str:
+    return get_engine().lexicon.version
+
+
+def _analyze_chunk(texts: List[str], canonicalize: bool) -> Tuple[List[CompactAnalysis], float]:
+    """(results, seconds spent analyzing) for one chunk."""
+    engine = get_engine()
+    t0 = time.perf_counter()
+    results = [compact_analysis(engine, text, canonicalize) for text in texts]
+    return results, time.perf_counter() - t0
+
+
+class ParallelAnalysisEngine:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        start_method: str = "fork",
+        target_chunk_seconds: float = 0.1,
+        min_chunk: int = 1,
+        max_chunk: int = 256,
+        canonicalize: bool = True,
+    ):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.start_method = start_method
+        self.target_chunk_seconds = float(target_chunk_seconds)
+        self.min_chunk = max(1, int(min_chunk))
+        self.max_chunk = max(self.min_chunk, int(max_chunk))
+        self.canonicalize = canonicalize
+        self.lexicon_version: Optional[str] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Exponential moving average of analysis seconds per text, from finished chunks
+        self._seconds_per_text: Optional[float] = None
+        self.texts_done = 0
+        self.chunks_done = 0
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.workers > 1
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if not self.uses_processes:
+            engine = get_engine()
+            engine.analyze_structured(WARMUP_TEXT)
+            self.lexicon_version = engine.lexicon.version
+            return
+        if self.start_method == "fork":
+            self.lexicon_version = preload_engine(freeze=True).lexicon.version
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+        )
+        versions = {future.result() for future in [self._executor.submit(_worker_ready) for _ in range(self.workers)]}
+        if len(versions) != 1:
+            self.close()
+            raise RuntimeError(f"Workers loaded different lexicon versions: {sorted(versions)}")
+        self.lexicon_version = versions.pop()
+        logger.info("Paralel analiz motoru hazır: %s süreç, sürüm %s", self.workers, self.lexicon_version)
+
+    def close(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ParallelAnalysisEngine":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def next_chunk_size(self) -> int:
+        if self._seconds_per_text is None:
+            return self.min_chunk
+        size = int(self.target_chunk_seconds / max(self._seconds_per_text, 1e-6))
+        return min(self.max_chunk, max(self.min_chunk, size))
+
+    def _record_chunk(self, count: int, seconds: float) -> None:
+        per_text = seconds / max(count, 1)
+        previous = self._seconds_per_text
+        self._seconds_per_text = per_text if previous is None else 0.8 * previous + 0.2 * per_text
+        self.texts_done += count
+        self.chunks_done += 1
+
+    def analyze_many(self, texts: Iterable[str]) -> Iterator[CompactAnalysis]:
+        """Analyze texts across the pool; results are yielded in input order."""
+        self.start()
+        if not self.uses_processes:
+            engine = get_engine()
+            for text in texts:
+                yield compact_analysis(engine, text, self.canonicalize)
+                self.texts_done += 1
+            return
+
+        source = iter(texts)
+        exhausted = False
+        max_in_flight = self.workers * 2
+        in_flight: Dict[Future, int] = {}
+        finished: Dict[int, List[CompactAnalysis]] = {}
+        next_submit = next_yield = 0
+        try:
+            while True:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    chunk = []
+                    for text in source:
+                        chunk.append(text)
+                        if len(chunk) >= self.next_chunk_size():
+                            break
+                    if not chunk:
+                        exhausted = True
+                        break
+                    in_flight[self._executor.submit(_analyze_chunk, chunk, self.canonicalize)] = next_submit
+                    next_submit += 1
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results, seconds = future.result()
+                    self._record_chunk(len(results), seconds)
+                    finished[in_flight.pop(future)] = results
+                while next_yield in finished:
+                    yield from finished.pop(next_yield)
+                    next_yield += 1
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def analyze_batch(self, texts: Iterable[str]) -> List[CompactAnalysis]:
+        return list(self.analyze_many(texts))
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "workers": self.workers,
+            "start_method": self.start_method,
+            "lexicon_version": self.lexicon_version,
+            "chunk_size": self.next_chunk_size(),
+            "ms_per_text": round(self._seconds_per_text * 1000, 3) if self._seconds_per_text else None,
+            "texts_done": self.texts_done,
+            "chunks_done": self.chunks_done,
+        }
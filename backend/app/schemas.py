@@ -1,6 +1,21 @@
+from typing import Any, Dict
+
 from pydantic import BaseModel, Field
 
 
 class ImageRequest(BaseModel):
     ocr_text: str
     selected_allergens: list[str] = Field(default_factory=list)
+    # /analyze-structured only: add a per-stage timing breakdown ("stages")
+    debug: bool = False
+
+
+class BatchAnalyzeRequest(BaseModel):
+    items: list[ImageRequest] = Field(default_factory=list)
+    structured: bool = False
+
+
+class LexiconDeltaRequest(BaseModel):
+    # Master CSV rows (id, name_tr, name_en, type, risk_level, description_tr, keywords, ...)
+    upserts: list[Dict[str, Any]] = Field(default_factory=list)
+    deletes: list[str] = Field(default_factory=list)
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
 import re
+import sys
+from functools import lru_cache
+
+# Alias/text pairs are compared token by token, so the same few strings are
+# normalized over and over; both helpers are pure and memoized.
+NORMALIZE_CACHE_SIZE = 16384
 
 _TRANSLATION_TABLE = str.maketrans({
     "ç": "c", "Ç": "c",
@@ -23,11 +29,16 @@ _SUFFIXES = sorted([
 ], key=len, reverse=True)
 
 
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_text(text: str) -> str:
     lowered = str(text or "").strip().lower().translate(_TRANSLATION_TABLE)
-    lowered = re.sub(r"[^a-z0-9\s]+", " ", lowered)
-    lowered = re.sub(r"\s+", " ", lowered).strip()
-    return lowered
+    lowered = _NON_ALNUM_RE.sub(" ", lowered)
+    lowered = _WHITESPACE_RE.sub(" ", lowered).strip()
+    return sys.intern(lowered)
 
 
 def tokenize(text: str) -> list[str]:
@@ -54,10 +65,11 @@ def _strip_suffixes(token: str) -> str:
     return current
 
 
-def token_variants(token: str) -> set[str]:
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def token_variants(token: str) -> frozenset[str]:
     base = normalize_text(token).replace(" ", "")
     if not base:
-        return set()
+        return frozenset()
 
     stripped = _strip_suffixes(base)
     variants = {base, stripped}
@@ -72,7 +84,7 @@ def token_variants(token: str) -> set[str]:
         if len(value) >= 4 and value.endswith("b"):
             expanded.add(value[:-1] + "p")
 
-    return {item for item in expanded if item}
+    return frozenset(item for item in expanded if item)
 
 
 def tokens_loose_equal(left: str, right: str) -> bool:
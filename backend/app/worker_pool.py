@@ -0,0 +1,288 @@
+"""
+Analysis Worker Pool — async analysis path with a bounded number of CPU workers.
+
+The sync /analyze handlers used to run on Starlette's threadpool: every
+concurrent request ran its regex / rapidfuzz work on a thread of the same
+process, all contending for one GIL, and nothing stopped a burst from
+queueing without bound. The async handlers in api.py submit the work here
+instead:
+  - FOODLENS_ANALYSIS_WORKERS > 0: a ProcessPoolExecutor of that many worker
+    processes. Workers are forked from the API process after its engine is
+    loaded, so they start with the serving lexicon (overlay included) in
+    copy-on-write pages. When the serving lexicon version changes (hot
+    reload, delta), LexiconManager calls recycle() from the thread that
+    changed it: a new pool is forked from the new engine and warmed up
+    there, then replaces the old one, which finishes its queued work and
+    exits. Requests never fork; until the new pool is ready they keep
+    going to the old one.
+  - 0 (default): the matcher runs on a thread pool in the API process, as
+    before, but behind the same limits.
+Forking threads: the first pool is forked in the lifespan hook, before the
+lexicon watcher starts. A recycle forks while other threads run (the event
+loop, the anyio threadpool, the lexicon threads). A child gets a copy of
+every lock in the state it had at fork time and only its own thread. The
+workers therefore touch only objects that are not locked at that point
+(the engine, already swapped in, and the matcher they create), plus the
+stage metrics, whose lock start_forwarding() replaces.
+Limits:
+  - at most FOODLENS_ANALYSIS_MAX_PENDING requests queued or running; past
+    that, submit() raises PoolSaturated and the API answers 503 with a
+    Retry-After header instead of letting latency grow
+  - a request waits at most FOODLENS_ANALYSIS_TIMEOUT_SECONDS (a batch
+    FOODLENS_ANALYSIS_BATCH_TIMEOUT_SECONDS), then gets a 504. Work a
+    worker has already started is not interrupted; it keeps its pending slot
+    until it finishes, so the limit reflects real load
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Dict, Optional
+
+from . import config as app_config
+from .analysis.stage_metrics import get_stage_metrics
+from .engine_registry import get_engine
+
+logger = logging.getLogger("FoodLens")
+
+_worker_matcher = None
+
+
+def _init_worker() -> None:
+    """Worker process setup: keep the inherited engine, leave shutdown signals to the API process."""
+    global _worker_matcher
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    get_stage_metrics().start_forwarding()
+    from .matcher_engine import FoodLensMatcher
+
+    _worker_matcher = FoodLensMatcher()
+
+
+def _run_in_worker(method: str, *args: Any):
+    """(result, stage metric observations made while producing it)."""
+    result = getattr(_worker_matcher, method)(*args)
+    return result, get_stage_metrics().drain()
+
+
+def _worker_ready() -> str:
+    return get_engine().lexicon.version
+
+
+class PoolSaturated(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Analysis queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class AnalysisWorkerPool:
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        timeout_seconds: float,
+        retry_after_seconds: int = 1,
+        start_method: str = "fork",
+    ):
+        self.workers = max(0, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.timeout_seconds = float(timeout_seconds)
+        self.retry_after_seconds = max(1, int(retry_after_seconds))
+        self.start_method = start_method
+        self._lock = threading.Lock()
+        # Serializes recycle(); never held by the request path
+        self._recycle_lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._version: Optional[str] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.recycles = 0
+        self.last_wait_ms: Optional[float] = None
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.workers > 0
+
+    def start(self) -> None:
+        """Fork the workers from the loaded engine and wait until each one answers."""
+        if not self.uses_processes:
+            return
+        get_engine()
+        if self.start_method == "fork" and hasattr(gc, "freeze"):
+            # Same as preload_engine(): the collector in the children never
+            # writes to (and un-shares) the pages holding the engine tables
+            gc.collect()
+            gc.freeze()
+        self.recycle()
+        logger.info("Analiz işçi havuzu hazır: %s süreç, sürüm %s", self.workers, self._version)
+
+    def _fork_executor(self) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+        )
+        # The first submits fork every worker, here rather than on a request
+        for future in [executor.submit(_worker_ready) for _ in range(self.workers)]:
+            future.result()
+        return executor
+
+    def recycle(self) -> None:
+        """
+        Replace the process pool with one forked from the current engine.
+
+        Registered as a LexiconManager version listener (api.py); runs on the
+        thread that changed the version, never on the event loop.
+        """
+        if not self.uses_processes:
+            return
+        with self._recycle_lock:
+            version = get_engine().lexicon.version
+            if self._executor is not None and version == self._version:
+                return
+            executor = self._fork_executor()
+            with self._lock:
+                old, self._executor, self._version = self._executor, executor, version
+                if old is not None:
+                    self.recycles += 1
+            if old is not None:
+                old.shutdown(wait=False)
+                logger.info("Lexicon sürümü değişti, işçi havuzu yenilendi: sürüm %s", version)
+
+    def _pool_broken(self, executor: Executor) -> None:
+        """A worker died (OOM kill, crash); fork a fresh pool off the request path."""
+        with self._lock:
+            self.failed += 1
+            broken = self._executor is executor
+            if broken:
+                self._executor = None
+        if broken:
+            logger.error("Analiz işçi süreci beklenmedik şekilde sonlandı, havuz yeniden başlatılıyor")
+            threading.Thread(target=self.recycle, name="analysis-pool-recycle", daemon=True).start()
+
+    def _executor_for_request(self) -> Executor:
+        with self._lock:
+            if self._executor is None and not self.uses_processes:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="analysis")
+            executor = self._executor
+        if executor is None:
+            # Process pool not started yet or being replaced after a crash
+            raise PoolSaturated(self.retry_after_seconds)
+        return executor
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled():
+                # Timed out before a worker picked it up
+                self.cancelled += 1
+            else:
+                self.completed += 1
+
+    async def submit(self, matcher, method: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run matcher.<method>(*args) on the pool; raises PoolSaturated / PoolTimeout."""
+        timeout = self.timeout_seconds if timeout is None else timeout
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated(self.retry_after_seconds)
+            self.pending += 1
+
+        t0 = time.perf_counter()
+        try:
+            for attempt in range(2):
+                executor = self._executor_for_request()
+                try:
+                    if self.uses_processes:
+                        future = executor.submit(_run_in_worker, method, *args)
+                    else:
+                        future = executor.submit(partial(getattr(matcher, method), *args))
+                    break
+                except BrokenProcessPool:
+                    self._pool_broken(executor)
+                    raise PoolSaturated(self.retry_after_seconds) from None
+                except RuntimeError:
+                    # Shut down by a recycle between fetching and submitting; take the new pool
+                    if attempt:
+                        raise
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeout(f"Analysis exceeded {timeout}s") from None
+        except BrokenProcessPool:
+            self._pool_broken(executor)
+            raise PoolSaturated(self.retry_after_seconds) from None
+        finally:
+            self.last_wait_ms = round((time.perf_counter() - t0) * 1000, 2)
+
+        if not self.uses_processes:
+            return result
+        result, observations = result
+        if observations:
+            get_stage_metrics().observe_many(observations)
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "process" if self.uses_processes else "thread",
+            "workers": self.workers,
+            "lexicon_version": self._version,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout_seconds,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "recycles": self.recycles,
+            "last_wait_ms": self.last_wait_ms,
+        }
+
+
+_pool: Optional[AnalysisWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> AnalysisWorkerPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AnalysisWorkerPool(
+                    app_config.ANALYSIS_WORKERS,
+                    app_config.ANALYSIS_MAX_PENDING,
+                    app_config.ANALYSIS_TIMEOUT_SECONDS,
+                    app_config.ANALYSIS_RETRY_AFTER_SECONDS,
+                    app_config.ANALYSIS_START_METHOD,
+                )
+    return _pool
@@ -0,0 +1,40 @@
+"""
+Gunicorn config for multi-worker deployments with a pre-fork shared lexicon.
+
+    gunicorn -c backend/gunicorn.conf.py backend.app.main:app
+
+The master process builds the analysis engine once (preload_engine) and
+freezes it with gc.freeze() before forking, so every worker shares the
+lexicon, alias_map and fuzzy buckets through copy-on-write pages instead of
+building a private copy on its first request. Each worker still runs the
+FastAPI startup hook, which only warms regex/fuzzy caches.
+
+Lexicon edits reach every worker through the delta journal
+(LEXICON_DELTA_JOURNAL_FILE), which each worker's watcher applies. Edits
+already in the journal are applied here once, and any compaction they
+start finishes, before the fork. A lexicon reload (CSV change or POST
+/admin/reload-lexicon) makes every worker build its own engine, which is
+no longer shared with the others: restart gunicorn (not HUP, which keeps
+the preloaded master) to share the new lexicon again.
+
+Single-process deployments (Cloud Run default CMD) keep using uvicorn directly.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("FOODLENS_WORKERS", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("FOODLENS_WORKER_TIMEOUT", "120"))
+
+
+def on_starting(server):
+    from backend.app.engine_registry import preload_engine
+    from backend.app.lexicon_manager import get_lexicon_manager
+
+    preload_engine(freeze=True)
+    manager = get_lexicon_manager()
+    manager.sync_journal()
+    # A compaction started by the sync holds the manager's locks; the
+    # workers must not fork while it runs
+    manager.wait()
@@ -0,0 +1,93 @@
+"""
+Benchmark the compiled anchor/cue matcher against per-list substring loops.
+
+Usage:
+    python backend/scripts/bench_cue_matcher.py [--labels PATH] [--repeat N]
+
+Lines come from --labels (one OCR label per line, or a JSON list of label
+strings) or, by default, from a small built-in set of label lines. For every
+line, the per-category counts of LINE_VOCABULARY must equal
+`sum(1 for p in patterns if p in lowered)` for each category list. Exits
+with status 1 on any mismatch.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.app.analysis.segmentation.section_classifier import LINE_VOCABULARY
+
+SAMPLE_LINES = [
+    "İçindekiler: Buğday unu, şeker, bitkisel yağ (palm), kakao (%4), tuz, emülgatör (soya lesitini).",
+    "Eser miktarda fındık, süt ve susam içerebilir.",
+    "Gluten içermez. Domuz kaynaklı hiçbir katkı içermez.",
+    "Besin Değerleri (100 g): Enerji 450 kcal / 1880 kJ, Yağ / Fat 20 g, Protein 6 g",
+    "Serin ve kuru yerde muhafaza ediniz. Son tüketim tarihi ve parti no ambalaj üzerindedir.",
+    "Üretici: Örnek Gıda Sanayi ve Ticaret A.Ş. Adres: İstanbul Tel: 0212 000 00 00 www.ornek.com",
+    "Ingredients: sugar, wheat flour, cocoa butter, whole milk powder, emulsifier (soy lecithin), flavouring.",
+    "May contain traces of peanuts, hazelnuts and sesame. Allergen warning: contains milk.",
+    "mısır şurubu, su, asitlik düzenleyici (sitrik asit), koruyucu (potasyum sorbat), renklendirici E150d",
+    "Günlük referans alım değerlerinin %8'i. Porsiyon: 30 g",
+]
+
+
+def load_lines(path: Path):
+    text = path.read_text(encoding="utf-8")
+    labels = json.loads(text) if path.suffix == ".json" else text.splitlines()
+    return [line for label in labels for line in str(label).splitlines() if line.strip()]
+
+
+def loop_counts(lowered: str):
+    counts = {}
+    for name, patterns in LINE_VOCABULARY.categories.items():
+        hits = sum(1 for pattern in patterns if pattern in lowered)
+        if hits:
+            counts[name] = hits
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens anchor/cue matcher benchmark")
+    parser.add_argument("--labels", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    lines = [line.lower() for line in (load_lines(args.labels) if args.labels else SAMPLE_LINES)]
+    mismatches = [line for line in lines if LINE_VOCABULARY.counts(line) != loop_counts(line)]
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for line in lines:
+            loop_counts(line)
+    loop_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for line in lines:
+            LINE_VOCABULARY.counts(line)
+    matcher_s = time.perf_counter() - t0
+
+    calls = max(len(lines) * args.repeat, 1)
+    report = {
+        "lines": len(lines),
+        "patterns": sum(len(p) for p in LINE_VOCABULARY.categories.values()),
+        "categories": len(LINE_VOCABULARY.categories),
+        "loop_us_per_line": round(loop_s * 1e6 / calls, 2),
+        "matcher_us_per_line": round(matcher_s * 1e6 / calls, 2),
+        "speedup": round(loop_s / matcher_s, 2) if matcher_s else None,
+        "mismatches": len(mismatches),
+        "first_mismatches": mismatches[:5],
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = not mismatches
+    print("✅ Derlenmiş eşleştirici döngülerle aynı sayımları veriyor" if ok else "❌ Sayım uyuşmazlığı var")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
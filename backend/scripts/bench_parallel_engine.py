@@ -0,0 +1,125 @@
+"""
+Scaling benchmark for ParallelAnalysisEngine.
+
+Usage:
+    python backend/scripts/bench_parallel_engine.py [--corpus PATH | --count N --seed S]
+        [--workers 1,2,4] [--start-method fork|spawn|forkserver]
+        [--target-chunk-seconds F] [--min-efficiency F]
+
+Labels come from --corpus (a label_corpus.py file, a JSON list of label
+strings or one label per line), or are generated from the master lexicon
+with label_corpus.generate_corpus(--count, --seed). They are analyzed once
+serially (compact_analysis on the registry engine) and then with a
+ParallelAnalysisEngine for every worker count in --workers (default: 1, 2,
+4 ... up to the core count). Reported per worker count: pool start time,
+labels per second, speedup over the serial run, parallel efficiency
+(speedup / workers) and the chunk size the engine settled on.
+Exits with status 1 if any parallel result differs from the serial one, or
+if the efficiency at the largest worker count is below --min-efficiency
+(default 0: report only; efficiency needs as many free cores as workers).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.app import config as app_config
+
+
+def default_worker_counts():
+    cores = os.cpu_count() or 1
+    counts, n = [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens parallel engine benchmark")
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=25)
+    parser.add_argument("--workers", default=None, help="comma separated worker counts")
+    parser.add_argument("--start-method", default="fork", choices=["fork", "spawn", "forkserver"])
+    parser.add_argument("--target-chunk-seconds", type=float, default=0.1)
+    parser.add_argument("--min-efficiency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # Every run does the same matching work
+    app_config.FUZZY_MEMO_MAX_ENTRIES = 0
+    os.environ["FOODLENS_FUZZY_MEMO_MAX_ENTRIES"] = "0"
+
+    from label_corpus import generate_corpus, load_corpus
+    from backend.app.engine_registry import get_engine
+    from backend.app.parallel_engine import ParallelAnalysisEngine, compact_analysis
+
+    engine = get_engine()
+    labels = load_corpus(args.corpus) if args.corpus else generate_corpus(engine.lexicon, args.count, args.seed)
+    texts = [label["text"] for label in labels]
+    worker_counts = [int(n) for n in args.workers.split(",")] if args.workers else default_worker_counts()
+
+    for text in texts[:20]:
+        compact_analysis(engine, text)  # regex compile, lazy indexes
+    t0 = time.perf_counter()
+    expected = [compact_analysis(engine, text) for text in texts]
+    serial_s = time.perf_counter() - t0
+
+    runs = []
+    differing = 0
+    for workers in worker_counts:
+        parallel = ParallelAnalysisEngine(
+            workers=workers, start_method=args.start_method, target_chunk_seconds=args.target_chunk_seconds,
+        )
+        t0 = time.perf_counter()
+        parallel.start()
+        start_s = time.perf_counter() - t0
+        try:
+            t0 = time.perf_counter()
+            results = parallel.analyze_batch(texts)
+            wall = time.perf_counter() - t0
+            stats = parallel.stats()
+        finally:
+            parallel.close()
+        mismatches = sum(1 for got, want in zip(results, expected) if got != want) + abs(len(results) - len(expected))
+        differing += mismatches
+        speedup = serial_s / wall if wall else None
+        runs.append({
+            "workers": workers,
+            "start_s": round(start_s, 3),
+            "wall_s": round(wall, 3),
+            "labels_per_s": round(len(texts) / wall, 1) if wall else None,
+            "speedup": round(speedup, 2) if speedup else None,
+            "efficiency": round(speedup / workers, 3) if speedup else None,
+            "chunk_size": stats["chunk_size"],
+            "chunks": stats["chunks_done"],
+            "differing_labels": mismatches,
+        })
+
+    report = {
+        "labels": len(texts),
+        "cpu_count": os.cpu_count(),
+        "start_method": args.start_method,
+        "lexicon_version": engine.lexicon.version,
+        "serial": {"wall_s": round(serial_s, 3), "labels_per_s": round(len(texts) / serial_s, 1) if serial_s else None},
+        "runs": runs,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    efficiency = runs[-1]["efficiency"] or 0.0
+    ok = not differing and efficiency >= args.min_efficiency
+    if ok:
+        print(f"✅ Paralel sonuçlar seri sonuçlarla aynı ({runs[-1]['workers']} süreçte verim {efficiency})")
+    else:
+        print(f"❌ Paralel motor başarısız: {differing} farklı sonuç, verim {efficiency}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
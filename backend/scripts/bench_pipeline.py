@@ -0,0 +1,222 @@
+"""
+Offline benchmark of the full analysis pipeline on a synthetic label corpus.
+
+Usage:
+    python backend/scripts/bench_pipeline.py [--corpus PATH | --count N --seed S]
+        [--repeat N] [--startup-runs N] [--memo] [--out PATH]
+        [--baseline PATH] [--max-regression F]
+
+Labels come from --corpus (a label_corpus.py file, a JSON list of label
+strings or one label per line), or are generated from the master lexicon
+with label_corpus.generate_corpus(--count, --seed). Measured:
+  - startup: FoodLensAnalysisEngine build and first label in fresh
+    interpreters (median of --startup-runs), with the process's peak RSS
+  - throughput: labels per second over --repeat passes of the corpus
+  - per stage (stage_metrics.py): p50 / p95 / p99 / mean milliseconds for
+    cleanup, segmentation, extraction, exact, fuzzy and total, plus mean
+    event counts per label
+  - memory: peak RSS of the benchmark process and its growth during the run
+The fuzzy span memo is off unless --memo is given, so every pass does the
+same matching work.
+
+The JSON report (--out, else stdout only) records the git commit, Python
+version and lexicon version. With --baseline (an earlier report), the
+throughput, total p95 and startup deltas are added, and the run fails when
+any of them is worse by more than --max-regression (default 0.10).
+Exits with status 1 on a regression or if a label raises.
+"""
+import argparse
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from script_common import percentile
+
+from backend.app import config as app_config
+
+STARTUP_PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {base_dir!r})
+from backend.app.analysis.engine import FoodLensAnalysisEngine
+t1 = time.perf_counter()
+engine = FoodLensAnalysisEngine()
+t2 = time.perf_counter()
+engine.analyze_structured({warmup!r})
+t3 = time.perf_counter()
+print(json.dumps({{
+    "import_s": t1 - t0, "build_s": t2 - t1, "first_label_s": t3 - t2,
+    "lexicon_source": engine.lexicon.source,
+    "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+"""
+
+
+def peak_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure_startup(runs: int):
+    from backend.app.lexicon_manager import WARMUP_TEXT
+
+    probe = STARTUP_PROBE.format(base_dir=str(BASE_DIR), warmup=WARMUP_TEXT)
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    if not samples:
+        return None
+    report = {
+        key: round(statistics.median(sample[key] for sample in samples), 4)
+        for key in ("import_s", "build_s", "first_label_s")
+    }
+    report["total_s"] = round(report["import_s"] + report["build_s"] + report["first_label_s"], 4)
+    report["lexicon_source"] = samples[0]["lexicon_source"]
+    report["peak_rss_mb"] = round(max(sample["peak_rss_kb"] for sample in samples) / 1024, 1)
+    report["runs"] = len(samples)
+    return report
+
+
+def compare(report, baseline, max_regression: float):
+    """Relative changes against an earlier report; positive means worse."""
+    changes = {}
+    old_tput = baseline.get("throughput", {}).get("labels_per_s")
+    new_tput = report["throughput"]["labels_per_s"]
+    if old_tput:
+        changes["throughput"] = round(1 - new_tput / old_tput, 4)
+    old_p95 = baseline.get("stages_ms", {}).get("total", {}).get("p95")
+    if old_p95:
+        changes["total_p95"] = round(report["stages_ms"]["total"]["p95"] / old_p95 - 1, 4)
+    old_startup = (baseline.get("startup") or {}).get("total_s")
+    if old_startup and report.get("startup"):
+        changes["startup"] = round(report["startup"]["total_s"] / old_startup - 1, 4)
+    regressions = sorted(name for name, change in changes.items() if change > max_regression)
+    return {
+        "baseline_commit": baseline.get("meta", {}).get("git_commit"),
+        "changes": changes,
+        "max_regression": max_regression,
+        "regressions": regressions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens pipeline benchmark")
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=22)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--startup-runs", type=int, default=3)
+    parser.add_argument("--memo", action="store_true")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if not args.memo:
+        app_config.FUZZY_MEMO_MAX_ENTRIES = 0
+    app_config.STAGE_METRICS = False
+
+    from label_corpus import generate_corpus, load_corpus
+
+    startup = measure_startup(args.startup_runs)
+
+    from backend.app.analysis.engine import FoodLensAnalysisEngine
+    from backend.app.analysis.stage_metrics import COUNTS, STAGES, RequestTrace
+    from backend.app.input_normalization import canonicalize_analysis_text
+
+    t0 = time.perf_counter()
+    engine = FoodLensAnalysisEngine()
+    build_s = time.perf_counter() - t0
+    labels = load_corpus(args.corpus) if args.corpus else generate_corpus(engine.lexicon, args.count, args.seed)
+    texts = [canonicalize_analysis_text(label["text"]) for label in labels]
+    rss_before = peak_rss_kb()
+
+    for text in texts[:20]:
+        engine.analyze_structured(text)  # regex compile, lazy indexes
+
+    traces = []
+    errors = []
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for label, text in zip(labels, texts):
+            trace = RequestTrace()
+            try:
+                engine.analyze_structured(text, trace=trace)
+            except Exception as exc:
+                errors.append(f"{label['id']}: {type(exc).__name__}: {exc}")
+                continue
+            traces.append(trace)
+    wall = time.perf_counter() - t0
+    runs = len(labels) * args.repeat
+
+    report = {
+        "meta": {
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "lexicon_version": engine.lexicon.version,
+            "lexicon_source": engine.lexicon.source,
+            "corpus": str(args.corpus) if args.corpus else {"count": args.count, "seed": args.seed},
+            "labels": len(labels),
+            "repeat": args.repeat,
+            "fuzzy_memo": args.memo,
+        },
+        "startup": startup,
+        "in_process_build_s": round(build_s, 4),
+        "throughput": {
+            "wall_s": round(wall, 3),
+            "labels_per_s": round(runs / wall, 1) if wall else None,
+        },
+        "stages_ms": {
+            stage: {
+                "p50": round(percentile([t.timings[stage] for t in traces], 0.50) * 1000, 3),
+                "p95": round(percentile([t.timings[stage] for t in traces], 0.95) * 1000, 3),
+                "p99": round(percentile([t.timings[stage] for t in traces], 0.99) * 1000, 3),
+                "mean": round(statistics.fmean([t.timings[stage] for t in traces]) * 1000, 3) if traces else 0.0,
+            }
+            for stage in STAGES
+        },
+        "counts_per_label": {
+            name: round(sum(t.counts[name] for t in traces) / max(len(traces), 1), 2) for name in COUNTS
+        },
+        "memory": {
+            "peak_rss_mb": round(peak_rss_kb() / 1024, 1),
+            "rss_growth_during_run_mb": round((peak_rss_kb() - rss_before) / 1024, 1),
+        },
+        "errors": len(errors),
+        "first_errors": errors[:5],
+    }
+    if args.baseline:
+        report["comparison"] = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.max_regression)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.out:
+        args.out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    regressions = report.get("comparison", {}).get("regressions", [])
+    ok = not errors and not regressions
+    if ok:
+        print(f"✅ {runs} etiket analiz edildi ({report['throughput']['labels_per_s']} etiket/sn)")
+    else:
+        print(f"❌ Benchmark başarısız: {len(errors)} hata, gerileme: {', '.join(regressions) or '-'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
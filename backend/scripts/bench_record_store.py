@@ -0,0 +1,190 @@
+"""
+Measure the columnar record store and slotted value types with tracemalloc.
+
+Usage:
+    python backend/scripts/bench_record_store.py [--labels PATH] [--repeat N]
+
+Two measurements on the current master lexicon:
+  - lexicon: memory retained by the record layer (records, alias_map values
+    and best-record tables) in the old layout (one dict per record, alias
+    lists of dicts) and in the RecordStore layout (columns plus int ids).
+    Both are rebuilt from the same field tuples and alias strings, so shared
+    string objects are counted in neither.
+  - per request: net bytes and peak traced memory per analyze_structured
+    call over the labels
+    (--labels: one OCR label per line, or a JSON list of label strings),
+    plus the instance size of dataclass vs slotted CandidateSpan /
+    MatchedEntity.
+Exits with status 1 if the store layout is not smaller than the dict layout
+or a record read back from the store differs from its dict form.
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from script_common import SAMPLE_LABELS, load_labels
+
+from backend.app.analysis.engine import FoodLensAnalysisEngine
+from backend.app.analysis.matching.lexicon import (
+    TYPE_PRIORITY_BY_SECTION,
+    TYPE_PRIORITY_DEFAULT,
+    build_best_records,
+)
+from backend.app.analysis.matching.record_store import RecordStore
+from backend.app.analysis.schemas import CandidateSpan, MatchedEntity
+
+
+@dataclass
+class DataclassSpan:
+    raw_text: str
+    normalized_text: str
+    section_type: str
+    polarity: str
+    category_hint: str
+    evidence: str = ""
+    folded_text: str = ""
+    tokens: tuple = ()
+
+
+@dataclass
+class DataclassEntity:
+    item_id: str
+    name: str
+    item_type: str
+    risk_level: str
+    description: str
+    matched_key: str
+    raw_query: str
+    match_type: str = "exact"
+    match_score: int = 100
+    polarity: str = "present"
+    source_section: str = "ingredient_section"
+    source_text: str = ""
+
+
+def retained(build):
+    """(object, bytes still allocated after build() returns)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def dict_layout(rows, alias_ids):
+    records = [
+        {"id": i, "name": n, "item_type": t, "risk_level": r, "description": d}
+        for i, n, t, r, d in rows
+    ]
+    alias_map = {alias: [records[rid] for rid in ids] for alias, ids in alias_ids.items()}
+
+    def rank(priority):
+        return lambda rec: (priority.get(rec["item_type"], 0), TYPE_PRIORITY_DEFAULT.get(rec["item_type"], 0), len(rec["name"]))
+
+    default_best = {alias: max(matches, key=rank(TYPE_PRIORITY_DEFAULT)) for alias, matches in alias_map.items()}
+    section_best = {}
+    for section, priority in TYPE_PRIORITY_BY_SECTION.items():
+        overrides = {}
+        for alias, matches in alias_map.items():
+            best = max(matches, key=rank(priority))
+            if best is not default_best[alias]:
+                overrides[alias] = best
+        if overrides:
+            section_best[section] = overrides
+    return records, alias_map, default_best, section_best
+
+
+def store_layout(rows, alias_ids):
+    store = RecordStore()
+    for fields in rows:
+        store.add(*fields)
+    alias_map = {alias: tuple(ids) for alias, ids in alias_ids.items()}
+    return store, alias_map, build_best_records(store, alias_map)
+
+
+def instance_bytes(factory, count=2000):
+    retained(lambda: [factory(i) for i in range(count)])
+    _, size = retained(lambda: [factory(i) for i in range(count)])
+    return round(size / count, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens record store memory benchmark")
+    parser.add_argument("--labels", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = FoodLensAnalysisEngine()
+    lexicon = engine.lexicon
+    store = lexicon.store
+    rows = [store.fields(rid) for rid in range(len(store))]
+    alias_ids = {alias: list(ids) for alias, ids in lexicon.alias_map.items()}
+
+    # Warm-up pass: one-time interpreter allocations (string interning table,
+    # tracemalloc's own structures) would otherwise land on the first layout
+    retained(lambda: (dict_layout(rows, alias_ids), store_layout(rows, alias_ids)))
+    _, dict_bytes = retained(lambda: dict_layout(rows, alias_ids))
+    _, store_bytes = retained(lambda: store_layout(rows, alias_ids))
+    mismatched = [rid for rid, (i, n, t, r, d) in enumerate(rows) if store.record(rid) != {
+        "id": i, "name": n, "item_type": t, "risk_level": r, "description": d,
+    }]
+
+    labels = load_labels(args.labels) if args.labels else list(SAMPLE_LABELS)
+    labels = [label for label in labels if label.strip()]
+    for label in labels:
+        engine.analyze_structured(label)  # warm caches so only per-request allocation is traced
+
+    tracemalloc.start()
+    allocated = 0
+    peak = 0
+    for _ in range(args.repeat):
+        for label in labels:
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            result = engine.analyze_structured(label)
+            current, label_peak = tracemalloc.get_traced_memory()
+            allocated += current - start
+            peak = max(peak, label_peak - start)
+            del result
+    tracemalloc.stop()
+    calls = max(len(labels) * args.repeat, 1)
+
+    span_args = ("Şeker Tozu", "şeker tozu", "ingredient_section", "present", "ingredient")
+    entity_args = ("A1", "Şeker", "ingredient", "Low", "", "seker", "şeker")
+    report = {
+        "records": len(store),
+        "aliases": len(alias_ids),
+        "lexicon": {
+            "dict_layout_kb": round(dict_bytes / 1024, 1),
+            "store_layout_kb": round(store_bytes / 1024, 1),
+            "saving": round(1 - store_bytes / dict_bytes, 3) if dict_bytes else None,
+        },
+        "per_request": {
+            "labels": len(labels),
+            "net_bytes_per_request": round(allocated / calls, 1),
+            "peak_bytes": peak,
+        },
+        "instance_bytes": {
+            "candidate_span_dataclass": instance_bytes(lambda i: DataclassSpan(*span_args, folded_text="seker tozu", tokens=("seker", "tozu"))),
+            "candidate_span_slots": instance_bytes(lambda i: CandidateSpan(*span_args, folded_text="seker tozu", tokens=("seker", "tozu"))),
+            "matched_entity_dataclass": instance_bytes(lambda i: DataclassEntity(*entity_args)),
+            "matched_entity_slots": instance_bytes(lambda i: MatchedEntity(*entity_args)),
+        },
+        "record_mismatches": len(mismatched),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = not mismatched and store_bytes < dict_bytes
+    print("✅ Kayıt deposu sözlük düzeninden küçük ve aynı kayıtları veriyor" if ok else "❌ Kayıt deposu beklenen sonucu vermiyor")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark single-token fuzzy recovery: full WRatio scan vs deletion index.
+
+Usage:
+    python backend/scripts/bench_single_token_index.py [--queries N] [--max-deletes K] [--seed S]
+
+Queries are perturbed single-token aliases from the current master lexicon
+(typos, dropped / doubled letters) plus random letter strings that should
+be rejected. Every query runs through FuzzyRecoveryMatcher._match_single_token
+with both engines; the accept/reject decisions (and matched item) must be
+identical. Exits with status 1 on any difference.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.app import config as app_config
+from backend.app.analysis.engine import FoodLensAnalysisEngine
+from backend.app.analysis.matching.span_memo import FuzzySpanMemo
+from backend.app.analysis.schemas import CandidateSpan
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from check_fuzzy_prefilter import perturb
+
+RANDOM_CHARS = "abcdeghiklmnoprstuyz"
+
+
+def build_queries(aliases, count: int, seed: int):
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        if i % 4 == 3 or not aliases:
+            queries.append("".join(rng.choice(RANDOM_CHARS) for _ in range(rng.randint(3, 14))))
+        else:
+            queries.append(perturb(rng.choice(aliases), rng))
+    return [q for q in queries if len(q) >= 3]
+
+
+def decision(entity):
+    if entity is None:
+        return None
+    return entity.item_id, entity.matched_key, entity.match_score
+
+
+def run(fuzzy, queries):
+    decisions = []
+    t0 = time.perf_counter()
+    for query in queries:
+        span = CandidateSpan(
+            raw_text=query, normalized_text=query, section_type="ingredient_section",
+            polarity="present", category_hint="ingredient",
+        )
+        decisions.append(decision(fuzzy._match_single_token(span, query)))
+    return decisions, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens single-token index benchmark")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--max-deletes", type=int, default=app_config.FUZZY_DELETION_MAX_DELETES)
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    engine = FoodLensAnalysisEngine()
+    fuzzy = engine.fuzzy_matcher
+    fuzzy.memo = FuzzySpanMemo(0)
+    fuzzy._single_index = fuzzy._single_deletion_index = None
+    queries = build_queries(fuzzy._single_folded, args.queries, args.seed)
+
+    scan_decisions, scan_s = run(fuzzy, queries)
+
+    t0 = time.perf_counter()
+    fuzzy.enable_deletion_index(args.max_deletes)
+    build_s = time.perf_counter() - t0
+    index_decisions, index_s = run(fuzzy, queries)
+
+    differing = [q for q, a, b in zip(queries, scan_decisions, index_decisions) if a != b]
+    report = {
+        "single_alias_count": len(fuzzy._single_folded),
+        "queries": len(queries),
+        "accepted": sum(1 for d in scan_decisions if d is not None),
+        "max_deletes": args.max_deletes,
+        "deletion_keys": len(fuzzy._single_deletion_index.deletes),
+        "index_build_ms": round(build_s * 1000, 1),
+        "scan_ms_per_query": round(scan_s * 1000 / max(len(queries), 1), 3),
+        "deletion_ms_per_query": round(index_s * 1000 / max(len(queries), 1), 3),
+        "speedup": round(scan_s / index_s, 2) if index_s else None,
+        "differing": len(differing),
+        "first_differing": differing[:10],
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = not differing
+    print("✅ Deletion index kararları tarama ile aynı" if ok else "❌ Deletion index kararları farklı")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
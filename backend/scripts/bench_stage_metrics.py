@@ -0,0 +1,122 @@
+"""
+Measure the per-stage analysis breakdown and the cost of collecting it.
+
+Usage:
+    python backend/scripts/bench_stage_metrics.py [--labels PATH] [--repeat N]
+
+Runs the labels (--labels: one OCR label per line, or a JSON list of label
+strings) through FoodLensAnalysisEngine.analyze_structured three ways,
+alternating per round so drift hits all of them alike:
+  - metrics off, no trace (the default request path)
+  - FOODLENS_STAGE_METRICS on (trace plus process-wide histograms)
+  - an explicit per-request trace (the /analyze-structured debug path)
+and reports the run time of each, p50 / p95 / p99 per stage and the
+per-request event counts. The fuzzy span memo is disabled so every round
+does the same matching work.
+Exits with status 1 if traced and untraced results differ, the counters
+are inconsistent (more hits than attempts, stage times above the total)
+or the Prometheus output does not account for every traced run.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from script_common import SAMPLE_LABELS, load_labels, percentile
+
+from backend.app import config as app_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens stage metrics benchmark")
+    parser.add_argument("--labels", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app_config.FUZZY_MEMO_MAX_ENTRIES = 0
+    app_config.STAGE_METRICS = False
+
+    from backend.app.analysis.engine import FoodLensAnalysisEngine
+    from backend.app.analysis.stage_metrics import COUNTS, STAGES, RequestTrace, get_stage_metrics
+
+    engine = FoodLensAnalysisEngine()
+    labels = load_labels(args.labels) if args.labels else list(SAMPLE_LABELS)
+    labels = [label for label in labels if label.strip()]
+    expected = [engine.analyze_structured(label).to_debug_dict() for label in labels]
+
+    elapsed = {"off": 0.0, "metrics": 0.0, "trace": 0.0}
+    traces = []
+    differing = set()
+    for _ in range(args.repeat):
+        app_config.STAGE_METRICS = False
+        t0 = time.perf_counter()
+        for i, label in enumerate(labels):
+            if engine.analyze_structured(label).to_debug_dict() != expected[i]:
+                differing.add(i)
+        elapsed["off"] += time.perf_counter() - t0
+
+        app_config.STAGE_METRICS = True
+        t0 = time.perf_counter()
+        for i, label in enumerate(labels):
+            if engine.analyze_structured(label).to_debug_dict() != expected[i]:
+                differing.add(i)
+        elapsed["metrics"] += time.perf_counter() - t0
+
+        app_config.STAGE_METRICS = False
+        t0 = time.perf_counter()
+        for i, label in enumerate(labels):
+            trace = RequestTrace()
+            if engine.analyze_structured(label, trace=trace).to_debug_dict() != expected[i]:
+                differing.add(i)
+            traces.append(trace)
+        elapsed["trace"] += time.perf_counter() - t0
+
+    inconsistent = 0
+    for trace in traces:
+        counts, timings = trace.counts, trace.timings
+        staged = sum(seconds for stage, seconds in timings.items() if stage != "total")
+        if (
+            counts["exact_hits"] + counts["fuzzy_attempts"] > counts["spans"]
+            or counts["fuzzy_hits"] > counts["fuzzy_attempts"]
+            or staged > timings["total"] * 1.001 + 1e-6
+        ):
+            inconsistent += 1
+
+    runs = len(labels) * args.repeat
+    prometheus = get_stage_metrics().render_prometheus()
+    prometheus_ok = f"foodlens_analysis_requests_total {runs}" in prometheus and (
+        f'foodlens_stage_duration_seconds_count{{stage="total"}} {runs}' in prometheus
+    )
+
+    calls = max(runs, 1)
+    report = {
+        "labels": len(labels),
+        "runs_per_mode": runs,
+        "us_per_request": {mode: round(seconds * 1e6 / calls, 1) for mode, seconds in elapsed.items()},
+        "metrics_overhead": round(elapsed["metrics"] / elapsed["off"] - 1, 4) if elapsed["off"] else None,
+        "stages_ms": {
+            stage: {
+                "p50": round(percentile([t.timings[stage] for t in traces], 0.50) * 1000, 3),
+                "p95": round(percentile([t.timings[stage] for t in traces], 0.95) * 1000, 3),
+                "p99": round(percentile([t.timings[stage] for t in traces], 0.99) * 1000, 3),
+            }
+            for stage in STAGES
+        },
+        "counts_per_request": {name: round(sum(t.counts[name] for t in traces) / calls, 2) for name in COUNTS},
+        "differing_labels": len(differing),
+        "inconsistent_traces": inconsistent,
+        "prometheus_ok": prometheus_ok,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = not differing and not inconsistent and prometheus_ok
+    print("✅ Aşama ölçümleri sonuçları değiştirmiyor ve tutarlı" if ok else "❌ Aşama ölçümleri beklenen sonucu vermiyor")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
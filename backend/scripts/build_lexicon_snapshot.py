@@ -0,0 +1,50 @@
+"""
+Build the precompiled lexicon snapshot used by the analysis engine at startup.
+
+Usage:
+    python backend/scripts/build_lexicon_snapshot.py [--csv PATH] [--out PATH]
+
+Defaults come from backend.app.config (MASTER_CSV_FILE / LEXICON_SNAPSHOT_FILE).
+Re-run whenever foodlens_master_final.csv changes; a stale snapshot is ignored
+by the engine, which then falls back to parsing the CSV.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.app import config as app_config
+from backend.app.analysis.matching.snapshot import build_snapshot, load_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens lexicon snapshot builder")
+    parser.add_argument("--csv", default=str(app_config.MASTER_CSV_FILE))
+    parser.add_argument("--out", default=str(app_config.LEXICON_SNAPSHOT_FILE))
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv)
+    out_path = Path(args.out)
+
+    t0 = time.perf_counter()
+    payload = build_snapshot(csv_path, out_path)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    loaded = load_snapshot(out_path, csv_path)
+    load_ms = (time.perf_counter() - t0) * 1000
+    if loaded is None:
+        print(f"❌ Snapshot yazıldı ama doğrulanamadı: {out_path}")
+        sys.exit(1)
+
+    print(f"✅ Snapshot: {out_path}")
+    print(f"   CSV: {csv_path} (sha256={payload['csv_sha256'][:12]})")
+    print(f"   Kayıt: {len(payload['record_store'])} | Alias: {len(payload['alias_map'])}")
+    print(f"   Build: {build_ms:.1f} ms | Load: {load_ms:.1f} ms | Boyut: {out_path.stat().st_size / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
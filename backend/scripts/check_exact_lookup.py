@@ -0,0 +1,102 @@
+"""
+Check MasterLexicon.exact_lookup_id against the full variant expansion.
+
+Usage:
+    python backend/scripts/check_exact_lookup.py [--labels PATH] [--queries N] [--seed S]
+
+exact_lookup_id answers most queries with one normalized-form probe or one
+canonical-key miss, and only expands _alias_variants on canonical hits.
+Two checks run on the current master lexicon:
+  - invariant: every _alias_variants entry of a query has the query's
+    canonical_key (otherwise a canonical miss could hide a real match)
+  - agreement: for every query and section, exact_lookup_id (canonical keys
+    plus precomputed best-record tables) returns the same record id as probing
+    the ordered variants one by one and ranking with _pick_best
+
+Queries are the lexicon aliases themselves, copula / consonant / case
+perturbations of them, random letter strings and, with --labels (one OCR
+label per line, or a JSON list of label strings), comma-separated label
+fragments. Exits with status 1 on any violation or difference.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from script_common import RANDOM_CHARS, perturb
+
+from backend.app.analysis.engine import FoodLensAnalysisEngine
+from backend.app.analysis.matching.lexicon import TYPE_PRIORITY_BY_SECTION, _alias_variants, canonical_key
+
+SECTIONS = list(TYPE_PRIORITY_BY_SECTION) + ["other_section"]
+
+
+def reference_lookup(lexicon, alias: str, section_type: str):
+    for variant in _alias_variants(alias):
+        if variant in lexicon.alias_map:
+            return lexicon._pick_best(lexicon.alias_map[variant], section_type)
+    return None
+
+
+def load_fragments(path: Path):
+    text = path.read_text(encoding="utf-8")
+    labels = json.loads(text) if path.suffix == ".json" else text.splitlines()
+    return [part.strip() for label in labels for part in str(label).replace("\n", ",").split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens exact lookup check")
+    parser.add_argument("--labels", type=Path, default=None)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=15)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lexicon = FoodLensAnalysisEngine().lexicon
+    aliases = list(lexicon.alias_map)
+    queries = rng.sample(aliases, min(args.queries, len(aliases)))
+    queries += [perturb(rng.choice(aliases), rng) for _ in range(args.queries)]
+    queries += ["".join(rng.choice(RANDOM_CHARS) for _ in range(rng.randint(2, 12))) for _ in range(args.queries // 4)]
+    if args.labels:
+        queries += load_fragments(args.labels)
+
+    violations = [q for q in queries if any(canonical_key(v) != canonical_key(q) for v in _alias_variants(q))]
+
+    t0 = time.perf_counter()
+    reference = [[reference_lookup(lexicon, q, section) for section in SECTIONS] for q in queries]
+    reference_s = time.perf_counter() - t0
+
+    canonical_key.cache_clear()
+    t0 = time.perf_counter()
+    indexed = [[lexicon.exact_lookup_id(q, section) for section in SECTIONS] for q in queries]
+    indexed_s = time.perf_counter() - t0
+
+    differing = [q for q, a, b in zip(queries, reference, indexed) if a != b]
+    calls = max(len(queries) * len(SECTIONS), 1)
+    report = {
+        "alias_count": len(aliases),
+        "canonical_key_count": len(lexicon.canonical_keys),
+        "queries": len(queries),
+        "matched": sum(1 for row in reference if row[0] is not None),
+        "reference_us_per_lookup": round(reference_s * 1e6 / calls, 2),
+        "indexed_us_per_lookup": round(indexed_s * 1e6 / calls, 2),
+        "speedup": round(reference_s / indexed_s, 2) if indexed_s else None,
+        "invariant_violations": len(violations),
+        "first_violations": violations[:5],
+        "differing": len(differing),
+        "first_differing": differing[:5],
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = not violations and not differing
+    print("✅ Kanonik anahtar araması varyant taramasıyla aynı" if ok else "❌ Kanonik anahtar araması farklı sonuç veriyor")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Check the fuzzy trigram prefilter against brute-force WRatio.
+
+Usage:
+    python backend/scripts/check_fuzzy_prefilter.py [--labels PATH] [--synthetic N]
+                                                    [--max-candidates N] [--min-recall R]
+
+Two checks run on the current master lexicon:
+  - candidate recall: perturbed aliases (seeded typos, dropped / doubled
+    letters) are searched with and without the prefilter; every brute-force
+    hit must also be returned by the shortlist search. When more aliases
+    tie at the last returned score than the result limit holds, which of
+    them are returned is arbitrary, so those boundary ties are reported
+    separately and not counted against recall
+  - label agreement: with --labels (one OCR label per line, or a JSON list of
+    strings) every label is analyzed with and without the prefilter and the
+    structured outputs must be identical
+
+Exits with status 1 when recall drops below --min-recall or any label differs.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from script_common import load_labels
+
+from backend.app import config as app_config
+from backend.app.analysis.engine import FoodLensAnalysisEngine
+from backend.app.analysis.matching.fuzzy_recovery import MULTI_TOKEN_MIN_FUZZY_SCORE
+from backend.app.analysis.matching.span_memo import FuzzySpanMemo
+
+TYPO_CHARS = "abcdefghijklmnoprstuvyz"
+
+
+def perturb(text: str, rng: random.Random) -> str:
+    chars = list(text)
+    for _ in range(rng.choice([1, 1, 2])):
+        if len(chars) < 3:
+            break
+        pos = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.4:
+            chars[pos] = rng.choice(TYPO_CHARS)
+        elif op < 0.7:
+            del chars[pos]
+        else:
+            chars.insert(pos, chars[pos])
+    return "".join(chars)
+
+
+def set_prefilter(fuzzy, indexes):
+    fuzzy._single_index, fuzzy._all_index = indexes
+
+
+def check_candidates(fuzzy, indexes, count: int, seed: int):
+    rng = random.Random(seed)
+    single_min = fuzzy._single_token_thresholds(10)["min_fuzzy_score"]
+    searches = [
+        (fuzzy._single_folded, 0, 15, single_min),
+        (fuzzy._all_folded, 1, 20, MULTI_TOKEN_MIN_FUZZY_SCORE),
+    ]
+
+    expected = found = identical = total = boundary_ties = 0
+    brute_s = prefilter_s = 0.0
+    for _ in range(count):
+        choices, index_slot, limit, cutoff = rng.choice(searches)
+        if not choices:
+            continue
+        query = perturb(rng.choice(choices), rng)
+
+        t0 = time.perf_counter()
+        brute = fuzzy._extract(query, choices, None, limit, cutoff)
+        brute_s += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        shortlist = indexes[index_slot].shortlist(query, fuzzy.prefilter_max_candidates, cutoff)
+        shortlisted = fuzzy._extract(query, choices, shortlist, limit, cutoff)
+        prefilter_s += time.perf_counter() - t0
+
+        boundary = brute[-1][1] if len(brute) == limit else None
+        brute_ids = {i for _c, score, i in brute if score != boundary}
+        shortlisted_ids = {i for _c, _s, i in shortlisted}
+        expected += len(brute_ids)
+        found += len(brute_ids & shortlisted_ids)
+        boundary_ties += sum(1 for _c, score, i in brute if score == boundary and i not in shortlisted_ids)
+        identical += brute == shortlisted
+        total += 1
+
+    return {
+        "queries": total,
+        "recall": found / expected if expected else 1.0,
+        "identical_results": identical,
+        "boundary_tie_swaps": boundary_ties,
+        "brute_ms_per_query": round(brute_s * 1000 / max(total, 1), 3),
+        "prefilter_ms_per_query": round(prefilter_s * 1000 / max(total, 1), 3),
+    }
+
+
+def check_labels(engine, indexes, labels):
+    fuzzy = engine.fuzzy_matcher
+    set_prefilter(fuzzy, (None, None))
+    brute = [engine.analyze_structured(label).to_debug_dict() for label in labels]
+    set_prefilter(fuzzy, indexes)
+    differing = [i for i, label in enumerate(labels) if engine.analyze_structured(label).to_debug_dict() != brute[i]]
+    return {"labels": len(labels), "differing": len(differing), "first_differing": differing[:10]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens fuzzy prefilter recall check")
+    parser.add_argument("--labels", type=Path, default=None)
+    parser.add_argument("--synthetic", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--max-candidates", type=int, default=app_config.FUZZY_PREFILTER_MAX_CANDIDATES)
+    parser.add_argument("--min-recall", type=float, default=1.0)
+    args = parser.parse_args()
+
+    engine = FoodLensAnalysisEngine()
+    fuzzy = engine.fuzzy_matcher
+    fuzzy.memo = FuzzySpanMemo(0)
+    fuzzy.enable_prefilter(args.max_candidates)
+    indexes = (fuzzy._single_index, fuzzy._all_index)
+
+    report = {
+        "alias_count": fuzzy.alias_count,
+        "max_candidates": args.max_candidates,
+        "candidates": check_candidates(fuzzy, indexes, args.synthetic, args.seed),
+    }
+    if args.labels:
+        report["labels"] = check_labels(engine, indexes, load_labels(args.labels))
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = report["candidates"]["recall"] >= args.min_recall
+    if "labels" in report:
+        ok = ok and report["labels"]["differing"] == 0
+    print("✅ Prefilter brute-force ile uyumlu" if ok else "❌ Prefilter brute-force sonuçlarını kaçırıyor")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
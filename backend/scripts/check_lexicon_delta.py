@@ -0,0 +1,245 @@
+"""
+Check incremental lexicon edits against a full rebuild.
+
+Usage:
+    python backend/scripts/check_lexicon_delta.py [--edits N] [--queries N] [--seed S] [--labels PATH]
+
+The master CSV is copied to a temporary directory (snapshot disabled). N
+random records are deleted, N are edited (new keyword, other risk level)
+and N new records are added, some cloned from existing aliases and some
+with new ones. Engines compared:
+  - delta: the base engine with the edits applied through apply_lexicon_delta
+  - rebuilt: a fresh engine from the edited CSV (deleted and edited rows
+    removed, edited and new rows appended at the end)
+  - compacted: the delta engine after compaction
+  - tail: a base engine fed the new rows as an appended CSV tail
+    (read_appended_rows, append_only), compared with a fresh engine from
+    the appended file
+Checks:
+  - exact_lookup_id resolves to the same item id in every section, for
+    aliases of the base and edited lexicon, perturbations of them and
+    random strings
+  - present / may_contain / free_from item ids agree on the sample labels
+    plus one label per edited record with its name and a misspelling (--labels: one OCR label per line, or
+    a JSON list of label strings). Fuzzy ties between equal-scoring aliases
+    may resolve to another record after an edit, so label differences
+    between delta and rebuilt are reported; compacted must equal delta
+  - the delta engine reports the new lexicon version
+Exits with status 1 if an exact lookup or the compacted engine differs.
+"""
+import argparse
+import csv
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from script_common import RANDOM_CHARS, SAMPLE_LABELS, load_labels, perturb
+
+from backend.app import config as app_config
+from backend.app.lexicon_manager import WARMUP_TEXT
+
+RISK_LEVELS = ["Low", "Medium", "High"]
+
+
+def read_rows(path: Path):
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def write_rows(path: Path, fieldnames, rows) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def misspell(text: str) -> str:
+    """Swap two inner letters of the longest word, so only fuzzy recovery can match it."""
+    words = text.split()
+    if not words:
+        return text
+    i = max(range(len(words)), key=lambda n: len(words[n]))
+    word = words[i]
+    if len(word) >= 5:
+        mid = len(word) // 2
+        words[i] = word[:mid - 1] + word[mid] + word[mid - 1] + word[mid + 1:]
+    return " ".join(words)
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(RANDOM_CHARS) for _ in range(rng.randint(5, 10)))
+
+
+def make_edits(rows, count: int, rng: random.Random):
+    chosen = rng.sample([row for row in rows if row.get("id") and row.get("type")], count * 3)
+    deletes = [row["id"] for row in chosen[:count]]
+
+    edited = []
+    for row in chosen[count:count * 2]:
+        row = dict(row)
+        keywords = json.loads(row["keywords"]) if row.get("keywords", "").startswith("[") else []
+        row["keywords"] = json.dumps(keywords + [random_word(rng) + " " + random_word(rng)], ensure_ascii=False)
+        row["risk_level"] = rng.choice([level for level in RISK_LEVELS if level != row.get("risk_level")])
+        edited.append(row)
+
+    added = []
+    for n, row in enumerate(chosen[count * 2:]):
+        row = dict(row, id=f"ZZDELTA{n}")
+        if n % 2:
+            # New aliases only; the clone keeps its source's type
+            name = f"{random_word(rng)} {random_word(rng)}"
+            row.update(name_tr=name.title(), name_en="", name="", keywords=json.dumps([name], ensure_ascii=False))
+        added.append(row)
+    return deletes, edited, added
+
+
+def build_engine(csv_path: Path):
+    from backend.app.analysis.engine import FoodLensAnalysisEngine
+
+    app_config.MASTER_CSV_FILE = csv_path
+    t0 = time.perf_counter()
+    engine = FoodLensAnalysisEngine()
+    engine.analyze_structured(WARMUP_TEXT)  # builds the lazy indexes, as a reload does
+    return engine, time.perf_counter() - t0
+
+
+def lookup_item_ids(engine, queries, sections):
+    store = engine.lexicon.store
+    table = []
+    for query in queries:
+        row = []
+        for section in sections:
+            record_id = engine.lexicon.exact_lookup_id(query, section)
+            row.append(store.item_ids[record_id] if record_id is not None else None)
+        table.append(row)
+    return table
+
+
+def label_items(engine, labels):
+    results = []
+    for label in labels:
+        result = engine.analyze_structured(label)
+        results.append([sorted(item.item_id for item in items) for items in (result.present, result.may_contain, result.free_from)])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens incremental lexicon update check")
+    parser.add_argument("--edits", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=19)
+    parser.add_argument("--labels", type=Path, default=None)
+    args = parser.parse_args()
+
+    from backend.app.analysis.matching.lexicon import TYPE_PRIORITY_BY_SECTION, record_aliases
+    from backend.app.analysis.matching.lexicon_delta import read_appended_rows
+
+    rng = random.Random(args.seed)
+    app_config.USE_LEXICON_SNAPSHOT = False
+    app_config.RESULT_CACHE_MAX_ENTRIES = 0
+    app_config.FUZZY_MEMO_MAX_ENTRIES = 0
+
+    workdir = Path(tempfile.mkdtemp(prefix="foodlens_delta_"))
+    base_csv = workdir / "base.csv"
+    shutil.copyfile(app_config.MASTER_CSV_FILE, base_csv)
+    fieldnames, rows = read_rows(base_csv)
+    deletes, edited, added = make_edits(rows, args.edits, rng)
+
+    removed_ids = set(deletes) | {row["id"] for row in edited}
+    rebuilt_csv = workdir / "rebuilt.csv"
+    write_rows(rebuilt_csv, fieldnames, [row for row in rows if row.get("id") not in removed_ids] + edited + added)
+    tail_csv = workdir / "tail.csv"
+    shutil.copyfile(base_csv, tail_csv)
+
+    delta_engine, base_build_s = build_engine(base_csv)
+    base_version = delta_engine.lexicon.version
+    t0 = time.perf_counter()
+    overlay = delta_engine.apply_lexicon_delta(edited + added, deletes)
+    delta_ms = (time.perf_counter() - t0) * 1000
+    rebuilt_engine, rebuild_s = build_engine(rebuilt_csv)
+    t0 = time.perf_counter()
+    compacted_engine = delta_engine.compacted()
+    compaction_s = time.perf_counter() - t0
+
+    tail_engine, _ = build_engine(tail_csv)
+    with tail_csv.open("a", encoding="utf-8", newline="") as f:
+        csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n").writerows(added)
+    appended = read_appended_rows(tail_csv, *tail_engine.lexicon.csv_state)
+    if appended is not None:
+        tail_rows, tail_sha, tail_size = appended
+        tail_engine.apply_lexicon_delta(tail_rows, append_only=True, csv_state=(tail_sha, tail_size))
+    tail_rebuilt_engine, _ = build_engine(tail_csv)
+
+    sections = list(TYPE_PRIORITY_BY_SECTION) + ["other_section"]
+    aliases = sorted(set(rebuilt_engine.lexicon.alias_map) | set(tail_rebuilt_engine.lexicon.alias_map))
+    touched = sorted({alias for row in rows if row.get("id") in removed_ids for alias in record_aliases(row)})
+    touched += [alias for row in edited + added for alias in record_aliases(row)]
+    queries = touched + rng.sample(aliases, min(args.queries, len(aliases)))
+    queries += [perturb(rng.choice(touched), rng) for _ in range(args.queries // 2)]
+    queries += [perturb(rng.choice(aliases), rng) for _ in range(args.queries // 2)]
+    queries += [random_word(rng) for _ in range(args.queries // 4)]
+
+    delta_ids = lookup_item_ids(delta_engine, queries, sections)
+    exact_differing = [q for q, a, b in zip(queries, delta_ids, lookup_item_ids(rebuilt_engine, queries, sections)) if a != b]
+    compacted_differing = [q for q, a, b in zip(queries, delta_ids, lookup_item_ids(compacted_engine, queries, sections)) if a != b]
+    tail_differing = [
+        q for q, a, b in zip(queries, lookup_item_ids(tail_engine, queries, sections), lookup_item_ids(tail_rebuilt_engine, queries, sections))
+        if a != b
+    ]
+
+    labels = load_labels(args.labels) if args.labels else list(SAMPLE_LABELS)
+    labels = [label for label in labels if label.strip()]
+    names = [row.get("name_tr") or row.get("name_en") or row.get("name") or "" for row in edited + added]
+    labels += [f"İçindekiler: şeker, {name}, tuz, {misspell(name)}." for name in names]
+    delta_items = label_items(delta_engine, labels)
+    label_differing = [label for label, a, b in zip(labels, delta_items, label_items(rebuilt_engine, labels)) if a != b]
+    compacted_label_differing = [label for label, a, b in zip(labels, delta_items, label_items(compacted_engine, labels)) if a != b]
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    report = {
+        "records": len(rows),
+        "deleted": len(deletes),
+        "edited": len(edited),
+        "added": len(added),
+        "base_version": base_version,
+        "delta_version": delta_engine.lexicon.version,
+        "overlay": overlay.stats(),
+        "timing": {
+            "delta_apply_ms": round(delta_ms, 2),
+            "base_build_s": round(base_build_s, 3),
+            "full_rebuild_s": round(rebuild_s, 3),
+            "compaction_s": round(compaction_s, 3),
+        },
+        "queries": len(queries),
+        "exact_differing": len(exact_differing),
+        "first_exact_differing": exact_differing[:5],
+        "compacted_exact_differing": len(compacted_differing),
+        "tail_append_applied": appended is not None,
+        "tail_exact_differing": len(tail_differing),
+        "labels": len(labels),
+        "label_differing": len(label_differing),
+        "first_label_differing": label_differing[:3],
+        "compacted_label_differing": len(compacted_label_differing),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = (
+        not exact_differing and not compacted_differing and not compacted_label_differing
+        and appended is not None and not tail_differing
+        and delta_engine.lexicon.version != base_version
+        and compacted_engine.lexicon.version == delta_engine.lexicon.version
+    )
+    print("✅ Artımlı lexicon güncellemesi tam yeniden kurulumla aynı" if ok else "❌ Artımlı lexicon güncellemesi farklı sonuç veriyor")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
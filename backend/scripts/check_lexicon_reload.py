@@ -0,0 +1,139 @@
+"""
+Check lexicon hot reload under concurrent requests.
+
+Usage:
+    python backend/scripts/check_lexicon_reload.py [--threads N] [--seconds S]
+
+The master CSV is copied to a temporary directory and the engine is pointed
+at the copy (FOODLENS_MASTER_FILE, snapshot disabled). Request threads keep
+calling FoodLensMatcher.analyze_structured while an entry is appended to the
+copy and the LexiconManager watcher picks it up. Checks:
+  - no request fails during the reload
+  - every response carries either the old or the new lexicon version, and
+    once a thread has seen the new version it never sees the old one again
+  - after the swap the appended entry is found by an exact lookup
+Exits with status 1 if any check fails.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+NEW_ENTRY = {
+    "id": "ZZTEST1", "name_tr": "Deneme Maddesi Kuraldışı", "type": "ingredient", "risk_level": "Low",
+    "description_tr": "Sıcak yükleme testi.", "keywords": json.dumps(["deneme maddesi kuraldisi"]),
+}
+QUERY_TEXT = "İçindekiler: buğday unu, şeker, deneme maddesi kuraldışı, tuz."
+
+
+def append_row(path: Path, entry) -> None:
+    """Append entry as a CSV row laid out by the file's own header."""
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f))
+    line = io.StringIO()
+    csv.DictWriter(line, fieldnames=header, restval="", extrasaction="ignore", lineterminator="\n").writerow(entry)
+    ends_with_newline = path.read_bytes().endswith(b"\n")
+    with path.open("a", encoding="utf-8", newline="") as f:
+        f.write(line.getvalue() if ends_with_newline else "\n" + line.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens lexicon hot reload check")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    args = parser.parse_args()
+
+    from backend.app import config as app_config
+
+    workdir = Path(tempfile.mkdtemp(prefix="foodlens_reload_"))
+    csv_copy = workdir / app_config.MASTER_CSV_FILE.name
+    shutil.copyfile(app_config.MASTER_CSV_FILE, csv_copy)
+    app_config.MASTER_CSV_FILE = csv_copy
+    app_config.USE_LEXICON_SNAPSHOT = False
+    app_config.RESULT_CACHE_MAX_ENTRIES = 0
+    os.environ["FOODLENS_MASTER_FILE"] = str(csv_copy)
+
+    from backend.app.lexicon_manager import get_lexicon_manager
+    from backend.app.matcher_engine import FoodLensMatcher
+
+    matcher = FoodLensMatcher()
+    manager = get_lexicon_manager()
+    old_version = matcher.engine.lexicon.version
+    manager.check_for_update()  # records the current file signature
+
+    errors = []
+    regressions = []
+    versions = set()
+    stop = threading.Event()
+
+    def worker():
+        seen_new = False
+        while not stop.is_set():
+            try:
+                version = matcher.analyze_structured(QUERY_TEXT)["lexicon_version"]
+            except Exception as exc:
+                errors.append(f"{type(exc).__name__}: {exc}")
+                continue
+            versions.add(version)
+            if version != old_version:
+                seen_new = True
+            elif seen_new:
+                regressions.append(version)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(0.5)
+    append_row(csv_copy, NEW_ENTRY)
+
+    t0 = time.perf_counter()
+    started = False
+    while time.perf_counter() - t0 < args.seconds and not started:
+        started = manager.check_for_update()
+        time.sleep(0.05)
+    manager.wait(args.seconds)
+    reload_s = time.perf_counter() - t0
+    time.sleep(0.5)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    new_version = matcher.engine.lexicon.version
+    present = [item["id"] for item in matcher.analyze_structured(QUERY_TEXT)["present"]]
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "old_version": old_version,
+        "new_version": new_version,
+        "reload_started": started,
+        "reload_seconds": round(reload_s, 3),
+        "versions_served": sorted(versions),
+        "request_errors": len(errors),
+        "first_errors": errors[:5],
+        "version_regressions": len(regressions),
+        "new_entry_matched": "ZZTEST1" in present,
+        "manager": manager.status(),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = (
+        started and not errors and not regressions and new_version != old_version
+        and versions <= {old_version, new_version} and "ZZTEST1" in present
+    )
+    print("✅ Lexicon kesintisiz yeniden yüklendi" if ok else "❌ Lexicon yeniden yükleme kontrolü başarısız")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
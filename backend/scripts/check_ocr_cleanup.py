@@ -0,0 +1,194 @@
+"""
+Check the compiled OCR cleanup pipeline against the sequential reference.
+
+Usage:
+    python backend/scripts/check_ocr_cleanup.py [--labels PATH] [--synthetic N]
+                                               [--dump-labels N] [--seed S]
+
+The reference below is the original cleanup_ocr_text: one normalize_text
+pass, the six İçindekiler patterns and the Ingredients pattern one after
+another, regex noise removal, four more re.sub passes and a second
+normalize_text inside build_line_candidates. Both implementations run on
+  - --labels (one OCR label per line, or a JSON list of label strings),
+  - seeded synthetic labels with OCR noise (symbols, fragmented letters,
+    tabs, carriage returns, broken "içindekiler" / "ingredients" keywords),
+  - long dumps built by concatenating --dump-labels noisy labels,
+and the (normalized text, lines) pairs must be byte-identical. Exits with
+status 1 on any difference.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from script_common import load_labels
+
+from backend.app.analysis.preprocessing import ocr_cleanup
+from backend.app.analysis.preprocessing.normalize import TRANSLATION_TABLE
+
+SAMPLE_LABELS = [
+    "İçindekiler: Buğday unu, şeker, bitkisel yağ (palm), kakao (%4), tuz, emülgatör (soya lesitini).",
+    "Eser miktarda fındık, süt ve susam içerebilir.",
+    "Besin Değerleri (100 g): Enerji 450 kcal / 1880 kJ, Yağ / Fat 20 g, Protein 6 g",
+    "Ingredients: sugar, wheat flour, cocoa butter, whole milk powder, emulsifier (soy lecithin).",
+    "icindekiler: misir surubu, potesyum sorbat, sodyum benzoet, sitrik asid, e-102 tartrazin.",
+    "İÇİNDEKİLER: SU, ŞEKER, ASİTLİK DÜZENLEYİCİ (SİTRİK ASİT), KORUYUCU (POTASYUM SORBAT)",
+    "Üretici: Örnek Gıda A.Ş. | Adres: İstanbul • Tel: 0212 000 00 00",
+    "Serin ve kuru yerde muhafaza ediniz.\nSon tüketim tarihi ambalaj üzerindedir.",
+]
+
+KEYWORD_FRAGMENTS = [
+    "i c i n d e k i l e r", "İ ç i n d e k i l e r", "ndekiler", "ndeki", "ı ndekiler", "iindeki",
+    "için dekiler", "ic in dekiler", "İÇİNDEKİLER", "ICINDEKILER", "CINDEKI", "iCINDEK", "İçindekiler",
+    "I n g r e d i e n t s", "ingredient", "INGREDIENTS", "in gred ients", "x ndeki", "çndeki",
+]
+NOISE = "§¶©®™°±×÷µ∞≈|•·“”’‘\t\r~^*#@&$!?<>[]{}=+_\\\"'`"
+WORDS = (
+    "şeker tuz su un buğday süt yağ kakao fındık susam soya lesitin emülgatör aroma "
+    "E330 E621 E150d (%4) 100g kcal , ; : . - ( ) / % ve veya içerebilir"
+).split()
+
+
+def legacy_normalize_text(text: str) -> str:
+    if text is None:
+        return ""
+    text = str(text).translate(TRANSLATION_TABLE)
+    text = text.replace("\r", "\n")
+    text = re.sub(r"[ ]{2,}", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def legacy_build_line_candidates(text: str) -> list:
+    raw_lines = [line.strip(" -:;,.") for line in legacy_normalize_text(text).split("\n")]
+    lines = []
+    for line in raw_lines:
+        if not line:
+            continue
+        if len(line) == 1:
+            continue
+        lines.append(re.sub(r"\s+", " ", line).strip())
+    return lines
+
+
+def legacy_is_garbage_line(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped:
+        return True
+    if len(stripped) <= 2 and not stripped.isalpha():
+        return True
+    if ocr_cleanup.GARBAGE_LINE_RE.match(stripped):
+        return True
+    letters = sum(1 for c in stripped if c.isalpha())
+    if len(stripped) > 5 and letters / len(stripped) < 0.3:
+        return True
+    return False
+
+
+def legacy_cleanup_ocr_text(text: str):
+    if not text or not text.strip():
+        return "", []
+
+    normalized = legacy_normalize_text(text)
+    for pattern, replacement in ocr_cleanup.BROKEN_ICINDEKILER_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    for pattern, replacement in ocr_cleanup.BROKEN_INGREDIENTS_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = ocr_cleanup.NOISE_CHARS_RE.sub(" ", normalized)
+    normalized = ocr_cleanup.MULTI_SPECIAL_RE.sub(" ", normalized)
+    normalized = re.sub(r"(?<=\s)[^\w\s](?=\s)", " ", normalized)
+    normalized = re.sub(
+        r"(?<!\w)(\S\s){2,}\S(?!\w)", lambda m: m.group(0).replace(" ", ""), normalized
+    )
+    normalized = re.sub(r"[ ]{2,}", " ", normalized)
+    normalized = re.sub(r"([,:;])(?=\S)", r"\1 ", normalized)
+    normalized = re.sub(r"\(\s+", "(", normalized)
+    normalized = re.sub(r"\s+\)", ")", normalized)
+
+    raw_lines = legacy_build_line_candidates(normalized)
+    clean_lines = [line for line in raw_lines if not legacy_is_garbage_line(line)]
+    return normalized, ocr_cleanup.merge_lines(clean_lines)
+
+
+def noisy(text: str, rng: random.Random) -> str:
+    out = []
+    for ch in text:
+        r = rng.random()
+        if r < 0.03:
+            out.append(rng.choice(NOISE))
+        elif r < 0.05:
+            out.append(rng.choice((" ", "  ", "\n", "\n\n\n", " \n ")))
+        elif r < 0.06:
+            continue
+        out.append(ch)
+        if ch.isalpha() and rng.random() < 0.02:
+            out.append(" ")
+    return "".join(out)
+
+
+def synthetic_label(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(3, 40)):
+        r = rng.random()
+        if r < 0.15:
+            parts.append(rng.choice(KEYWORD_FRAGMENTS))
+        elif r < 0.25:
+            parts.append(" ".join(rng.choice(WORDS)))
+        else:
+            parts.append(rng.choice(WORDS))
+    return noisy(rng.choice(("", " ", ", ", ":")).join(parts), rng)
+
+
+def timed(fn, texts):
+    t0 = time.perf_counter()
+    outputs = [fn(text) for text in texts]
+    return outputs, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens OCR cleanup differential check")
+    parser.add_argument("--labels", type=Path, default=None)
+    parser.add_argument("--synthetic", type=int, default=5000)
+    parser.add_argument("--dump-labels", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    labels = load_labels(args.labels) if args.labels else list(SAMPLE_LABELS)
+    labels += [noisy(label, rng) for label in labels]
+    labels += [synthetic_label(rng) for _ in range(args.synthetic)]
+    dumps = [
+        "\n".join(noisy(rng.choice(labels), rng) for _ in range(args.dump_labels))
+        for _ in range(max(len(labels) // args.dump_labels, 1))
+    ] if args.dump_labels > 0 else []
+
+    report = {"labels": len(labels), "dumps": len(dumps)}
+    differing = []
+    for name, texts in (("labels", labels), ("dumps", dumps)):
+        reference, legacy_s = timed(legacy_cleanup_ocr_text, texts)
+        compiled, compiled_s = timed(ocr_cleanup.cleanup_ocr_text, texts)
+        differing += [text for text, a, b in zip(texts, reference, compiled) if a != b]
+        report[name] = {
+            "avg_chars": sum(map(len, texts)) // max(len(texts), 1),
+            "legacy_ms_per_text": round(legacy_s * 1000 / max(len(texts), 1), 3),
+            "compiled_ms_per_text": round(compiled_s * 1000 / max(len(texts), 1), 3),
+            "speedup": round(legacy_s / compiled_s, 2) if compiled_s else None,
+        }
+
+    report["differing"] = len(differing)
+    report["first_differing"] = differing[:5]
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    ok = not differing
+    print("✅ Derlenmiş temizleme referansla birebir aynı" if ok else "❌ Derlenmiş temizleme çıktısı farklı")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Check the async analysis worker pool (app/worker_pool.py).
+
+Usage:
+    python backend/scripts/check_worker_pool.py [--workers N] [--requests N] [--labels PATH]
+
+Runs bursts of concurrent analyze_structured requests through
+AnalysisWorkerPool in thread mode and in process mode (--workers forked
+workers), and reports wall time and per-request latency p50 / p95 / max.
+Checks:
+  - process-mode results equal the in-process matcher's results
+  - a burst larger than max_pending is partly rejected (PoolSaturated)
+    and the rest still completes
+  - a request over its timeout raises PoolTimeout and later requests are
+    unaffected
+  - after a lexicon delta in the API process the pool is recycled (by the
+    version listener, not by a request) and the new entry is matched by
+    the workers
+(--labels: one OCR label per line, or a JSON list of label strings)
+Exits with status 1 if any check fails.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from script_common import SAMPLE_LABELS, load_labels, percentile
+
+from backend.app import config as app_config
+from backend.app.matcher_engine import FoodLensMatcher
+from backend.app.worker_pool import AnalysisWorkerPool, PoolSaturated, PoolTimeout
+
+NEW_ENTRY = {
+    "id": "ZZPOOL1", "name_tr": "Havuz Deneme Maddesi", "type": "ingredient",
+    "risk_level": "Low", "keywords": json.dumps(["havuz deneme maddesi"]),
+}
+NEW_ENTRY_TEXT = "İçindekiler: şeker, havuz deneme maddesi, tuz."
+
+
+async def burst(pool, matcher, labels):
+    """(results or exceptions, per-request seconds, wall seconds) for all labels submitted at once."""
+    async def one(label):
+        t0 = time.perf_counter()
+        try:
+            result = await pool.submit(matcher, "analyze_structured", label)
+        except (PoolSaturated, PoolTimeout) as exc:
+            result = exc
+        return result, time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    done = await asyncio.gather(*(one(label) for label in labels))
+    wall = time.perf_counter() - t0
+    return [r for r, _ in done], [s for r, s in done if not isinstance(r, Exception)], wall
+
+
+def timing(latencies, wall, count):
+    return {
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(count / wall, 1) if wall else None,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def strip_version(result):
+    return {key: value for key, value in result.items() if key != "lexicon_version"}
+
+
+async def run_checks(args, matcher, labels):
+    report = {}
+    requests = [labels[i % len(labels)] for i in range(args.requests)]
+    expected = {label: strip_version(matcher.analyze_structured(label)) for label in labels}
+
+    thread_pool = AnalysisWorkerPool(0, max_pending=len(requests), timeout_seconds=60)
+    _, latencies, wall = await burst(thread_pool, matcher, requests)
+    report["thread_mode"] = timing(latencies, wall, len(requests))
+    thread_pool.shutdown()
+
+    pool = AnalysisWorkerPool(args.workers, max_pending=len(requests), timeout_seconds=60)
+    pool.start()
+    results, latencies, wall = await burst(pool, matcher, requests)
+    report["process_mode"] = timing(latencies, wall, len(requests))
+    mismatched = [
+        label for label, result in zip(requests, results)
+        if isinstance(result, Exception) or strip_version(result) != expected[label]
+    ]
+    report["process_mismatches"] = len(mismatched)
+
+    pool.max_pending = args.workers
+    results, _, _ = await burst(pool, matcher, requests)
+    rejected = sum(1 for r in results if isinstance(r, PoolSaturated))
+    report["saturation"] = {"submitted": len(requests), "rejected": rejected, "served": len(requests) - rejected}
+    pool.max_pending = len(requests)
+
+    slow_label = " ".join(labels) * 20
+    try:
+        await pool.submit(matcher, "analyze_structured", slow_label, timeout=0.001)
+        timed_out = False
+    except PoolTimeout:
+        timed_out = True
+    after_timeout = await pool.submit(matcher, "analyze_structured", labels[0])
+    report["timeout"] = {"raised": timed_out, "next_request_ok": strip_version(after_timeout) == expected[labels[0]]}
+
+    from backend.app.lexicon_manager import get_lexicon_manager
+
+    get_lexicon_manager().add_version_listener(pool.recycle)
+    get_lexicon_manager().apply_delta([NEW_ENTRY])
+    result = await pool.submit(matcher, "analyze_structured", NEW_ENTRY_TEXT)
+    report["delta"] = {
+        "recycled": pool.recycles == 1,
+        "worker_version": result["lexicon_version"],
+        "api_version": matcher.engine.lexicon.version,
+        "new_entry_matched": "ZZPOOL1" in [item["id"] for item in result["present"]],
+    }
+    report["pool"] = pool.stats()
+    pool.shutdown()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens analysis worker pool check")
+    parser.add_argument("--workers", type=int, default=max(2, min(4, os.cpu_count() or 2)))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--labels", type=Path, default=None)
+    args = parser.parse_args()
+
+    app_config.RESULT_CACHE_MAX_ENTRIES = 0
+    labels = load_labels(args.labels) if args.labels else list(SAMPLE_LABELS)
+    labels = [label for label in labels if label.strip()]
+    matcher = FoodLensMatcher()
+
+    report = asyncio.run(run_checks(args, matcher, labels))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    delta = report["delta"]
+    ok = (
+        report["process_mismatches"] == 0
+        and 0 < report["saturation"]["rejected"] < report["saturation"]["submitted"]
+        and report["timeout"]["raised"] and report["timeout"]["next_request_ok"]
+        and delta["recycled"] and delta["new_entry_matched"] and delta["worker_version"] == delta["api_version"]
+    )
+    print("✅ İşçi havuzu sınırları ve sonuçları doğru" if ok else "❌ İşçi havuzu kontrolü başarısız")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
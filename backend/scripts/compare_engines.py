@@ -0,0 +1,251 @@
+"""
+Differential accuracy / latency runner for two engine configurations.
+
+Usage:
+    python backend/scripts/compare_engines.py [--corpus PATH | --count N --seed S]
+        [--a-env KEY=VALUE ...] [--b-env KEY=VALUE ...]
+        [--a-tree PATH] [--b-tree PATH] [--repeat N] [--out PATH]
+        [--max-precision-drop F] [--max-recall-drop F] [--max-latency-increase F]
+        [--fail-on-diff]
+
+Each side runs in its own interpreter, so config read at import time
+applies. --x-env sets environment overrides (e.g. FOODLENS_FUZZY_PREFILTER=on,
+FOODLENS_FUZZY_SINGLE_TOKEN_INDEX=deletion). --x-tree runs the side from
+another checkout of the repository (e.g. a git worktree of the commit
+before an optimization). Both sides analyze the same labels: --corpus (a
+label_corpus.py file, a JSON list of label strings or one label per line),
+else label_corpus.generate_corpus(--count, --seed). The fuzzy span memo is
+off on both sides unless an --x-env turns it on, so latency measures
+matching work.
+
+Reported:
+  - per label: present / may_contain / free_from item ids that only one
+    side reports
+  - precision / recall per section and overall against the corpus's
+    expected ids (labels without expected ids only count toward the diff)
+  - latency p50 / p95 / mean per side and B's relative change
+The run fails (status 1) when B's precision or recall drops by more than
+the allowed amount, its mean latency grows by more than
+--max-latency-increase, or, with --fail-on-diff, when any label differs.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+SECTIONS = ("present", "may_contain", "free_from")
+# Not imported from lexicon_manager: the tree under test may predate it
+WARMUP_TEXT = "İçindekiler: buğday unu, şeker, bitkisel yağ, tuz, E330, potesyum sorbat."
+
+
+def run_worker(corpus_path: Path, out_path: Path, repeat: int) -> None:
+    """Analyze every label (in this interpreter's config) and write ids plus latency per label."""
+    from backend.app.analysis.engine import FoodLensAnalysisEngine
+    from backend.app.input_normalization import canonicalize_analysis_text
+
+    labels = json.loads(corpus_path.read_text(encoding="utf-8"))
+    engine = FoodLensAnalysisEngine()
+    engine.analyze_structured(WARMUP_TEXT)
+
+    results = []
+    for label in labels:
+        text = canonicalize_analysis_text(label["text"])
+        best = None
+        for _ in range(max(repeat, 1)):
+            t0 = time.perf_counter()
+            analysis = engine.analyze_structured(text)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        results.append({
+            "present": sorted({item.item_id for item in analysis.present}),
+            "may_contain": sorted({item.item_id for item in analysis.may_contain}),
+            "free_from": sorted({item.item_id for item in analysis.free_from}),
+            "ms": best * 1000,
+        })
+    version = getattr(engine.lexicon, "version", None)  # older trees have no lexicon version
+    out_path.write_text(json.dumps({"lexicon_version": version, "results": results}), encoding="utf-8")
+
+
+def parse_env(pairs):
+    env = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise SystemExit(f"Geçersiz ortam ayarı (KEY=VALUE bekleniyor): {pair}")
+        env[key.strip()] = value
+    return env
+
+
+def run_side(name: str, tree: Path, env_overrides, corpus_path: Path, workdir: Path, repeat: int):
+    out_path = workdir / f"{name}.json"
+    env = dict(os.environ)
+    env.setdefault("FOODLENS_FUZZY_MEMO_MAX_ENTRIES", "0")
+    env["FOODLENS_STAGE_METRICS"] = "0"
+    env.update(env_overrides)
+    script = Path(__file__).resolve()
+    command = [
+        sys.executable, str(script), "--worker",
+        "--worker-tree", str(tree), "--corpus", str(corpus_path), "--worker-out", str(out_path),
+        "--repeat", str(repeat),
+    ]
+    t0 = time.perf_counter()
+    subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL)
+    wall = time.perf_counter() - t0
+    data = json.loads(out_path.read_text(encoding="utf-8"))
+    data["wall_s"] = wall
+    return data
+
+
+def score(results, labels):
+    """Micro precision / recall per section and overall against the labels' expected ids."""
+    totals = {section: [0, 0, 0] for section in SECTIONS + ("overall",)}  # true positive, reported, expected
+    for result, label in zip(results, labels):
+        expected = label.get("expected")
+        if not expected:
+            continue
+        for section in SECTIONS:
+            got, want = set(result[section]), set(expected.get(section, []))
+            for key in (section, "overall"):
+                totals[key][0] += len(got & want)
+                totals[key][1] += len(got)
+                totals[key][2] += len(want)
+    return {
+        key: {
+            "precision": round(tp / reported, 4) if reported else None,
+            "recall": round(tp / expected, 4) if expected else None,
+        }
+        for key, (tp, reported, expected) in totals.items()
+    }
+
+
+def latency(results):
+    values = sorted(result["ms"] for result in results)
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "mean_ms": None}
+    return {
+        "p50_ms": round(values[len(values) // 2], 3),
+        "p95_ms": round(values[min(len(values) - 1, int(0.95 * len(values)))], 3),
+        "mean_ms": round(statistics.fmean(values), 3),
+    }
+
+
+def diff_labels(labels, results_a, results_b):
+    differing = []
+    section_counts = dict.fromkeys(SECTIONS, 0)
+    for label, a, b in zip(labels, results_a, results_b):
+        entry = {}
+        for section in SECTIONS:
+            only_a = sorted(set(a[section]) - set(b[section]))
+            only_b = sorted(set(b[section]) - set(a[section]))
+            if only_a or only_b:
+                entry[section] = {"only_a": only_a, "only_b": only_b}
+                section_counts[section] += 1
+        if entry:
+            differing.append({"id": label.get("id"), "noise": label.get("noise"), "text": label["text"][:160], **entry})
+    return differing, section_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens engine configuration comparison")
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=23)
+    parser.add_argument("--a-env", action="append", default=[])
+    parser.add_argument("--b-env", action="append", default=[])
+    parser.add_argument("--a-tree", type=Path, default=BASE_DIR)
+    parser.add_argument("--b-tree", type=Path, default=BASE_DIR)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--max-precision-drop", type=float, default=0.0)
+    parser.add_argument("--max-recall-drop", type=float, default=0.0)
+    parser.add_argument("--max-latency-increase", type=float, default=None)
+    parser.add_argument("--fail-on-diff", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-tree", type=Path, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-out", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Import the engine from the requested checkout, not from this one
+        sys.path.insert(0, str(args.worker_tree.resolve()))
+        run_worker(args.corpus, args.worker_out, args.repeat)
+        return
+
+    env_a, env_b = parse_env(args.a_env), parse_env(args.b_env)
+    from label_corpus import generate_corpus, load_corpus
+
+    if args.corpus:
+        labels = load_corpus(args.corpus)
+    else:
+        from backend.app.analysis.engine import FoodLensAnalysisEngine
+
+        labels = generate_corpus(FoodLensAnalysisEngine().lexicon, args.count, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="foodlens_compare_") as tmp:
+        workdir = Path(tmp)
+        corpus_path = workdir / "corpus.json"
+        corpus_path.write_text(json.dumps(labels, ensure_ascii=False), encoding="utf-8")
+        side_a = run_side("a", args.a_tree, env_a, corpus_path, workdir, args.repeat)
+        side_b = run_side("b", args.b_tree, env_b, corpus_path, workdir, args.repeat)
+
+    results_a, results_b = side_a["results"], side_b["results"]
+    differing, section_counts = diff_labels(labels, results_a, results_b)
+    accuracy_a, accuracy_b = score(results_a, labels), score(results_b, labels)
+    latency_a, latency_b = latency(results_a), latency(results_b)
+
+    accuracy_delta = {}
+    for key in accuracy_a:
+        accuracy_delta[key] = {
+            metric: round(accuracy_b[key][metric] - accuracy_a[key][metric], 4)
+            if accuracy_a[key][metric] is not None and accuracy_b[key][metric] is not None else None
+            for metric in ("precision", "recall")
+        }
+    latency_change = (
+        round(latency_b["mean_ms"] / latency_a["mean_ms"] - 1, 4) if latency_a["mean_ms"] else None
+    )
+
+    failures = []
+    overall = accuracy_delta["overall"]
+    if overall["precision"] is not None and -overall["precision"] > args.max_precision_drop:
+        failures.append("precision")
+    if overall["recall"] is not None and -overall["recall"] > args.max_recall_drop:
+        failures.append("recall")
+    if args.max_latency_increase is not None and latency_change is not None and latency_change > args.max_latency_increase:
+        failures.append("latency")
+    if args.fail_on_diff and differing:
+        failures.append("diff")
+
+    report = {
+        "labels": len(labels),
+        "labeled": sum(1 for label in labels if label.get("expected")),
+        "a": {"tree": str(args.a_tree), "env": env_a, "lexicon_version": side_a["lexicon_version"]},
+        "b": {"tree": str(args.b_tree), "env": env_b, "lexicon_version": side_b["lexicon_version"]},
+        "differing_labels": len(differing),
+        "differing_by_section": section_counts,
+        "first_differing": differing[:10],
+        "accuracy": {"a": accuracy_a, "b": accuracy_b, "delta": accuracy_delta},
+        "latency": {"a": latency_a, "b": latency_b, "mean_change": latency_change},
+        "failures": failures,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.out:
+        full = dict(report, differing=differing)
+        args.out.write_text(json.dumps(full, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if failures:
+        print(f"❌ B yapılandırması kabul edilmedi: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"✅ B yapılandırması kabul edildi ({len(differing)} etikette fark)")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
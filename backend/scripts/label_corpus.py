@@ -0,0 +1,278 @@
+"""
+Generate a synthetic corpus of noisy food labels from the master lexicon.
+
+Usage:
+    python backend/scripts/label_corpus.py [--count N] [--seed S] [--out PATH]
+
+Each label is assembled from lexicon records the way real packaging reads:
+  - an ingredient list under an "İçindekiler" header, with role prefixes
+    ("koruyucu (potasyum sorbat)"), percentages and nested groups
+  - optional "Eser miktarda ... içerebilir." and "... içermez." claims
+    built from allergen records
+  - nutrition tables (inline or one row per line), producer addresses,
+    storage notes, lot / best-before lines
+OCR noise is then applied at one of three levels (clean / light / heavy):
+letters split by spaces ("P a l m y a ğ ı"), broken headers ("lçindekiler",
+"İ ç i n d e k i l e r"), Turkish characters swapped for their ASCII forms,
+common OCR confusions (l/1, rn/m, o/0), line breaks inside the list and
+all-caps labels.
+
+The output is a JSON list of {"id", "noise", "text", "expected"}. expected
+holds the item ids a perfect reader would report for present / may_contain
+/ free_from: each chosen name resolved through the lexicon's exact lookup
+for its section, before noise. Generation is deterministic for a given
+lexicon and seed, so a corpus can be regenerated instead of stored.
+
+bench_pipeline.py and compare_engines.py import generate_corpus() from here.
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+HEADERS = ["İçindekiler:", "İÇİNDEKİLER:", "içindekiler:", "Ingredients:", "İçindekiler :"]
+BROKEN_HEADERS = [
+    "İ ç i n d e k i l e r:", "ÇİNDEKİLER:", "lçindekiler:", "Icindekiler;", "İçindeki ler:",
+    "1çindekiler:", "İçlndekiler:", "icindekiler", "İÇ İNDEKİLER:",
+]
+ROLE_PREFIXES = [
+    "koruyucu", "emülgatör", "renklendirici", "asitlik düzenleyici", "kıvam arttırıcı",
+    "tatlandırıcı", "antioksidan", "kabartıcı", "aroma verici",
+]
+TURKISH_SWAPS = {
+    "ş": "s", "ı": "i", "ğ": "g", "ç": "c", "ö": "o", "ü": "u",
+    "Ş": "S", "İ": "I", "Ğ": "G", "Ç": "C", "Ö": "O", "Ü": "U",
+}
+OCR_CONFUSIONS = [("rn", "m"), ("m", "rn"), ("l", "1"), ("o", "0"), ("i", "l"), ("e", "c"), ("u", "v")]
+COMPANIES = ["Anadolu Gıda San. ve Tic. A.Ş.", "Ege Un Mamulleri Ltd. Şti.", "Marmara Süt Ürünleri A.Ş.", "Karadeniz Fındık Gıda A.Ş."]
+STREETS = ["Organize Sanayi Bölgesi 3. Cadde", "Atatürk Bulvarı", "Cumhuriyet Mah. Fabrika Sok.", "Sanayi Cad."]
+CITIES = ["Kayseri", "İzmir", "Bursa", "Konya", "Gaziantep", "Ordu", "Manisa"]
+STORAGE_NOTES = [
+    "Serin ve kuru yerde muhafaza ediniz.",
+    "Açıldıktan sonra buzdolabında saklayınız ve 3 gün içinde tüketiniz.",
+    "Doğrudan güneş ışığından koruyunuz.",
+]
+NOISE_LEVELS = [("clean", 0.3), ("light", 0.45), ("heavy", 0.25)]
+
+
+def _usable_name(name: str) -> bool:
+    return 3 <= len(name) <= 40 and not any(ch in name for ch in ",;:()[]/%")
+
+
+def _candidate_ids(lexicon):
+    """Usable record ids by item type (display names that read like label words)."""
+    store = lexicon.store
+    seen = set()
+    by_type = {}
+    for record_id in range(len(store)):
+        item_id, name, item_type, _risk, _description = store.fields(record_id)
+        if not item_id or item_id in seen or not _usable_name(name):
+            continue
+        seen.add(item_id)
+        by_type.setdefault(item_type, []).append(record_id)
+    return by_type
+
+
+def _expected_id(lexicon, name: str, section_type: str):
+    record_id = lexicon.exact_lookup_id(name, section_type)
+    return None if record_id is None else lexicon.store.item_ids[record_id]
+
+
+def _nutrition_table(rng: random.Random) -> str:
+    kcal = rng.randint(20, 560)
+    values = [
+        ("Enerji", f"{round(kcal * 4.184)} kJ / {kcal} kcal"),
+        ("Yağ", f"{rng.uniform(0, 35):.1f} g"),
+        ("Doymuş Yağ", f"{rng.uniform(0, 15):.1f} g"),
+        ("Karbonhidrat", f"{rng.uniform(0, 80):.1f} g"),
+        ("Şekerler", f"{rng.uniform(0, 50):.1f} g"),
+        ("Lif", f"{rng.uniform(0, 8):.1f} g"),
+        ("Protein", f"{rng.uniform(0, 25):.1f} g"),
+        ("Tuz", f"{rng.uniform(0, 3):.2f} g"),
+    ]
+    values = [(key, value.replace(".", ",")) for key, value in values]
+    if rng.random() < 0.5:
+        return "Besin Değerleri (100 g): " + ", ".join(f"{key} {value}" for key, value in values)
+    return "\n".join(["BESİN DEĞERLERİ 100 g için"] + [f"{key} {value}" for key, value in values])
+
+
+def _address_lines(rng: random.Random) -> str:
+    lines = [
+        f"Üretici: {rng.choice(COMPANIES)} {rng.choice(STREETS)} No:{rng.randint(1, 120)} {rng.choice(CITIES)} / Türkiye",
+        f"Tüketici Danışma Hattı: 0850 {rng.randint(200, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+    ]
+    if rng.random() < 0.6:
+        lines.append(f"TETT: {rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(2026, 2028)} Parti No: L{rng.randint(1000, 99999)}")
+    if rng.random() < 0.5:
+        lines.append(f"Net Miktar: {rng.choice([100, 150, 250, 500, 1000])} g")
+    if rng.random() < 0.5:
+        lines.append(rng.choice(STORAGE_NOTES))
+    return "\n".join(lines)
+
+
+def _ingredient_items(rng: random.Random, names):
+    """List items for names; returns the joined text (groups, roles and percentages mixed in)."""
+    items = []
+    i = 0
+    while i < len(names):
+        name = names[i]
+        roll = rng.random()
+        if roll < 0.15:
+            items.append(f"{rng.choice(ROLE_PREFIXES)} ({name})")
+        elif roll < 0.25:
+            items.append(f"{name} (%{rng.randint(1, 40)})")
+        elif roll < 0.32 and i + 1 < len(names):
+            items.append(f"{name} ({names[i + 1]})")
+            i += 1
+        else:
+            items.append(name)
+        i += 1
+    return ", ".join(items)
+
+
+def _fragment_word(word: str) -> str:
+    return " ".join(word)
+
+
+def _apply_noise(text: str, level: str, rng: random.Random) -> str:
+    if level == "clean":
+        return text
+    heavy = level == "heavy"
+    swap_rate = 0.6 if heavy else 0.25
+    confusion_rate = 0.05 if heavy else 0.015
+
+    chars = []
+    for ch in text:
+        if ch in TURKISH_SWAPS and rng.random() < swap_rate:
+            ch = TURKISH_SWAPS[ch]
+        chars.append(ch)
+    text = "".join(chars)
+
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        if len(word) >= 4 and word.isalpha() and rng.random() < (0.08 if heavy else 0.03):
+            words[i] = _fragment_word(word)
+        elif rng.random() < confusion_rate:
+            for source, target in rng.sample(OCR_CONFUSIONS, len(OCR_CONFUSIONS)):
+                if source in word:
+                    words[i] = word.replace(source, target, 1)
+                    break
+    text = " ".join(words)
+
+    if rng.random() < (0.5 if heavy else 0.2):
+        parts = text.split(", ")
+        if len(parts) > 2:
+            cut = rng.randrange(1, len(parts))
+            text = ", ".join(parts[:cut]) + ",\n" + ", ".join(parts[cut:])
+    if heavy and rng.random() < 0.3:
+        text = text.upper()
+    return text
+
+
+def generate_label(lexicon, by_type, index: int, rng: random.Random):
+    ingredient_pool = by_type.get("ingredient", []) + by_type.get("additive", [])
+    allergen_pool = by_type.get("allergen", [])
+    names = lexicon.store.names
+    expected = {"present": set(), "may_contain": set(), "free_from": set()}
+
+    chosen = [names[rid] for rid in rng.sample(ingredient_pool, min(len(ingredient_pool), rng.randint(3, 12)))]
+    for name in chosen:
+        item_id = _expected_id(lexicon, name, "ingredient_section")
+        if item_id is not None:
+            expected["present"].add(item_id)
+
+    level = rng.choices([name for name, _ in NOISE_LEVELS], weights=[w for _, w in NOISE_LEVELS])[0]
+    broken_header = level != "clean" and rng.random() < 0.5
+    header = rng.choice(BROKEN_HEADERS if broken_header else HEADERS)
+    parts = [f"{header} {_ingredient_items(rng, chosen)}."]
+
+    if allergen_pool and rng.random() < 0.45:
+        traces = [names[rid] for rid in rng.sample(allergen_pool, min(len(allergen_pool), rng.randint(1, 3)))]
+        parts.append("Eser miktarda " + " ve ".join(traces) + " içerebilir.")
+        for name in traces:
+            item_id = _expected_id(lexicon, name, "may_contain_section")
+            if item_id is not None:
+                expected["may_contain"].add(item_id)
+    if allergen_pool and rng.random() < 0.25:
+        name = names[rng.choice(allergen_pool)]
+        parts.append(f"{name} içermez.")
+        item_id = _expected_id(lexicon, name, "free_from_section")
+        if item_id is not None:
+            expected["free_from"].add(item_id)
+
+    extras = []
+    if rng.random() < 0.5:
+        extras.append(_nutrition_table(rng))
+    if rng.random() < 0.5:
+        extras.append(_address_lines(rng))
+    for extra in extras:
+        if rng.random() < 0.3:
+            parts.insert(0, extra)
+        else:
+            parts.append(extra)
+
+    text = "\n".join(_apply_noise(part, level, rng) for part in parts)
+    return {
+        "id": f"L{index:06d}",
+        "noise": level,
+        "text": text,
+        "expected": {key: sorted(ids) for key, ids in expected.items()},
+    }
+
+
+def generate_corpus(lexicon, count: int, seed: int = 22):
+    rng = random.Random(seed)
+    by_type = _candidate_ids(lexicon)
+    return [generate_label(lexicon, by_type, index, rng) for index in range(count)]
+
+
+def load_corpus(path: Path):
+    """Labels from a generated corpus, or from a JSON list of label strings / one label per line."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix != ".json":
+        return [{"id": f"L{i:06d}", "noise": None, "text": line, "expected": None} for i, line in enumerate(text.splitlines()) if line.strip()]
+    labels = []
+    for i, label in enumerate(json.loads(text)):
+        if isinstance(label, dict):
+            labels.append(label)
+        else:
+            labels.append({"id": f"L{i:06d}", "noise": None, "text": str(label), "expected": None})
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodLens synthetic label corpus generator")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=22)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    from backend.app.analysis.engine import FoodLensAnalysisEngine
+
+    lexicon = FoodLensAnalysisEngine().lexicon
+    corpus = generate_corpus(lexicon, args.count, args.seed)
+    if args.out is None:
+        print(json.dumps(corpus, ensure_ascii=False, indent=2))
+        return
+
+    args.out.write_text(json.dumps(corpus, ensure_ascii=False, indent=1), encoding="utf-8")
+    by_noise = {}
+    for label in corpus:
+        by_noise[label["noise"]] = by_noise.get(label["noise"], 0) + 1
+    print(json.dumps({
+        "out": str(args.out),
+        "labels": len(corpus),
+        "lexicon_version": lexicon.version,
+        "seed": args.seed,
+        "noise": by_noise,
+        "expected_items": sum(len(ids) for label in corpus for ids in label["expected"].values()),
+    }, ensure_ascii=False, indent=2))
+    print(f"✅ {len(corpus)} etiket üretildi: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
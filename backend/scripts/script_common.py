@@ -0,0 +1,54 @@
+"""
+Helpers shared by the check_* / bench_* scripts.
+
+Not a script itself. The scripts are run as files, so this directory is on
+sys.path and they import it as a top-level module:
+    from script_common import SAMPLE_LABELS, load_labels, percentile
+"""
+import json
+import random
+from pathlib import Path
+
+# Default labels when a script gets no --labels file: clean and OCR-damaged
+# ingredient lists, claims, an English list and a list without separators
+SAMPLE_LABELS = [
+    "İçindekiler: Buğday unu, şeker, bitkisel yağ (palm), kakao (%4), tuz, emülgatör (soya lesitini).",
+    "Eser miktarda fındık, süt ve susam içerebilir. Gluten içermez.",
+    "icindekiler: misir surubu, potesyum sorbat, sodyum benzoet, sitrik asid, e-102 tartrazin.",
+    "Ingredients: sugar, wheat flour, cocoa butter, whole milk powder, emulsifier (soy lecithin).",
+    "İÇİNDEKİLER: SU, ŞEKER, ASİTLİK DÜZENLEYİCİ (SİTRİK ASİT), KORUYUCU (POTASYUM SORBAT)",
+    "icindekiler: bugday unu seker kakaoyagi findik susam sodyum benzoat tuz, yumurta",
+]
+
+# Alias perturbations an exact lookup must see through: copula suffixes and
+# a devoiced / voiced final consonant
+SUFFIXES = ["dir", "dır", "tür", "tur", "dırdır", "tir", "", "", ""]
+FINAL_SWAPS = {"t": "d", "d": "t", "p": "b", "b": "p", "k": "g", "g": "k", "c": "ç", "ç": "c"}
+RANDOM_CHARS = "abcçdeğghıijklmnoöprsştuüvyz"
+
+
+def load_labels(path: Path):
+    """Labels from a JSON list of strings, or one label per line (blank lines skipped)."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        return [str(label) for label in json.loads(text)]
+    return [line for line in text.splitlines() if line.strip()]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def perturb(alias: str, rng: random.Random) -> str:
+    """An alias with a copula suffix, maybe a swapped final consonant, maybe upper-cased."""
+    words = alias.split()
+    if not words:
+        return alias
+    i = rng.randrange(len(words))
+    word = words[i]
+    if word and word[-1] in FINAL_SWAPS and rng.random() < 0.5:
+        words[i] = word[:-1] + FINAL_SWAPS[word[-1]]
+    words[-1] += rng.choice(SUFFIXES)
+    text = " ".join(words)
+    return text.upper() if rng.random() < 0.2 else text
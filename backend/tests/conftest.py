@@ -0,0 +1,51 @@
+"""
+Shared pytest setup: the engine runs on a 31-record fixture lexicon
+(fixtures/master.csv, rows taken from the master CSV) instead of the
+processed master, so every test builds its engine in well under a second.
+
+    python -m pytest -q backend/tests
+
+backend.app.config reads the environment when it is first imported, so the
+variables are set here, before any test module imports the app.
+"""
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+FIXTURE_CSV = Path(__file__).resolve().parent / "fixtures" / "master.csv"
+
+os.environ.update({
+    "FOODLENS_MASTER_FILE": str(FIXTURE_CSV),
+    "FOODLENS_USE_LEXICON_SNAPSHOT": "0",
+    "FOODLENS_RESULT_CACHE_MAX_ENTRIES": "0",
+    "FOODLENS_FUZZY_MEMO_MAX_ENTRIES": "0",
+    "FOODLENS_FUZZY_MEMO_FILE": "",
+    "FOODLENS_LEXICON_WATCH_INTERVAL_SECONDS": "0",
+    "FOODLENS_LEXICON_DELTA_JOURNAL": str(Path(tempfile.mkdtemp(prefix="foodlens_tests_")) / "master.delta.jsonl"),
+    "FOODLENS_ANALYSIS_WORKERS": "0",
+    "FOODLENS_WARMUP_ON_STARTUP": "0",
+})
+
+
+@pytest.fixture
+def master_csv(tmp_path, monkeypatch):
+    """A private copy of the fixture lexicon; the registry engine and lexicon manager start fresh on it."""
+    from backend.app import config as app_config
+    from backend.app import lexicon_manager
+    from backend.app.engine_registry import reset_engine
+
+    path = tmp_path / "master.csv"
+    shutil.copyfile(FIXTURE_CSV, path)
+    monkeypatch.setattr(app_config, "MASTER_CSV_FILE", path)
+    monkeypatch.setattr(app_config, "LEXICON_DELTA_JOURNAL_FILE", tmp_path / "master.delta.jsonl")
+    monkeypatch.setattr(lexicon_manager, "_manager", None)
+    reset_engine()
+    yield path
+    reset_engine()
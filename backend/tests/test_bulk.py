@@ -0,0 +1,57 @@
+"""Checkpoint / resume of the bulk analysis CLI (bulk.py)."""
+import json
+
+import pytest
+
+from backend.app import bulk
+
+LABELS = [
+    "İçindekiler: Buğday unu, şeker, bitkisel yağ (palm), kakao (%4), tuz, emülgatör (soya lesitini).",
+    "Eser miktarda fındık, süt ve susam içerebilir. Gluten içermez.",
+    "icindekiler: misir surubu, potesyum sorbat, sodyum benzoet, sitrik asid, e-102 tartrazin.",
+    "İÇİNDEKİLER: SU, ŞEKER, ASİTLİK DÜZENLEYİCİ (SİTRİK ASİT), KORUYUCU (POTASYUM SORBAT)",
+    "icindekiler: bugday unu seker kakaoyagi findik susam sodyum benzoat tuz, yumurta",
+    "İçindekiler: şeker, kakao yağı, süt tozu, aspartam, kurkumin.",
+]
+
+
+def write_input(path):
+    with path.open("w", encoding="utf-8") as f:
+        for n in range(15):
+            f.write(json.dumps({"id": f"L{n}", "ocr_text": LABELS[n % len(LABELS)]}, ensure_ascii=False) + "\n")
+        f.write("not json\n")
+        f.write(json.dumps({"id": "empty"}) + "\n")
+
+
+def run_bulk(input_path, output_path, *extra):
+    argv = [str(input_path), "-o", str(output_path), "--workers", "1", "--checkpoint-every", "4", "--structured"]
+    return bulk.main(argv + list(extra))
+
+
+def test_resume_after_interruption_gives_identical_output(master_csv, tmp_path, monkeypatch):
+    input_path = tmp_path / "labels.ndjson"
+    write_input(input_path)
+    full = tmp_path / "full.ndjson"
+    assert run_bulk(input_path, full) == 0
+
+    analyze_task = bulk._analyze_task
+
+    def interrupted(task):
+        if task[0] == 10:
+            raise KeyboardInterrupt
+        return analyze_task(task)
+
+    resumed = tmp_path / "resumed.ndjson"
+    monkeypatch.setattr(bulk, "_analyze_task", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        run_bulk(input_path, resumed)
+    checkpoint = json.loads((tmp_path / "resumed.ndjson.checkpoint").read_text(encoding="utf-8"))
+    assert checkpoint["completed"] == 8
+    # Records 8 and 9 reached the output after the last checkpoint; resume drops them
+    assert resumed.stat().st_size > checkpoint["output_bytes"]
+
+    monkeypatch.setattr(bulk, "_analyze_task", analyze_task)
+    assert run_bulk(input_path, resumed, "--resume") == 0
+    assert resumed.read_bytes() == full.read_bytes()
+    lines = full.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["index"] for line in lines] == list(range(17))
@@ -0,0 +1,16 @@
+"""Exact aliases found inside a span without separators (ExactRuleMatcher.match_span_parts)."""
+from backend.app.engine_registry import get_engine
+
+
+def test_exact_scan_reports_the_ocr_words(master_csv):
+    result = get_engine().analyze_structured("İçindekiler: Buğday unu ŞEKER palm yağı Tuz, kakao (%4)")
+    scanned = {item.item_id: item for item in result.present if item.match_type == "exact_scan"}
+
+    assert {item_id: item.raw_query for item_id, item in scanned.items()} == {
+        "ING0000": "Buğday unu",
+        "ING0001": "şEKER",
+        "ING0003": "palm yağı",
+        "ING0004": "Tuz",
+    }
+    # matched_key stays the folded alias
+    assert scanned["ING0003"].matched_key == "palm yagi"
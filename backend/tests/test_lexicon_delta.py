@@ -0,0 +1,201 @@
+"""Incremental lexicon edits (lexicon_delta.py) and the delta journal (lexicon_manager.py)."""
+import csv
+import json
+
+from backend.app import config as app_config
+from backend.app.analysis.engine import FoodLensAnalysisEngine
+from backend.app.analysis.matching.lexicon import TYPE_PRIORITY_BY_SECTION
+
+LABELS = [
+    "İçindekiler: Buğday unu, şeker, palm yağı, kakao, tuz, emülgatör (soya lesitini).",
+    "icindekiler: misir surubu, potesyum sorbat, sodyum benzoet, sitrik asid, e-102 tartrazin.",
+    "Eser miktarda fındık, süt ve susam içerebilir. Gluten içermez.",
+    "İçindekiler: şeker, deneme maddesi kuraldışı, yumurta, kurkumin, aspartam.",
+]
+
+DELETES = ["ING0013", "E951"]
+UPSERTS = [
+    {
+        "id": "E202", "name_tr": "Potasyum sorbat", "type": "additive", "risk_level": "High",
+        "keywords": json.dumps(["e202", "potasyum sorbat", "sorbik asit potasyum tuzu"], ensure_ascii=False),
+    },
+    {
+        "id": "ZZTEST1", "name_tr": "Deneme Maddesi Kuraldışı", "type": "ingredient", "risk_level": "Low",
+        "keywords": json.dumps(["deneme maddesi kuraldışı"], ensure_ascii=False),
+    },
+]
+
+
+def read_rows(path):
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def write_rebuilt_csv(source, target):
+    """The edited CSV a full rebuild would load: removed rows dropped, upserts appended."""
+    fieldnames, rows = read_rows(source)
+    removed = set(DELETES) | {row["id"] for row in UPSERTS}
+    with target.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows([row for row in rows if row["id"] not in removed] + UPSERTS)
+
+
+def lookup_table(engine, queries):
+    store = engine.lexicon.store
+    table = {}
+    for query in queries:
+        for section in TYPE_PRIORITY_BY_SECTION:
+            record_id = engine.lexicon.exact_lookup_id(query, section)
+            table[query, section] = store.item_ids[record_id] if record_id is not None else None
+    return table
+
+
+def label_items(engine):
+    results = []
+    for label in LABELS:
+        result = engine.analyze_structured(label)
+        results.append([sorted(item.item_id for item in items) for items in (result.present, result.may_contain, result.free_from)])
+    return results
+
+
+def test_delta_matches_rebuild(master_csv, tmp_path, monkeypatch):
+    delta_engine = FoodLensAnalysisEngine()
+    base_aliases = set(delta_engine.lexicon.alias_map)
+    delta_engine.apply_lexicon_delta([dict(row) for row in UPSERTS], DELETES)
+
+    rebuilt_csv = tmp_path / "rebuilt.csv"
+    write_rebuilt_csv(master_csv, rebuilt_csv)
+    monkeypatch.setattr(app_config, "MASTER_CSV_FILE", rebuilt_csv)
+    rebuilt_engine = FoodLensAnalysisEngine()
+
+    queries = sorted(base_aliases | set(rebuilt_engine.lexicon.alias_map))
+    assert lookup_table(delta_engine, queries) == lookup_table(rebuilt_engine, queries)
+    assert label_items(delta_engine) == label_items(rebuilt_engine)
+    assert label_items(delta_engine.compacted()) == label_items(delta_engine)
+    assert delta_engine.lexicon.version.endswith("+1")
+
+
+def test_journaled_edit_reaches_other_workers_and_survives_reload(master_csv):
+    from backend.app.engine_registry import get_engine
+    from backend.app.lexicon_manager import _append_journal, get_lexicon_manager
+
+    manager = get_lexicon_manager()
+    base_version = get_engine().lexicon.version
+    assert not manager.sync_journal()
+
+    # Written by another worker process: this one picks it up on its next sync
+    _append_journal(app_config.LEXICON_DELTA_JOURNAL_FILE, {"upserts": UPSERTS, "deletes": DELETES})
+    assert manager.sync_journal()
+    assert get_engine().lexicon.version == base_version + "+1"
+    assert "ZZTEST1" in label_items(get_engine())[3][0]
+
+    # A full reload from the CSV replays the journal
+    assert manager.request_reload("test")
+    assert manager.wait(30)
+    assert manager.reload_count == 1
+    assert get_engine().lexicon.version == base_version + "+1"
+    assert "ZZTEST1" in label_items(get_engine())[3][0]
+
+    # Removing the journal (its edits merged into the CSV) reloads the CSV alone
+    app_config.LEXICON_DELTA_JOURNAL_FILE.unlink()
+    assert manager.sync_journal()
+    assert manager.wait(30)
+    assert get_engine().lexicon.version == base_version
+    assert "ZZTEST1" not in label_items(get_engine())[3][0]
+
+
+def test_record_delta_journals_and_applies(master_csv):
+    from backend.app.engine_registry import get_engine
+    from backend.app.lexicon_manager import _read_journal, get_lexicon_manager
+
+    get_engine()
+    overlay = get_lexicon_manager().record_delta(UPSERTS, DELETES)
+    assert overlay is get_engine().lexicon.overlay and overlay.seq == 1
+    entries, offset = _read_journal(app_config.LEXICON_DELTA_JOURNAL_FILE, 0)
+    assert entries == [{"upserts": UPSERTS, "deletes": DELETES}]
+    assert get_lexicon_manager().status()["journal_offset"] == offset
+
+
+def test_reload_request_is_journaled_for_every_worker(master_csv):
+    from backend.app.engine_registry import get_engine
+    from backend.app.lexicon_manager import _append_journal, get_lexicon_manager
+
+    manager = get_lexicon_manager()
+    get_engine()
+    assert not manager.sync_journal()
+    _append_journal(app_config.LEXICON_DELTA_JOURNAL_FILE, {"reload": "admin"})
+    assert manager.sync_journal()
+    assert manager.wait(30)
+    assert manager.reload_count == 1
+    # Replaying the journal on that rebuild does not request another one
+    assert not manager.sync_journal()
+    assert manager.reload_count == 1
+
+
+def test_startup_sync_skips_reload_lines_already_in_the_journal(master_csv):
+    from backend.app.engine_registry import get_engine
+    from backend.app.lexicon_manager import _append_journal, get_lexicon_manager
+
+    journal = app_config.LEXICON_DELTA_JOURNAL_FILE
+    _append_journal(journal, {"reload": "admin"})
+    _append_journal(journal, {"upserts": UPSERTS, "deletes": DELETES})
+
+    # A process starting after those lines: its engine already reflects the CSV
+    manager = get_lexicon_manager()
+    base_version = get_engine().lexicon.version
+    assert manager.sync_journal()
+    assert not manager.building and manager.reload_count == 0
+    assert get_engine().lexicon.version == base_version + "+1"
+    assert manager.status()["journal_offset"] == journal.stat().st_size
+
+
+def test_csv_written_during_a_rebuild_is_picked_up(master_csv, monkeypatch):
+    from backend.app import lexicon_manager
+    from backend.app.engine_registry import get_engine
+
+    manager = lexicon_manager.get_lexicon_manager()
+    get_engine()
+    fieldnames, _ = read_rows(master_csv)
+
+    def build_then_append():
+        engine = FoodLensAnalysisEngine()
+        # The build has read the CSV; this write lands before the swap
+        with master_csv.open("a", encoding="utf-8", newline="") as f:
+            csv.DictWriter(f, fieldnames=fieldnames, restval="", lineterminator="\n").writerow(UPSERTS[1])
+        return engine
+
+    monkeypatch.setattr(lexicon_manager, "FoodLensAnalysisEngine", build_then_append)
+    assert manager.request_reload("test")
+    assert manager.wait(30)
+
+    # The first poll sees a new signature and waits for the write to settle
+    assert not manager.check_for_update()
+    assert manager.check_for_update()
+    assert "ZZTEST1" in label_items(get_engine())[3][0]
+
+
+def test_delta_during_a_request_keeps_its_version_and_skips_the_cache(master_csv, monkeypatch):
+    from backend.app.engine_registry import get_engine
+    from backend.app.input_normalization import canonicalize_analysis_text
+    from backend.app.matcher_engine import FoodLensMatcher
+
+    monkeypatch.setattr(app_config, "RESULT_CACHE_MAX_ENTRIES", 16)
+    matcher = FoodLensMatcher()
+    engine = get_engine()
+    base_version = engine.lexicon.version
+    analyze_for_api = engine.analyze_for_api
+
+    def delta_mid_run(text):
+        engine.apply_lexicon_delta([dict(row) for row in UPSERTS], DELETES)
+        return analyze_for_api(text)
+
+    monkeypatch.setattr(engine, "analyze_for_api", delta_mid_run)
+    response = matcher.analyze_text_response(LABELS[3])
+    assert response["lexicon_version"] == base_version
+    assert engine.lexicon.version == base_version + "+1"
+
+    text = canonicalize_analysis_text(LABELS[3])
+    for version in (base_version, engine.lexicon.version):
+        assert not matcher.result_cache.get((version, False, text))[0]
@@ -0,0 +1,38 @@
+"""ParallelAnalysisEngine results against the serial engine."""
+from backend.app.engine_registry import get_engine
+from backend.app.parallel_engine import ParallelAnalysisEngine, compact_analysis
+
+LABELS = [
+    "İçindekiler: Buğday unu, şeker, bitkisel yağ (palm), kakao (%4), tuz, emülgatör (soya lesitini).",
+    "Eser miktarda fındık, süt ve susam içerebilir. Gluten içermez.",
+    "icindekiler: misir surubu, potesyum sorbat, sodyum benzoet, sitrik asid, e-102 tartrazin.",
+    "İçindekiler: şeker, kakao yağı, süt tozu, aspartam, kurkumin.",
+    "Ingredients: sugar, wheat flour, cocoa butter, whole milk powder, emulsifier (soy lecithin).",
+    "",
+    "tuz",
+]
+
+
+ITEMS = ["buğday unu", "şeker", "tuz", "kakao", "yumurta", "aspartam", "e330", "tartrazin"]
+
+
+def test_parallel_results_in_input_order(master_csv):
+    # A different set of items on every label, so a result yielded out of place cannot match
+    texts = ["İçindekiler: " + ", ".join(item for bit, item in enumerate(ITEMS) if n >> bit & 1) for n in range(1, 61)]
+    engine = get_engine()
+    expected = [compact_analysis(engine, text) for text in texts]
+
+    # Small chunks, so many of them are in flight and finish out of order
+    with ParallelAnalysisEngine(workers=2, target_chunk_seconds=0.0, max_chunk=3) as parallel:
+        results = parallel.analyze_batch(texts)
+        assert parallel.stats()["texts_done"] == len(texts)
+
+    assert results == expected
+    assert len(set(results)) == len(texts)
+
+
+def test_single_worker_runs_in_process(master_csv):
+    parallel = ParallelAnalysisEngine(workers=1)
+    results = parallel.analyze_batch(LABELS)
+    assert not parallel.uses_processes
+    assert results == [compact_analysis(get_engine(), text) for text in LABELS]
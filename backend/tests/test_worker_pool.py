@@ -0,0 +1,49 @@
+"""Limits of the async analysis path (worker_pool.py) as the API reports them."""
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.app import api, worker_pool
+from backend.app.worker_pool import AnalysisWorkerPool
+
+
+class BlockingMatcher:
+    """Stands in for FoodLensMatcher: every analysis waits until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def analyze_text_response(self, text, selected_allergens=None):
+        assert self.release.wait(10)
+        return {"results": [], "text": text}
+
+
+def test_saturated_pool_answers_503_with_retry_after(monkeypatch):
+    pool = AnalysisWorkerPool(workers=0, max_pending=1, timeout_seconds=10, retry_after_seconds=3)
+    matcher = BlockingMatcher()
+    monkeypatch.setattr(worker_pool, "_pool", pool)
+    monkeypatch.setattr(api, "_matcher", matcher)
+    client = TestClient(api.app)
+
+    first = {}
+    thread = threading.Thread(target=lambda: first.update(response=client.post("/analyze", json={"ocr_text": "şeker"})))
+    thread.start()
+    try:
+        deadline = time.monotonic() + 10
+        while pool.pending < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.pending == 1
+
+        response = client.post("/analyze", json={"ocr_text": "tuz"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        assert pool.rejected == 1
+    finally:
+        matcher.release.set()
+        thread.join(10)
+
+    assert first["response"].status_code == 200
+    assert first["response"].json() == {"results": [], "text": "şeker"}
+    assert pool.stats()["completed"] == 1 and pool.pending == 0
+    pool.shutdown()